@@ -0,0 +1,65 @@
+"""Add outbox columns to the Notification table
+
+Revision ID: 5b1e0c7a9d21
+Revises: 38cf8e408509
+Create Date: 2026-10-18 09:00:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e0c7a9d21"
+down_revision: Union[str, None] = "38cf8e408509"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows written before the outbox existed were sent in-request
+    op.add_column(
+        "notification",
+        sa.Column(
+            "status",
+            sa.Enum(
+                "pending",
+                "processing",
+                "sent",
+                "failed",
+                name="notificationstatus",
+                native_enum=False,
+                length=16,
+            ),
+            server_default="sent",
+            nullable=False,
+        ),
+    )
+    op.alter_column("notification", "status", server_default="pending")
+    op.add_column(
+        "notification",
+        sa.Column(
+            "claimed_at", postgresql.TIMESTAMP(timezone=True), nullable=True
+        ),
+    )
+    op.create_index(
+        "ix_notification_outbox",
+        "notification",
+        ["id"],
+        unique=False,
+        postgresql_where="status IN ('pending', 'processing')",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_notification_outbox",
+        table_name="notification",
+        postgresql_where="status IN ('pending', 'processing')",
+    )
+    op.drop_column("notification", "claimed_at")
+    op.drop_column("notification", "status")
@@ -0,0 +1,136 @@
+"""Add sha256 attribute to the Document table
+
+Revision ID: e2f9b6d3c417
+Revises: c81d2e4f5a60
+Create Date: 2026-10-18 12:00:26.530771
+
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f9b6d3c417"
+down_revision: Union[str, None] = "c81d2e4f5a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Documents read and updated at a time
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document", sa.Column("sha256", sa.String(length=64), nullable=True)
+    )
+
+    # Buffers are stored in Base64, the digest is taken over the file content.
+    # They are decoded the way the bot did: characters outside the alphabet,
+    # on which decode() in SQL fails, are skipped. The canonical encoding is
+    # written back. Contents that cannot be decoded at all are kept as they are.
+    connection = op.get_bind()
+    undecodable = []
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, buffer FROM document WHERE id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ).bindparams(last_id=last_id, limit=BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for id_, buffer in rows:
+            try:
+                content = base64.b64decode(buffer)
+            except binascii.Error:
+                undecodable.append(id_)
+                content = bytes(buffer)
+            updates.append(
+                {
+                    "id": id_,
+                    "buffer": base64.b64encode(content),
+                    "sha256": hashlib.sha256(content).hexdigest(),
+                }
+            )
+        connection.execute(
+            sa.text(
+                "UPDATE document SET buffer = :buffer, sha256 = :sha256 "
+                "WHERE id = :id"
+            ),
+            updates,
+        )
+        last_id = rows[-1][0]
+    if undecodable:
+        logger.warning(
+            "%s documents are not valid Base64 and were kept as they are: %s",
+            len(undecodable),
+            ", ".join(map(str, undecodable)),
+        )
+
+    # Merge documents that only differed in the bytes of their Base64 encoding
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE document_duplicate ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM (
+            SELECT id, min(id) OVER (PARTITION BY sha256, name) AS keep_id
+            FROM document
+        ) AS ranked
+        WHERE id <> keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM notification_document AS nd
+        USING document_duplicate AS dup
+        WHERE nd.document_id = dup.id
+          AND EXISTS (
+              SELECT 1
+              FROM notification_document AS kept
+              WHERE kept.notification_id = nd.notification_id
+                AND kept.document_id = dup.keep_id
+          )
+        """
+    )
+    op.execute(
+        """
+        UPDATE notification_document AS nd
+        SET document_id = dup.keep_id
+        FROM document_duplicate AS dup
+        WHERE nd.document_id = dup.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM document
+        USING document_duplicate AS dup
+        WHERE document.id = dup.id
+        """
+    )
+
+    op.alter_column("document", "sha256", nullable=False)
+    op.create_unique_constraint(
+        op.f("uq_document_sha256_name"), "document", ["sha256", "name"]
+    )
+    op.drop_index(op.f("ix_document_buffer"), table_name="document")
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("ix_document_buffer"), "document", ["buffer"], unique=False
+    )
+    op.drop_constraint(
+        op.f("uq_document_sha256_name"), "document", type_="unique"
+    )
+    op.drop_column("document", "sha256")
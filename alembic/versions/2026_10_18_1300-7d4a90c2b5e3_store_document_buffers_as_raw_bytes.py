@@ -0,0 +1,39 @@
+"""Store document buffers as raw bytes
+
+Revision ID: 7d4a90c2b5e3
+Revises: e2f9b6d3c417
+Create Date: 2026-10-18 13:00:51.904126
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4a90c2b5e3"
+down_revision: Union[str, None] = "e2f9b6d3c417"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE document
+        SET buffer = decode(convert_from(buffer, 'UTF8'), 'base64')
+        """
+    )
+
+
+def downgrade() -> None:
+    # Postgres wraps Base64 output every 76 characters
+    op.execute(
+        """
+        UPDATE document
+        SET buffer = convert_to(
+            replace(encode(buffer, 'base64'), E'\\n', ''), 'UTF8'
+        )
+        """
+    )
@@ -0,0 +1,92 @@
+"""Move document contents to blob storage
+
+Revision ID: 9f3b2a1c8e07
+Revises: 7d4a90c2b5e3
+Create Date: 2026-10-18 14:00:33.270518
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config import config
+from database.storage import FileSystemBlobStorage
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3b2a1c8e07"
+down_revision: Union[str, None] = "7d4a90c2b5e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document", sa.Column("size", sa.BIGINT(), nullable=True))
+    op.add_column("document", sa.Column("mime", sa.Text(), nullable=True))
+    op.execute("UPDATE document SET size = octet_length(buffer)")
+    op.alter_column("document", "size", nullable=False)
+
+    op.alter_column(
+        "document", "buffer", existing_type=sa.LargeBinary(), nullable=True
+    )
+    if config.db.blob_backend != "filesystem":
+        return
+
+    # Existing contents are moved to the file system blob storage, one
+    # content at a time so that no more than one is held in memory
+    connection = op.get_bind()
+    storage = FileSystemBlobStorage(config.db.blob_path)
+    digests = connection.scalars(
+        sa.text("SELECT DISTINCT sha256 FROM document WHERE buffer IS NOT NULL")
+    ).all()
+    for sha256 in digests:
+        buffer = connection.scalar(
+            sa.text(
+                "SELECT buffer FROM document "
+                "WHERE sha256 = :sha256 AND buffer IS NOT NULL LIMIT 1"
+            ).bindparams(sha256=sha256)
+        )
+        path = storage.path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{sha256}.tmp")
+            tmp_path.write_bytes(buffer)
+            os.replace(tmp_path, path)
+        connection.execute(
+            sa.text(
+                "UPDATE document SET buffer = NULL WHERE sha256 = :sha256"
+            ).bindparams(sha256=sha256)
+        )
+
+
+def downgrade() -> None:
+    # Contents written to the file system blob storage are copied back
+    connection = op.get_bind()
+    storage = FileSystemBlobStorage(config.db.blob_path)
+    digests = connection.scalars(
+        sa.text("SELECT DISTINCT sha256 FROM document WHERE buffer IS NULL")
+    ).all()
+    missing = [sha256 for sha256 in digests if not storage.path(sha256).exists()]
+    if missing:
+        raise RuntimeError(
+            f"{len(missing)} document contents are missing from {storage.root}, "
+            f"e.g. {missing[0]}; restore them before downgrading"
+        )
+    for sha256 in digests:
+        connection.execute(
+            sa.text(
+                "UPDATE document SET buffer = :buffer "
+                "WHERE sha256 = :sha256 AND buffer IS NULL"
+            ).bindparams(
+                buffer=storage.path(sha256).read_bytes(),
+                sha256=sha256,
+            )
+        )
+    op.alter_column(
+        "document", "buffer", existing_type=sa.LargeBinary(), nullable=False
+    )
+    op.drop_column("document", "mime")
+    op.drop_column("document", "size")
@@ -0,0 +1,68 @@
+"""Add document_file_id table and bot_id attribute to the Notification table
+
+Revision ID: 6e2b8c4f1d93
+Revises: b85d1f3e7a24
+Create Date: 2026-10-18 17:00:41.385207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config import config
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2b8c4f1d93"
+down_revision: Union[str, None] = "b85d1f3e7a24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_file_id",
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.BIGINT(), nullable=False),
+        sa.Column("file_id", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["document_id"],
+            ["document.id"],
+            name=op.f("fk_document_file_id_document_id_document"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "document_id", "bot_id", name=op.f("pk_document_file_id")
+        ),
+    )
+    op.add_column("notification", sa.Column("bot_id", sa.BIGINT(), nullable=True))
+
+    # Existing file ids were uploaded by the bot of the primary token
+    if config.tg_bot:
+        bot_id = int(config.tg_bot.token.split(":", 1)[0])
+        op.execute(
+            sa.text(
+                "INSERT INTO document_file_id (document_id, bot_id, file_id) "
+                "SELECT id, :bot_id, file_id FROM document WHERE file_id IS NOT NULL"
+            ).bindparams(bot_id=bot_id)
+        )
+    op.drop_column("document", "file_id")
+
+
+def downgrade() -> None:
+    op.add_column("document", sa.Column("file_id", sa.Text(), nullable=True))
+    if config.tg_bot:
+        bot_id = int(config.tg_bot.token.split(":", 1)[0])
+        op.execute(
+            sa.text(
+                "UPDATE document SET file_id = document_file_id.file_id "
+                "FROM document_file_id "
+                "WHERE document_file_id.document_id = document.id "
+                "AND document_file_id.bot_id = :bot_id"
+            ).bindparams(bot_id=bot_id)
+        )
+    op.drop_column("notification", "bot_id")
+    op.drop_table("document_file_id")
@@ -0,0 +1,96 @@
+"""Add dead_letter table and next_attempt_at attribute to the Notification table
+
+Revision ID: d4c8e1a6f357
+Revises: 1a7f3c9e5b42
+Create Date: 2026-10-18 19:00:52.718340
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4c8e1a6f357"
+down_revision: Union[str, None] = "1a7f3c9e5b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dead_letter",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("notification_id", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "replayed_at", postgresql.TIMESTAMP(timezone=True), nullable=True
+        ),
+        sa.ForeignKeyConstraint(
+            ["notification_id"],
+            ["notification.id"],
+            name=op.f("fk_dead_letter_notification_id_notification"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_dead_letter")),
+    )
+    op.create_index(
+        op.f("ix_dead_letter_notification_id"),
+        "dead_letter",
+        ["notification_id"],
+        unique=False,
+    )
+    op.add_column(
+        "notification",
+        sa.Column(
+            "next_attempt_at", postgresql.TIMESTAMP(timezone=True), nullable=True
+        ),
+    )
+
+    # Retrying rows are claimed by the outbox workers too
+    op.drop_index(
+        "ix_notification_outbox",
+        table_name="notification",
+        postgresql_where="status IN ('pending', 'processing')",
+    )
+    op.create_index(
+        "ix_notification_outbox",
+        "notification",
+        ["id"],
+        unique=False,
+        postgresql_where="status IN ('pending', 'processing', 'retrying')",
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE notification SET status = 'failed' WHERE status = 'retrying'"
+    )
+    op.drop_index(
+        "ix_notification_outbox",
+        table_name="notification",
+        postgresql_where="status IN ('pending', 'processing', 'retrying')",
+    )
+    op.create_index(
+        "ix_notification_outbox",
+        "notification",
+        ["id"],
+        unique=False,
+        postgresql_where="status IN ('pending', 'processing')",
+    )
+    op.drop_column("notification", "next_attempt_at")
+    op.drop_index(
+        op.f("ix_dead_letter_notification_id"), table_name="dead_letter"
+    )
+    op.drop_table("dead_letter")
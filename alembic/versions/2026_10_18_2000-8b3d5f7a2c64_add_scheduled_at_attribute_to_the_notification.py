@@ -0,0 +1,49 @@
+"""Add scheduled_at attribute to the Notification table
+
+Revision ID: 8b3d5f7a2c64
+Revises: d4c8e1a6f357
+Create Date: 2026-10-18 20:00:17.904523
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b3d5f7a2c64"
+down_revision: Union[str, None] = "d4c8e1a6f357"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "notification",
+        sa.Column(
+            "scheduled_at", postgresql.TIMESTAMP(timezone=True), nullable=True
+        ),
+    )
+    op.create_index(
+        "ix_notification_scheduled",
+        "notification",
+        ["scheduled_at"],
+        unique=False,
+        postgresql_where="status = 'scheduled'",
+    )
+
+
+def downgrade() -> None:
+    # Without a scheduler the notifications are delivered right away
+    op.execute(
+        "UPDATE notification SET status = 'pending' WHERE status = 'scheduled'"
+    )
+    op.drop_index(
+        "ix_notification_scheduled",
+        table_name="notification",
+        postgresql_where="status = 'scheduled'",
+    )
+    op.drop_column("notification", "scheduled_at")
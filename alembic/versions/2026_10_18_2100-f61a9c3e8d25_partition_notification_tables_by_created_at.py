@@ -0,0 +1,272 @@
+"""Partition the notification and notification_document tables by created_at
+
+Revision ID: f61a9c3e8d25
+Revises: 8b3d5f7a2c64
+Create Date: 2026-10-18 21:00:36.271948
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f61a9c3e8d25"
+down_revision: Union[str, None] = "8b3d5f7a2c64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead; the application keeps creating them from then on
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    # The id is only unique together with the partition key, foreign keys
+    # have to include it or go
+    op.drop_constraint(
+        op.f("fk_dead_letter_notification_id_notification"),
+        "dead_letter",
+        type_="foreignkey",
+    )
+    op.drop_constraint(
+        op.f("fk_notification_document_notification_id_notification"),
+        "notification_document",
+        type_="foreignkey",
+    )
+    op.drop_constraint(
+        op.f("fk_notification_document_document_id_document"),
+        "notification_document",
+        type_="foreignkey",
+    )
+
+    # The rows are copied, on a large table this takes a maintenance window
+    op.rename_table("notification", "notification_old")
+    op.rename_table("notification_document", "notification_document_old")
+    op.execute(
+        "CREATE TABLE notification (LIKE notification_old INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        "CREATE TABLE notification_document ("
+        "notification_id INTEGER NOT NULL, "
+        "document_id INTEGER NOT NULL, "
+        "created_at TIMESTAMP WITH TIME ZONE NOT NULL"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            bound date := date_trunc(
+                'month',
+                coalesce((SELECT min(created_at) FROM notification_old), now())
+                AT TIME ZONE 'UTC'
+            );
+            last_bound date := date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '{MONTHS_AHEAD} months';
+            tbl text;
+        BEGIN
+            WHILE bound <= last_bound LOOP
+                FOREACH tbl IN ARRAY ARRAY['notification', 'notification_document'] LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        tbl || '_p' || to_char(bound, 'YYYY_MM'),
+                        tbl,
+                        bound::timestamp AT TIME ZONE 'UTC',
+                        (bound + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                    );
+                END LOOP;
+                bound := bound + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    # Rows of months without a partition land here instead of failing the
+    # insert, the maintenance moves them to their monthly partitions
+    op.execute("CREATE TABLE notification_default PARTITION OF notification DEFAULT")
+    op.execute(
+        "CREATE TABLE notification_document_default "
+        "PARTITION OF notification_document DEFAULT"
+    )
+    op.execute("INSERT INTO notification SELECT * FROM notification_old")
+    op.execute(
+        "INSERT INTO notification_document (notification_id, document_id, created_at) "
+        "SELECT notification_document_old.notification_id, "
+        "notification_document_old.document_id, notification_old.created_at "
+        "FROM notification_document_old "
+        "JOIN notification_old "
+        "ON notification_old.id = notification_document_old.notification_id"
+    )
+    op.execute("ALTER SEQUENCE notification_id_seq OWNED BY notification.id")
+    op.drop_table("notification_document_old")
+    op.drop_table("notification_old")
+
+    op.create_primary_key(
+        op.f("pk_notification"), "notification", ["id", "created_at"]
+    )
+    op.create_index(
+        op.f("ix_notification_chat_id"),
+        "notification",
+        ["chat_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_notification_created_at"),
+        "notification",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_notification_outbox",
+        "notification",
+        ["id"],
+        unique=False,
+        postgresql_where="status IN ('pending', 'processing', 'retrying')",
+    )
+    op.create_index(
+        "ix_notification_scheduled",
+        "notification",
+        ["scheduled_at"],
+        unique=False,
+        postgresql_where="status = 'scheduled'",
+    )
+    op.create_primary_key(
+        op.f("pk_notification_document"),
+        "notification_document",
+        ["notification_id", "document_id", "created_at"],
+    )
+    op.create_index(
+        op.f("ix_notification_document_document_id"),
+        "notification_document",
+        ["document_id"],
+        unique=False,
+    )
+    op.create_foreign_key(
+        op.f("fk_notification_document_notification_id_notification"),
+        "notification_document",
+        "notification",
+        ["notification_id", "created_at"],
+        ["id", "created_at"],
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        op.f("fk_notification_document_document_id_document"),
+        "notification_document",
+        "document",
+        ["document_id"],
+        ["id"],
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
+
+    # Expired keys are deleted by the time they were claimed
+    op.create_index(
+        op.f("ix_idempotency_key_created_at"),
+        "idempotency_key",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_idempotency_key_created_at"), table_name="idempotency_key"
+    )
+    op.drop_constraint(
+        op.f("fk_notification_document_notification_id_notification"),
+        "notification_document",
+        type_="foreignkey",
+    )
+    op.drop_constraint(
+        op.f("fk_notification_document_document_id_document"),
+        "notification_document",
+        type_="foreignkey",
+    )
+
+    op.rename_table("notification", "notification_old")
+    op.rename_table("notification_document", "notification_document_old")
+    op.execute(
+        "CREATE TABLE notification (LIKE notification_old INCLUDING DEFAULTS)"
+    )
+    op.execute(
+        "CREATE TABLE notification_document ("
+        "notification_id INTEGER NOT NULL, "
+        "document_id INTEGER NOT NULL"
+        ")"
+    )
+    op.execute("INSERT INTO notification SELECT * FROM notification_old")
+    op.execute(
+        "INSERT INTO notification_document (notification_id, document_id) "
+        "SELECT notification_id, document_id FROM notification_document_old"
+    )
+    op.execute("ALTER SEQUENCE notification_id_seq OWNED BY notification.id")
+    # The partitions go with their tables
+    op.drop_table("notification_document_old")
+    op.drop_table("notification_old")
+
+    op.create_primary_key(op.f("pk_notification"), "notification", ["id"])
+    op.create_index(
+        op.f("ix_notification_chat_id"),
+        "notification",
+        ["chat_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_notification_created_at"),
+        "notification",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_notification_outbox",
+        "notification",
+        ["id"],
+        unique=False,
+        postgresql_where="status IN ('pending', 'processing', 'retrying')",
+    )
+    op.create_index(
+        "ix_notification_scheduled",
+        "notification",
+        ["scheduled_at"],
+        unique=False,
+        postgresql_where="status = 'scheduled'",
+    )
+    op.create_primary_key(
+        op.f("pk_notification_document"),
+        "notification_document",
+        ["notification_id", "document_id"],
+    )
+    op.create_foreign_key(
+        op.f("fk_notification_document_notification_id_notification"),
+        "notification_document",
+        "notification",
+        ["notification_id"],
+        ["id"],
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        op.f("fk_notification_document_document_id_document"),
+        "notification_document",
+        "document",
+        ["document_id"],
+        ["id"],
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
+
+    op.execute(
+        "DELETE FROM dead_letter WHERE NOT EXISTS "
+        "(SELECT 1 FROM notification WHERE notification.id = dead_letter.notification_id)"
+    )
+    op.create_foreign_key(
+        op.f("fk_dead_letter_notification_id_notification"),
+        "dead_letter",
+        "notification",
+        ["notification_id"],
+        ["id"],
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
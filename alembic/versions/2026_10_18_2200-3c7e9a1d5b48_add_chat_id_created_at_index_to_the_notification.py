@@ -0,0 +1,40 @@
+"""Add chat_id, created_at index to the notification
+
+Revision ID: 3c7e9a1d5b48
+Revises: f61a9c3e8d25
+Create Date: 2026-10-18 22:00:12.508314
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7e9a1d5b48"
+down_revision: Union[str, None] = "f61a9c3e8d25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves both the chat filter and the history pages of a chat,
+    # the single-column index becomes redundant
+    op.create_index(
+        "ix_notification_chat_id_created_at",
+        "notification",
+        ["chat_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_notification_chat_id"), table_name="notification")
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("ix_notification_chat_id"),
+        "notification",
+        ["chat_id"],
+        unique=False,
+    )
+    op.drop_index("ix_notification_chat_id_created_at", table_name="notification")
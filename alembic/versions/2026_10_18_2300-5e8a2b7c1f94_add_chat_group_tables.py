@@ -0,0 +1,63 @@
+"""Add chat_group and chat_group_member tables
+
+Revision ID: 5e8a2b7c1f94
+Revises: 3c7e9a1d5b48
+Create Date: 2026-10-18 23:00:27.640193
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a2b7c1f94"
+down_revision: Union[str, None] = "3c7e9a1d5b48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_group",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_chat_group")),
+        sa.UniqueConstraint("name", name=op.f("uq_chat_group_name")),
+    )
+    op.create_table(
+        "chat_group_member",
+        sa.Column("chat_group_id", sa.Integer(), nullable=False),
+        sa.Column("chat_id", sa.BIGINT(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["chat_group_id"],
+            ["chat_group.id"],
+            name=op.f("fk_chat_group_member_chat_group_id_chat_group"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "chat_group_id", "chat_id", name=op.f("pk_chat_group_member")
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_group_member")
+    op.drop_table("chat_group")
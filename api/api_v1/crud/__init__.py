@@ -1,3 +1,107 @@
-__all__ = ("create_notification",)
+__all__ = (
+    "PARTITIONED_TABLES",
+    "DeliveryRecord",
+    "NotificationDraft",
+    "add_months",
+    "claim_idempotency_key",
+    "claim_abandoned",
+    "claim_notifications",
+    "claim_retries",
+    "claim_scheduled",
+    "count_chat_group_members",
+    "create_chat_group",
+    "create_dead_letters",
+    "create_notification",
+    "create_notification_batch",
+    "create_notifications",
+    "create_partitions",
+    "default_partition_name",
+    "delete_chat_group",
+    "delete_expired_idempotency_keys",
+    "delete_expired_notifications",
+    "delete_orphan_dead_letters",
+    "delete_orphan_documents",
+    "document_digest",
+    "drop_partition",
+    "get_chat_group_members",
+    "get_chat_groups",
+    "get_dead_letters",
+    "get_idempotency_key",
+    "get_notifications",
+    "get_partitions",
+    "get_retry_schedule",
+    "get_scheduled_notifications",
+    "is_partitioned",
+    "lock_partitions",
+    "month_start",
+    "partition_name",
+    "record_deliveries",
+    "release_idempotency_key",
+    "release_scheduled",
+    "replace_chat_group_members",
+    "replay_dead_letters",
+    "resolve_documents",
+    "save_document_file_ids",
+    "save_idempotent_response",
+    "set_notification_digests",
+    "split_default_partitions",
+    "update_notification_status",
+)
 
-from .notification import create_notification
+from .chat_group import (
+    count_chat_group_members,
+    create_chat_group,
+    delete_chat_group,
+    get_chat_group_members,
+    get_chat_groups,
+    replace_chat_group_members,
+)
+from .dead_letter import (
+    create_dead_letters,
+    delete_orphan_dead_letters,
+    get_dead_letters,
+    replay_dead_letters,
+)
+from .idempotency import (
+    claim_idempotency_key,
+    delete_expired_idempotency_keys,
+    get_idempotency_key,
+    release_idempotency_key,
+    save_idempotent_response,
+)
+from .notification import (
+    DeliveryRecord,
+    NotificationDraft,
+    claim_abandoned,
+    claim_notifications,
+    claim_retries,
+    claim_scheduled,
+    create_notification,
+    create_notification_batch,
+    create_notifications,
+    delete_expired_notifications,
+    delete_orphan_documents,
+    document_digest,
+    get_notifications,
+    get_retry_schedule,
+    get_scheduled_notifications,
+    record_deliveries,
+    release_scheduled,
+    resolve_documents,
+    save_document_file_ids,
+    set_notification_digests,
+    update_notification_status,
+)
+from .partition import (
+    PARTITIONED_TABLES,
+    add_months,
+    create_partitions,
+    default_partition_name,
+    drop_partition,
+    get_partitions,
+    is_partitioned,
+    lock_partitions,
+    month_start,
+    partition_name,
+    split_default_partitions,
+)
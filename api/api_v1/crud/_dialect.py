@@ -0,0 +1,18 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def upsert(session: AsyncSession, model):
+    """
+    Create an INSERT statement supporting `ON CONFLICT` for the session dialect.
+
+    Production runs on PostgreSQL while the tests run on SQLite; both support
+    `ON CONFLICT`, but through different statement classes.
+
+    :param session: Async database session.
+    :param model: ORM model to insert into.
+    :return: Dialect-specific INSERT statement.
+    """
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -0,0 +1,187 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import ChatGroup, ChatGroupMember
+from metrics import track_db_time
+from ._dialect import upsert
+
+
+@track_db_time
+async def create_chat_group(
+    session: AsyncSession,
+    name: str,
+    chat_ids: List[int],
+) -> ChatGroup | None:
+    """
+    Create a chat group.
+
+    :param session: Async database session.
+    :param name: Group name.
+    :param chat_ids: Telegram chat ids of the members, duplicates are ignored.
+    :return: ChatGroup object or None if a group with the name exists.
+    """
+    chat_group = await session.scalar(
+        upsert(session, ChatGroup)
+        .values(name=name)
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(ChatGroup)
+    )
+    if chat_group is None:
+        return None
+
+    await _add_members(session, chat_group.id, chat_ids)
+    await session.commit()
+    return chat_group
+
+
+@track_db_time
+async def get_chat_groups(
+    session: AsyncSession,
+    names: List[str] | None = None,
+) -> List[ChatGroup]:
+    """
+    Get chat groups without their members.
+
+    :param session: Async database session.
+    :param names: Only the groups with these names, all groups if None.
+    :return: ChatGroup objects ordered by name.
+    """
+    stmt = select(ChatGroup).order_by(ChatGroup.name)
+    if names is not None:
+        stmt = stmt.where(ChatGroup.name.in_(names))
+    # The versions must be fresh, they decide whether cached members are used
+    result = await session.execute(stmt.execution_options(populate_existing=True))
+    return list(result.scalars().all())
+
+
+@track_db_time
+async def get_chat_group_members(
+    session: AsyncSession,
+    chat_group_ids: List[int],
+) -> Dict[int, List[int]]:
+    """
+    Get the members of several chat groups in one query.
+
+    :param session: Async database session.
+    :param chat_group_ids: Chat group ids.
+    :return: Telegram chat ids of the members, in ascending order, by group id.
+        Groups without members are included with an empty list.
+    """
+    members: Dict[int, List[int]] = {
+        chat_group_id: [] for chat_group_id in chat_group_ids
+    }
+    if not chat_group_ids:
+        return members
+
+    result = await session.execute(
+        select(ChatGroupMember.chat_group_id, ChatGroupMember.chat_id)
+        .where(ChatGroupMember.chat_group_id.in_(chat_group_ids))
+        .order_by(ChatGroupMember.chat_group_id, ChatGroupMember.chat_id)
+    )
+    for chat_group_id, chat_id in result:
+        members[chat_group_id].append(chat_id)
+    return members
+
+
+@track_db_time
+async def count_chat_group_members(
+    session: AsyncSession,
+    chat_group_ids: List[int],
+) -> Dict[int, int]:
+    """
+    Count the members of several chat groups.
+
+    :param session: Async database session.
+    :param chat_group_ids: Chat group ids.
+    :return: Number of members by group id.
+    """
+    counts = {chat_group_id: 0 for chat_group_id in chat_group_ids}
+    if not chat_group_ids:
+        return counts
+
+    result = await session.execute(
+        select(ChatGroupMember.chat_group_id, func.count())
+        .where(ChatGroupMember.chat_group_id.in_(chat_group_ids))
+        .group_by(ChatGroupMember.chat_group_id)
+    )
+    counts.update(dict(result.tuples().all()))
+    return counts
+
+
+@track_db_time
+async def replace_chat_group_members(
+    session: AsyncSession,
+    name: str,
+    chat_ids: List[int],
+) -> ChatGroup | None:
+    """
+    Replace the members of a chat group and bump its version.
+
+    Concurrent replacements of the same group are serialized by the row lock
+    of the version update.
+
+    :param session: Async database session.
+    :param name: Group name.
+    :param chat_ids: Telegram chat ids of the new members, duplicates are
+        ignored.
+    :return: Updated ChatGroup object or None if the group does not exist.
+    """
+    chat_group = await session.scalar(
+        update(ChatGroup)
+        .where(ChatGroup.name == name)
+        .values(
+            version=ChatGroup.version + 1,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(ChatGroup)
+        .execution_options(populate_existing=True)
+    )
+    if chat_group is None:
+        return None
+
+    await session.execute(
+        delete(ChatGroupMember).where(ChatGroupMember.chat_group_id == chat_group.id)
+    )
+    await _add_members(session, chat_group.id, chat_ids)
+    await session.commit()
+    return chat_group
+
+
+@track_db_time
+async def delete_chat_group(session: AsyncSession, name: str) -> bool:
+    """
+    Delete a chat group with its members.
+
+    :param session: Async database session.
+    :param name: Group name.
+    :return: True if the group was deleted, False if it does not exist.
+    """
+    chat_group_id = await session.scalar(
+        delete(ChatGroup).where(ChatGroup.name == name).returning(ChatGroup.id)
+    )
+    if chat_group_id is not None:
+        # Also removed by the foreign key, except on databases not enforcing it
+        await session.execute(
+            delete(ChatGroupMember).where(
+                ChatGroupMember.chat_group_id == chat_group_id
+            )
+        )
+    await session.commit()
+    return chat_group_id is not None
+
+
+async def _add_members(
+    session: AsyncSession, chat_group_id: int, chat_ids: List[int]
+) -> None:
+    chat_ids = list(dict.fromkeys(chat_ids))
+    if chat_ids:
+        await session.execute(
+            insert(ChatGroupMember),
+            [
+                {"chat_group_id": chat_group_id, "chat_id": chat_id}
+                for chat_id in chat_ids
+            ],
+        )
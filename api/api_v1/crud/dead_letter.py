@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database.models import DeadLetter, Document, Notification, NotificationStatus
+from metrics import track_db_time
+
+
+@track_db_time
+async def create_dead_letters(
+    session: AsyncSession,
+    letters: Dict[int, Tuple[str | None, int]],
+) -> None:
+    """
+    Move notifications that ran out of delivery attempts to the dead letters.
+
+    :param session: Async database session.
+    :param letters: Notification ids mapped to the last error and the number
+        of attempts.
+    """
+    if not letters:
+        return
+
+    await session.execute(
+        insert(DeadLetter),
+        [
+            {"notification_id": notification_id, "error": error, "attempts": attempts}
+            for notification_id, (error, attempts) in letters.items()
+        ],
+    )
+    await session.commit()
+
+
+@track_db_time
+async def get_dead_letters(
+    session: AsyncSession,
+    limit: int,
+    include_replayed: bool = False,
+) -> List[DeadLetter]:
+    """
+    Get the dead letters, the oldest first.
+
+    :param session: Async database session.
+    :param limit: Maximum number of dead letters.
+    :param include_replayed: Whether to include the replayed dead letters.
+    :return: Dead letters.
+    """
+    stmt = select(DeadLetter).order_by(DeadLetter.id).limit(limit)
+    if not include_replayed:
+        stmt = stmt.where(DeadLetter.replayed_at.is_(None))
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+@track_db_time
+async def replay_dead_letters(
+    session: AsyncSession,
+    dead_letter_ids: List[int] | None,
+    status: NotificationStatus,
+    limit: int,
+) -> List[Notification]:
+    """
+    Queue the notifications of dead letters for delivery again.
+
+    The notifications start over with no attempts made.
+
+    :param session: Async database session.
+    :param dead_letter_ids: Dead letters to replay, all that were not replayed
+        yet if None.
+    :param status: Status the notifications are set to.
+    :param limit: Maximum number of dead letters to replay.
+    :return: Notifications with their documents and file ids loaded.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = (
+        select(DeadLetter)
+        .where(DeadLetter.replayed_at.is_(None))
+        .order_by(DeadLetter.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if dead_letter_ids is not None:
+        stmt = stmt.where(DeadLetter.id.in_(dead_letter_ids))
+    letters = list((await session.execute(stmt)).scalars().all())
+    if not letters:
+        await session.commit()
+        return []
+
+    notification_ids = list(dict.fromkeys(letter.notification_id for letter in letters))
+    await session.execute(
+        update(DeadLetter)
+        .where(DeadLetter.id.in_([letter.id for letter in letters]))
+        .values(replayed_at=now)
+    )
+    await session.execute(
+        update(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .values(
+            status=status,
+            attempts=0,
+            next_attempt_at=None,
+            claimed_at=now if status == NotificationStatus.PROCESSING else None,
+        )
+    )
+    result = await session.execute(
+        select(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .order_by(Notification.id)
+        .options(selectinload(Notification.documents).selectinload(Document.file_ids))
+        .execution_options(populate_existing=True)
+    )
+    notifications = list(result.scalars().all())
+    await session.commit()
+    return notifications
+
+
+@track_db_time
+async def delete_orphan_dead_letters(session: AsyncSession, limit: int) -> int:
+    """
+    Delete one batch of dead letters whose notifications were deleted.
+
+    :param session: Async database session.
+    :param limit: Maximum number of dead letters to delete.
+    :return: Number of deleted dead letters.
+    """
+    orphans = (
+        select(DeadLetter.id)
+        .where(
+            ~select(Notification.id)
+            .where(Notification.id == DeadLetter.notification_id)
+            .exists()
+        )
+        .limit(limit)
+        .scalar_subquery()
+    )
+    result = await session.execute(delete(DeadLetter).where(DeadLetter.id.in_(orphans)))
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import IdempotencyKey
+from metrics import track_db_time
+from ._dialect import upsert
+
+
+@track_db_time
+async def claim_idempotency_key(
+    session: AsyncSession,
+    key: str,
+    fingerprint: str,
+    timeout: float,
+    ttl: float = 0,
+) -> IdempotencyKey | None:
+    """
+    Claim an idempotency key for processing a request.
+
+    A key left unfinished for longer than `timeout` seconds belongs to a
+    request that was abandoned, so it is claimed again. A key claimed more
+    than `ttl` seconds ago has expired and is claimed anew by any request.
+
+    :param session: Async database session.
+    :param key: Idempotency key.
+    :param fingerprint: Digest of the request.
+    :param timeout: Seconds after which an unfinished key is abandoned.
+    :param ttl: Seconds after which a key expires, 0 if keys never expire.
+    :return: None if the key was claimed, otherwise the row of the request
+        that claimed it before.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = (
+        upsert(session, IdempotencyKey)
+        .values(key=key, fingerprint=fingerprint, created_at=now)
+        .on_conflict_do_nothing(index_elements=["key"])
+        .returning(IdempotencyKey.key)
+    )
+    claimed = (await session.execute(stmt)).scalar_one_or_none()
+    if claimed is None:
+        reclaimable = and_(
+            IdempotencyKey.fingerprint == fingerprint,
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.created_at < now - timedelta(seconds=timeout),
+        )
+        if ttl:
+            reclaimable = or_(
+                reclaimable, IdempotencyKey.created_at < now - timedelta(seconds=ttl)
+            )
+        result = await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, reclaimable)
+            .values(
+                fingerprint=fingerprint,
+                status_code=None,
+                response=None,
+                created_at=now,
+            )
+        )
+        claimed = key if result.rowcount else None
+    await session.commit()
+
+    if claimed is not None:
+        return None
+    return await get_idempotency_key(session, key)
+
+
+@track_db_time
+async def get_idempotency_key(
+    session: AsyncSession,
+    key: str,
+) -> IdempotencyKey | None:
+    """
+    Get an idempotency key.
+
+    :param session: Async database session.
+    :param key: Idempotency key.
+    :return: IdempotencyKey object or None if the key is unknown.
+    """
+    result = await session.execute(
+        select(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+@track_db_time
+async def save_idempotent_response(
+    session: AsyncSession,
+    key: str,
+    status_code: int,
+    response: bytes,
+) -> None:
+    """
+    Store the final response of a request with an idempotency key.
+
+    :param session: Async database session.
+    :param key: Idempotency key.
+    :param status_code: HTTP status code of the response.
+    :param response: Response body.
+    """
+    await session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status_code=status_code, response=response)
+    )
+    await session.commit()
+
+
+@track_db_time
+async def release_idempotency_key(session: AsyncSession, key: str) -> None:
+    """
+    Forget an idempotency key whose request failed, so it can be retried.
+
+    :param session: Async database session.
+    :param key: Idempotency key.
+    """
+    await session.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+    await session.commit()
+
+
+@track_db_time
+async def delete_expired_idempotency_keys(
+    session: AsyncSession,
+    before: datetime,
+    limit: int,
+) -> int:
+    """
+    Delete one batch of idempotency keys claimed before a time.
+
+    :param session: Async database session.
+    :param before: Keys claimed earlier are deleted.
+    :param limit: Maximum number of keys to delete.
+    :return: Number of deleted keys.
+    """
+    expired = (
+        select(IdempotencyKey.key)
+        .where(IdempotencyKey.created_at < before)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.key.in_(expired))
+    )
+    await session.commit()
+    return result.rowcount
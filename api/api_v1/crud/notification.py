@@ -1,18 +1,262 @@
-from datetime import datetime, timezone
-from typing import List
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    bindparam,
+    delete,
+    insert,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from database.models import Document, Notification, NotificationDocument
+from database import blob_storage
+from database.models import (
+    Document,
+    DocumentFileId,
+    Notification,
+    NotificationDocument,
+    NotificationStatus,
+)
+from metrics import track_db_time
+from ._dialect import upsert
 
 
+def document_digest(buffer: bytes) -> str:
+    """
+    Compute the content digest of a document.
+
+    :param buffer: File content.
+    :return: Hex-encoded SHA-256 of the file content.
+    """
+    return hashlib.sha256(buffer).hexdigest()
+
+
+@track_db_time
+async def resolve_documents(
+    session: AsyncSession,
+    documents: List[Document],
+    digests: List[str] | None = None,
+) -> List[Document]:
+    """
+    Find the stored copies of documents, storing the new ones.
+
+    All documents are looked up by their digest in a single query and the
+    missing ones are inserted in a single statement. Documents inserted
+    concurrently by another request are picked up instead of failing.
+
+    :param session: Async database session.
+    :param documents: List of files.
+    :param digests: Digests of the files if they are already known.
+    :return: Stored documents in the order of `documents`.
+    """
+    digests = digests or [document_digest(doc.buffer) for doc in documents]
+    keys = [(digest, doc.name) for digest, doc in zip(digests, documents)]
+    stored = await _find_documents(session, keys)
+
+    missing = {
+        key: doc.buffer for doc, key in zip(documents, keys) if key not in stored
+    }
+    if missing:
+        # The blob is written first, so a row never points to missing content
+        for (sha256, _), buffer in missing.items():
+            await blob_storage.put(sha256, buffer)
+
+        stmt = (
+            upsert(session, Document)
+            .on_conflict_do_nothing(index_elements=["sha256", "name"])
+            .returning(Document)
+        )
+        result = await session.scalars(
+            stmt,
+            [
+                {
+                    "sha256": sha256,
+                    "name": name,
+                    "size": len(buffer),
+                    "mime": mimetypes.guess_type(name)[0],
+                    "buffer": (buffer if blob_storage.stores_in_database else None),
+                }
+                for (sha256, name), buffer in missing.items()
+            ],
+        )
+        for document in result:
+            key = (document.sha256, document.name)
+            stored[key] = document
+            set_committed_value(document, "file_ids", [])
+            if blob_storage.stores_in_database:
+                # Spare the storage a round trip for the content at hand
+                set_committed_value(document, "buffer", missing[key])
+
+        # Lost a race against a concurrent insert of the same document
+        if lost := [key for key in missing if key not in stored]:
+            stored.update(await _find_documents(session, lost))
+
+    return [stored[key] for key in keys]
+
+
+async def _find_documents(
+    session: AsyncSession,
+    keys: List[Tuple[str, str]],
+) -> Dict[Tuple[str, str], Document]:
+    digests = list(dict.fromkeys(sha256 for sha256, _ in keys))
+    stmt = (
+        select(Document)
+        .where(Document.sha256.in_(digests))
+        .options(selectinload(Document.file_ids))
+        # Keeps the garbage collection off the documents until they are
+        # attached to the new notifications
+        .with_for_update(read=True, key_share=True)
+    )
+    result = await session.execute(stmt)
+    return {(document.sha256, document.name): document for document in result.scalars()}
+
+
+@dataclass
+class NotificationDraft:
+    """A notification to be sent to several chats."""
+
+    chat_ids: List[int]
+    message: str
+    button_url: str | None = None
+    documents: List[Document] | None = None
+    digests: List[str] | None = None
+    scheduled_at: datetime | None = None
+
+
+@track_db_time
+async def create_notification_batch(
+    session: AsyncSession,
+    drafts: List[NotificationDraft],
+    status: NotificationStatus = NotificationStatus.PENDING,
+) -> List[List[Notification]]:
+    """
+    Create notifications of several drafts in database.
+
+    Everything is written in one transaction: the documents of all drafts are
+    stored at once, the notifications are inserted by a single
+    `INSERT ... RETURNING` and the association rows by a single executemany.
+
+    :param session: Async database session.
+    :param drafts: Notifications to create.
+    :param status: Initial delivery status of the drafts that are not
+        scheduled.
+    :return: Notification objects of every draft in the order of its `chat_ids`.
+    """
+    documents = [doc for draft in drafts for doc in draft.documents or []]
+    digests = [
+        digest
+        for draft in drafts
+        for digest in draft.digests
+        or [document_digest(doc.buffer) for doc in draft.documents or []]
+    ]
+    stored = await resolve_documents(session, documents, digests) if documents else []
+    stored_documents = []
+    for draft in drafts:
+        count = len(draft.documents or [])
+        stored_documents.append(stored[:count])
+        stored = stored[count:]
+
+    created_at = datetime.now(timezone.utc)
+    claimed_at = created_at if status == NotificationStatus.PROCESSING else None
+    rows = [
+        {
+            "chat_id": chat_id,
+            "message": draft.message,
+            "button_url": draft.button_url,
+            "created_at": created_at,
+            "status": NotificationStatus.SCHEDULED if draft.scheduled_at else status,
+            "claimed_at": None if draft.scheduled_at else claimed_at,
+            "scheduled_at": draft.scheduled_at,
+        }
+        for draft in drafts
+        for chat_id in draft.chat_ids
+    ]
+    # RETURNING rows follow the parameters, so every draft gets its own rows
+    result = await session.scalars(
+        insert(Notification).returning(Notification, sort_by_parameter_order=True),
+        rows,
+    )
+    created = iter(result.all())
+    notifications = [[next(created) for _ in draft.chat_ids] for draft in drafts]
+
+    associations = [
+        {
+            "notification_id": notification.id,
+            "document_id": document.id,
+            "created_at": created_at,
+        }
+        for group, group_documents in zip(notifications, stored_documents)
+        for notification in group
+        for document in dict.fromkeys(group_documents)
+    ]
+    if associations:
+        await session.execute(insert(NotificationDocument), associations)
+
+    await session.commit()
+
+    # The documents are already at hand, there is no need to load them again
+    for group, group_documents in zip(notifications, stored_documents):
+        for notification in group:
+            set_committed_value(notification, "documents", group_documents)
+    return notifications
+
+
+@track_db_time
+async def create_notifications(
+    session: AsyncSession,
+    chat_ids: List[int],
+    message: str,
+    button_url: str | None = None,
+    documents: List[Document] | None = None,
+    status: NotificationStatus = NotificationStatus.PENDING,
+    digests: List[str] | None = None,
+    scheduled_at: datetime | None = None,
+) -> List[Notification]:
+    """
+    Create notifications for several chats in database.
+
+    :param session: Async database session.
+    :param chat_ids: Telegram chat ids.
+    :param message: Text to send.
+    :param button_url: Optional URL for an inline button in the message.
+    :param documents: List of files to send.
+    :param status: Initial delivery status.
+    :param digests: Digests of the files if they are already known.
+    :param scheduled_at: Time of delivery; the notifications are created
+        with the `scheduled` status if set.
+    :return: Notification objects in the order of `chat_ids`.
+    """
+    draft = NotificationDraft(
+        chat_ids=chat_ids,
+        message=message,
+        button_url=button_url,
+        documents=documents,
+        digests=digests,
+        scheduled_at=scheduled_at,
+    )
+    notifications = await create_notification_batch(session, [draft], status)
+    return notifications[0]
+
+
+@track_db_time
 async def create_notification(
     session: AsyncSession,
     chat_id: int,
     message: str,
     button_url: str | None = None,
     documents: List[Document] | None = None,
+    status: NotificationStatus = NotificationStatus.PENDING,
 ) -> Notification:
     """
     Create a notification in database.
@@ -22,40 +266,569 @@ async def create_notification(
     :param message: Text to send.
     :param button_url: Optional URL for an inline button in the message.
     :param documents: List of files to send.
+    :param status: Initial delivery status.
     :return: Notification object.
     """
-    notification = Notification(
-        chat_id=chat_id,
+    notifications = await create_notifications(
+        session=session,
+        chat_ids=[chat_id],
         message=message,
         button_url=button_url,
-        created_at=datetime.now(timezone.utc),
+        documents=documents,
+        status=status,
+    )
+    return notifications[0]
+
+
+@track_db_time
+async def get_notifications(
+    session: AsyncSession,
+    limit: int,
+    chat_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    statuses: List[NotificationStatus] | None = None,
+    after: Tuple[datetime, int] | None = None,
+    with_documents: bool = False,
+) -> List[Notification]:
+    """
+    Get notifications, the newest first.
+
+    Pages are read by keyset: the next page starts after the `(created_at,
+    id)` of the last notification of the previous one, so deep pages cost as
+    much as the first one.
+
+    :param session: Async database session.
+    :param limit: Maximum number of notifications.
+    :param chat_id: Only notifications to this chat.
+    :param created_from: Only notifications created at or after this time.
+    :param created_to: Only notifications created before this time.
+    :param statuses: Only notifications with these statuses.
+    :param after: `(created_at, id)` of the last notification of the
+        previous page.
+    :param with_documents: Whether to load the documents; their contents are
+        never loaded.
+    :return: Notifications ordered by `created_at` and `id` descending.
+    """
+    stmt = (
+        select(Notification)
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit)
+    )
+    if chat_id is not None:
+        stmt = stmt.where(Notification.chat_id == chat_id)
+    if created_from is not None:
+        stmt = stmt.where(Notification.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Notification.created_at < created_to)
+    if statuses:
+        stmt = stmt.where(Notification.status.in_(statuses))
+    if after is not None:
+        stmt = stmt.where(tuple_(Notification.created_at, Notification.id) < after)
+    if with_documents:
+        stmt = stmt.options(selectinload(Notification.documents))
+
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+@track_db_time
+async def claim_notifications(
+    session: AsyncSession,
+    limit: int,
+    lease_timeout: int,
+    coalesce_window: float = 0,
+    chat_windows: Dict[int, float] | None = None,
+) -> List[Notification]:
+    """
+    Claim unsent notifications for delivery.
+
+    Rows are locked with `FOR UPDATE SKIP LOCKED`, so concurrent workers never
+    claim the same notification. Rows claimed by a worker that did not finish
+    within `lease_timeout` seconds are claimed again, as are retries not
+    attempted within `lease_timeout` seconds after they were due.
+
+    Pending notifications of a coalesced chat are held back until the oldest
+    of them is older than the chat's window, then they are claimed together.
+
+    :param session: Async database session.
+    :param limit: Maximum number of notifications to claim.
+    :param lease_timeout: Seconds after which a claim is considered abandoned.
+    :param coalesce_window: Coalescing window of the chats in seconds.
+    :param chat_windows: Coalescing windows overridden for single chats.
+    :return: Claimed notifications with their documents and file ids loaded.
+    """
+    now = datetime.now(timezone.utc)
+    abandoned = now - timedelta(seconds=lease_timeout)
+    condition = or_(
+        and_(
+            Notification.status == NotificationStatus.PENDING,
+            _ripe(now, coalesce_window, chat_windows or {}),
+        ),
+        and_(
+            Notification.status == NotificationStatus.PROCESSING,
+            Notification.claimed_at < abandoned,
+        ),
+        # Retries of a process that is gone
+        and_(
+            Notification.status == NotificationStatus.RETRYING,
+            Notification.next_attempt_at < abandoned,
+        ),
+    )
+    return await _claim(session, condition, now, limit)
+
+
+@track_db_time
+async def claim_abandoned(
+    session: AsyncSession,
+    limit: int,
+    lease_timeout: int,
+) -> List[Notification]:
+    """
+    Claim notifications whose delivery was abandoned by a process that is gone.
+
+    Without the outbox nothing else picks up a notification claimed for a
+    direct delivery that never finished, or a retry not attempted within
+    `lease_timeout` seconds after it was due.
+
+    :param session: Async database session.
+    :param limit: Maximum number of notifications to claim.
+    :param lease_timeout: Seconds after which a claim is considered abandoned.
+    :return: Claimed notifications with their documents and file ids loaded.
+    """
+    now = datetime.now(timezone.utc)
+    abandoned = now - timedelta(seconds=lease_timeout)
+    condition = or_(
+        and_(
+            Notification.status == NotificationStatus.PROCESSING,
+            Notification.claimed_at < abandoned,
+        ),
+        and_(
+            Notification.status == NotificationStatus.RETRYING,
+            Notification.next_attempt_at < abandoned,
+        ),
+    )
+    return await _claim(session, condition, now, limit)
+
+
+@track_db_time
+async def claim_retries(
+    session: AsyncSession,
+    notification_ids: List[int],
+) -> List[Notification]:
+    """
+    Claim retrying notifications for their next delivery attempt.
+
+    Notifications claimed by another process in the meantime are skipped.
+
+    :param session: Async database session.
+    :param notification_ids: Notification ids.
+    :return: Claimed notifications with their documents and file ids loaded.
+    """
+    condition = and_(
+        Notification.id.in_(notification_ids),
+        Notification.status == NotificationStatus.RETRYING,
     )
-    session.add(notification)
-    await session.flush()
+    return await _claim(session, condition, datetime.now(timezone.utc))
+
+
+@track_db_time
+async def get_retry_schedule(
+    session: AsyncSession,
+    until: datetime,
+    limit: int,
+) -> List[Tuple[int, datetime]]:
+    """
+    Get the retrying notifications due until a time, the earliest first.
+
+    :param session: Async database session.
+    :param until: Upper bound of the time of the next attempt.
+    :param limit: Maximum number of notifications.
+    :return: Notification ids with the times of their next attempts.
+    """
+    result = await session.execute(
+        select(Notification.id, Notification.next_attempt_at)
+        .where(
+            Notification.status == NotificationStatus.RETRYING,
+            Notification.next_attempt_at <= until,
+        )
+        .order_by(Notification.next_attempt_at, Notification.id)
+        .limit(limit)
+    )
+    return [(notification_id, due) for notification_id, due in result]
+
+
+@track_db_time
+async def get_scheduled_notifications(
+    session: AsyncSession,
+    until: datetime,
+    limit: int,
+) -> List[Tuple[int, datetime]]:
+    """
+    Get the scheduled notifications due until a time, the earliest first.
 
-    if documents:
-        for doc in documents:
-            stmt = select(Document).where(
-                Document.name == doc.name, Document.buffer == doc.buffer
+    Notifications already due are included, so ones a previous run did not
+    release are not lost.
+
+    :param session: Async database session.
+    :param until: Upper bound of the time of delivery.
+    :param limit: Maximum number of notifications.
+    :return: Notification ids with their times of delivery.
+    """
+    result = await session.execute(
+        select(Notification.id, Notification.scheduled_at)
+        .where(
+            Notification.status == NotificationStatus.SCHEDULED,
+            Notification.scheduled_at <= until,
+        )
+        .order_by(Notification.scheduled_at, Notification.id)
+        .limit(limit)
+    )
+    return [(notification_id, due) for notification_id, due in result]
+
+
+@track_db_time
+async def release_scheduled(
+    session: AsyncSession,
+    notification_ids: List[int],
+) -> int:
+    """
+    Queue due scheduled notifications in the outbox.
+
+    Notifications released by another process in the meantime are skipped.
+
+    :param session: Async database session.
+    :param notification_ids: Notification ids.
+    :return: Number of released notifications.
+    """
+    result = await session.execute(
+        update(Notification)
+        .where(
+            Notification.id.in_(notification_ids),
+            Notification.status == NotificationStatus.SCHEDULED,
+        )
+        .values(status=NotificationStatus.PENDING)
+    )
+    await session.commit()
+    return result.rowcount
+
+
+@track_db_time
+async def claim_scheduled(
+    session: AsyncSession,
+    notification_ids: List[int],
+) -> List[Notification]:
+    """
+    Claim due scheduled notifications for delivery.
+
+    Notifications claimed by another process in the meantime are skipped.
+
+    :param session: Async database session.
+    :param notification_ids: Notification ids.
+    :return: Claimed notifications with their documents and file ids loaded.
+    """
+    condition = and_(
+        Notification.id.in_(notification_ids),
+        Notification.status == NotificationStatus.SCHEDULED,
+    )
+    return await _claim(session, condition, datetime.now(timezone.utc))
+
+
+async def _claim(
+    session: AsyncSession,
+    condition: ColumnElement[bool],
+    now: datetime,
+    limit: int | None = None,
+) -> List[Notification]:
+    stmt = (
+        select(Notification)
+        .where(condition)
+        .order_by(Notification.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .options(selectinload(Notification.documents).selectinload(Document.file_ids))
+    )
+    result = await session.execute(stmt)
+    notifications = list(result.scalars().all())
+
+    if notifications:
+        await session.execute(
+            update(Notification)
+            .where(Notification.id.in_([n.id for n in notifications]))
+            .values(status=NotificationStatus.PROCESSING, claimed_at=now)
+        )
+    await session.commit()
+    return notifications
+
+
+def _ripe(
+    now: datetime,
+    coalesce_window: float,
+    chat_windows: Dict[int, float],
+) -> ColumnElement[bool]:
+    if not coalesce_window and not any(chat_windows.values()):
+        return true()
+
+    windows: Dict[float, List[int]] = {}
+    for chat_id, window in chat_windows.items():
+        windows.setdefault(window, []).append(chat_id)
+
+    def in_window(table, window: float) -> ColumnElement[bool]:
+        chats = table.chat_id.in_(windows.get(window, []))
+        if window == coalesce_window:
+            chats = or_(chats, table.chat_id.notin_(list(chat_windows)))
+        return and_(chats, table.created_at <= now - timedelta(seconds=window))
+
+    pending = aliased(Notification)
+    ripe_chats = select(pending.chat_id).where(
+        pending.status == NotificationStatus.PENDING,
+        or_(
+            *(
+                in_window(pending, window)
+                for window in {coalesce_window, *windows}
+                if window
             )
-            result = await session.execute(stmt)
-            existing_doc = result.scalars().first()
-
-            if existing_doc:
-                document = existing_doc
-            else:
-                document = Document(
-                    name=doc.name,
-                    buffer=doc.buffer,
-                )
-                session.add(document)
-                await session.flush()
-
-            session.add(
-                NotificationDocument(
-                    notification_id=notification.id, document_id=document.id
-                )
+        ),
+    )
+
+    # Chats without a window are never held back
+    if coalesce_window:
+        not_coalesced = Notification.chat_id.in_(windows.get(0, []))
+    else:
+        not_coalesced = Notification.chat_id.notin_(
+            [chat_id for chat_id, window in chat_windows.items() if window]
+        )
+    return or_(not_coalesced, Notification.chat_id.in_(ripe_chats))
+
+
+@track_db_time
+async def set_notification_digests(
+    session: AsyncSession,
+    digests: Dict[int, int],
+) -> None:
+    """
+    Record which notifications were merged into one message.
+
+    :param session: Async database session.
+    :param digests: Notification ids mapped to the id of the notification
+        whose message carried them.
+    """
+    if not digests:
+        return
+
+    await session.execute(
+        update(Notification),
+        [
+            {"id": notification_id, "digest_id": digest_id}
+            for notification_id, digest_id in digests.items()
+        ],
+    )
+    await session.commit()
+
+
+@dataclass
+class DeliveryRecord:
+    """Outcome of a delivery attempt of a notification."""
+
+    notification_id: int
+    status: NotificationStatus
+    bot_id: int | None = None
+    error: str | None = None
+    sent_at: datetime | None = None
+    message_ids: List[int] | None = None
+    latency_ms: int | None = None
+    next_attempt_at: datetime | None = None
+
+
+@track_db_time
+async def record_deliveries(
+    session: AsyncSession,
+    records: List[DeliveryRecord],
+) -> None:
+    """
+    Store the outcome of delivery attempts.
+
+    All notifications are updated by a single executemany, counting the
+    attempt and replacing the outcome of the previous one.
+
+    :param session: Async database session.
+    :param records: Delivery outcomes.
+    """
+    if not records:
+        return
+
+    table = Notification.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            status=bindparam("b_status"),
+            attempts=table.c.attempts + 1,
+            bot_id=bindparam("b_bot_id"),
+            last_error=bindparam("b_error"),
+            sent_at=bindparam("b_sent_at"),
+            telegram_message_ids=bindparam("b_message_ids"),
+            send_latency_ms=bindparam("b_latency_ms"),
+            next_attempt_at=bindparam("b_next_attempt_at"),
+        )
+    )
+    await session.execute(
+        stmt,
+        [
+            {
+                "b_id": record.notification_id,
+                "b_status": record.status,
+                "b_bot_id": record.bot_id,
+                "b_error": record.error,
+                "b_sent_at": record.sent_at,
+                "b_message_ids": record.message_ids,
+                "b_latency_ms": record.latency_ms,
+                "b_next_attempt_at": record.next_attempt_at,
+            }
+            for record in records
+        ],
+    )
+    await session.commit()
+
+
+@track_db_time
+async def save_document_file_ids(
+    session: AsyncSession,
+    file_ids: Dict[Tuple[int, int], str],
+) -> None:
+    """
+    Store the Telegram file ids of uploaded documents.
+
+    A file id stored concurrently for the same document and bot is kept.
+
+    :param session: Async database session.
+    :param file_ids: File ids by document id and bot id.
+    """
+    if not file_ids:
+        return
+
+    await session.execute(
+        upsert(session, DocumentFileId).on_conflict_do_nothing(
+            index_elements=["document_id", "bot_id"]
+        ),
+        [
+            {"document_id": document_id, "bot_id": bot_id, "file_id": file_id}
+            for (document_id, bot_id), file_id in file_ids.items()
+        ],
+    )
+    await session.commit()
+
+
+@track_db_time
+async def update_notification_status(
+    session: AsyncSession,
+    notification_ids: List[int],
+    status: NotificationStatus,
+) -> None:
+    """
+    Set the delivery status of notifications.
+
+    :param session: Async database session.
+    :param notification_ids: Notification ids.
+    :param status: New delivery status.
+    """
+    if not notification_ids:
+        return
+
+    await session.execute(
+        update(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .values(status=status)
+    )
+    await session.commit()
+
+
+@track_db_time
+async def delete_expired_notifications(
+    session: AsyncSession,
+    before: datetime,
+    limit: int,
+) -> int:
+    """
+    Delete one batch of notifications created before a time.
+
+    Used where the table is not partitioned; partitions are dropped whole.
+
+    :param session: Async database session.
+    :param before: Notifications created earlier are deleted.
+    :param limit: Maximum number of notifications to delete.
+    :return: Number of deleted notifications.
+    """
+    notification_ids = list(
+        await session.scalars(
+            select(Notification.id)
+            .where(Notification.created_at < before)
+            .order_by(Notification.id)
+            .limit(limit)
+        )
+    )
+    if notification_ids:
+        await session.execute(
+            delete(NotificationDocument).where(
+                NotificationDocument.notification_id.in_(notification_ids)
             )
+        )
+        await session.execute(
+            delete(Notification).where(Notification.id.in_(notification_ids))
+        )
+    await session.commit()
+    return len(notification_ids)
+
+
+@track_db_time
+async def delete_orphan_documents(session: AsyncSession, limit: int) -> int:
+    """
+    Delete one batch of documents no notification is attached to.
+
+    Documents locked by a request that is attaching them are skipped. The
+    contents of the deleted documents are deleted from the blob storage
+    unless another document has the same digest.
 
+    :param session: Async database session.
+    :param limit: Maximum number of documents to delete.
+    :return: Number of deleted documents.
+    """
+    attached = (
+        select(NotificationDocument.document_id)
+        .where(NotificationDocument.document_id == Document.id)
+        .exists()
+    )
+    document_ids = list(
+        await session.scalars(
+            select(Document.id)
+            .where(~attached)
+            .order_by(Document.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    )
+    digests: Set[str] = set()
+    if document_ids:
+        await session.execute(
+            delete(DocumentFileId).where(DocumentFileId.document_id.in_(document_ids))
+        )
+        # Attached while the documents were looked up
+        digests.update(
+            await session.scalars(
+                delete(Document)
+                .where(Document.id.in_(document_ids), ~attached)
+                .returning(Document.sha256)
+            )
+        )
+        # Blobs are shared by every document with the same content
+        digests.difference_update(
+            await session.scalars(
+                select(Document.sha256).where(Document.sha256.in_(digests))
+            )
+        )
     await session.commit()
-    return notification
+
+    # Deleted once the rows are gone, a blob never goes missing under a row
+    for sha256 in digests:
+        await blob_storage.delete(sha256)
+    return len(document_ids)
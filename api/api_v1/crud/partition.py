@@ -0,0 +1,255 @@
+import re
+from datetime import date, datetime, time, timezone
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from metrics import track_db_time
+
+# Referenced tables first: partitions are created in this order and dropped
+# in the reverse one
+PARTITIONED_TABLES = ("notification", "notification_document")
+
+
+def month_start(day: date) -> date:
+    """
+    Get the first day of the month of a date.
+
+    :param day: Date.
+    :return: First day of its month.
+    """
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Shift the first day of a month by a number of months.
+
+    :param month: First day of a month.
+    :param months: Number of months, may be negative.
+    :return: First day of the shifted month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """
+    Get the name of the partition of a table holding a month.
+
+    :param table: Partitioned table.
+    :param month: First day of the month.
+    :return: Partition name, e.g. `notification_p2026_10`.
+    """
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """
+    Get the name of the default partition of a table.
+
+    :param table: Partitioned table.
+    :return: Partition name, e.g. `notification_default`.
+    """
+    return f"{table}_default"
+
+
+@track_db_time
+async def is_partitioned(session: AsyncSession, table: str) -> bool:
+    """
+    Check whether a table is partitioned.
+
+    Only PostgreSQL tables are, the tables of other databases are plain.
+
+    :param session: Async database session.
+    :param table: Table name.
+    :return: True if the table is partitioned.
+    """
+    if session.bind.dialect.name != "postgresql":
+        return False
+
+    return bool(
+        await session.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table))"
+            ),
+            {"table": table},
+        )
+    )
+
+
+@track_db_time
+async def lock_partitions(session: AsyncSession, lock_timeout: float = 5) -> bool:
+    """
+    Take the lock of the partition maintenance for the current transaction.
+
+    Every application process runs the maintenance, only one at a time
+    changes the partitions. Statements of the transaction give up waiting for
+    table locks after `lock_timeout` seconds rather than stall the requests
+    queued behind them.
+
+    :param session: Async database session.
+    :param lock_timeout: Seconds to wait for a table lock.
+    :return: True if the lock was taken, False if another process holds it.
+    """
+    locked = await session.scalar(
+        text("SELECT pg_try_advisory_xact_lock(hashtext('partition_maintenance'))")
+    )
+    await session.execute(
+        text(f"SET LOCAL lock_timeout = '{int(lock_timeout * 1000)}ms'")
+    )
+    return bool(locked)
+
+
+@track_db_time
+async def get_partitions(session: AsyncSession, table: str) -> Dict[date, str]:
+    """
+    Get the monthly partitions of a table.
+
+    Partitions not named by `partition_name` are left out.
+
+    :param session: Async database session.
+    :param table: Partitioned table.
+    :return: Partition names by the first day of their month.
+    """
+    result = await session.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    pattern = re.compile(rf"{re.escape(table)}_p(\d{{4}})_(\d{{2}})")
+    partitions = {}
+    for name in result:
+        if match := pattern.fullmatch(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+@track_db_time
+async def create_partitions(
+    session: AsyncSession,
+    table: str,
+    months: List[date],
+) -> None:
+    """
+    Create the monthly partitions of a table that do not exist yet.
+
+    :param session: Async database session.
+    :param table: Partitioned table.
+    :param months: First days of the months.
+    """
+    for month in months:
+        lower = datetime.combine(month, time(), timezone.utc)
+        upper = datetime.combine(add_months(month, 1), time(), timezone.utc)
+        # Bounds of partitions cannot be bound parameters
+        await session.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" '
+                f'PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+
+
+@track_db_time
+async def split_default_partitions(session: AsyncSession) -> List[date]:
+    """
+    Move the rows of the default partitions to monthly partitions.
+
+    Rows land in the default partition when their month has no partition,
+    e.g. when the maintenance did not run for longer than the partitions
+    created ahead last. A partition cannot be created while the default one
+    holds rows of its month: the rows of both tables are moved aside, the
+    partitions created and the rows put back.
+
+    :param session: Async database session.
+    :return: First days of the months moved.
+    """
+    defaults = [default_partition_name(table) for table in PARTITIONED_TABLES]
+    exists = await session.scalar(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": defaults[0]}
+    )
+    if not exists:
+        return []
+
+    result = await session.scalars(
+        text(
+            " UNION ".join(
+                "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')"
+                f'::date FROM "{name}"'
+                for name in defaults
+            )
+        )
+    )
+    months = sorted(result)
+    for month in months:
+        bounds = {
+            "lower": datetime.combine(month, time(), timezone.utc),
+            "upper": datetime.combine(add_months(month, 1), time(), timezone.utc),
+        }
+        # The referencing rows first, they are not deleted in a cascade then
+        for table, name in reversed(list(zip(PARTITIONED_TABLES, defaults))):
+            await session.execute(
+                text(
+                    f'CREATE TEMPORARY TABLE "{table}_moved" (LIKE "{table}") '
+                    "ON COMMIT DROP"
+                )
+            )
+            await session.execute(
+                text(
+                    f'WITH moved AS (DELETE FROM "{name}" '
+                    "WHERE created_at >= :lower AND created_at < :upper "
+                    "RETURNING *) "
+                    f'INSERT INTO "{table}_moved" SELECT * FROM moved'
+                ),
+                bounds,
+            )
+        for table in PARTITIONED_TABLES:
+            await create_partitions(session, table, [month])
+            await session.execute(
+                text(f'INSERT INTO "{table}" SELECT * FROM "{table}_moved"')
+            )
+            await session.execute(text(f'DROP TABLE "{table}_moved"'))
+    return months
+
+
+@track_db_time
+async def drop_partition(
+    session: AsyncSession,
+    table: str,
+    name: str,
+    detach_only: bool = False,
+) -> None:
+    """
+    Remove a partition from its table.
+
+    A detached partition is kept as a standalone table, e.g. for archiving;
+    its foreign keys are dropped, so the partitions it referenced can be
+    removed as well.
+
+    :param session: Async database session.
+    :param table: Partitioned table.
+    :param name: Partition name.
+    :param detach_only: Whether to keep the partition as a table.
+    """
+    await session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    if not detach_only:
+        await session.execute(text(f'DROP TABLE "{name}"'))
+        return
+
+    foreign_keys = await session.scalars(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+        ),
+        {"name": name},
+    )
+    for constraint in list(foreign_keys):
+        await session.execute(
+            text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"')
+        )
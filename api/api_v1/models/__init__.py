@@ -1,8 +1,38 @@
 __all__ = (
+    "CHAT_GROUP_NAME_PATTERN",
+    "ChatGroupCreateRequest",
+    "ChatGroupResponse",
+    "ChatGroupSummary",
+    "ChatGroupUpdateRequest",
+    "DeadLetterReplayRequest",
+    "DeadLetterReplayResponse",
+    "DeadLetterResponse",
+    "DeliveryResult",
+    "DeliveryStatus",
     "Document",
+    "DocumentInfo",
+    "NotificationBatchItem",
+    "NotificationBatchResponse",
+    "NotificationHistoryItem",
+    "NotificationHistoryResponse",
     "NotificationRequest",
     "NotificationResponse",
 )
 
+from .batch import NotificationBatchItem, NotificationBatchResponse
+from .chat_group import (
+    CHAT_GROUP_NAME_PATTERN,
+    ChatGroupCreateRequest,
+    ChatGroupResponse,
+    ChatGroupSummary,
+    ChatGroupUpdateRequest,
+)
+from .dead_letter import (
+    DeadLetterReplayRequest,
+    DeadLetterReplayResponse,
+    DeadLetterResponse,
+)
+from .delivery import DeliveryResult, DeliveryStatus
 from .document import Document
+from .history import DocumentInfo, NotificationHistoryItem, NotificationHistoryResponse
 from .notification import NotificationRequest, NotificationResponse
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class NotificationBatchItem(BaseModel):
+    index: int = Field(
+        ...,
+        description="Position of the notification in the batch, starting from 0",
+        examples=[0],
+    )
+    notificationIds: List[int] = Field(
+        default_factory=list,
+        description="IDs of the created notifications, one per chat. Empty if the item was rejected",
+        examples=[[1, 2]],
+    )
+    error: str | None = Field(
+        None,
+        description="Reason the item was rejected",
+        examples=[None],
+    )
+
+
+class NotificationBatchResponse(BaseModel):
+    createdAt: datetime = Field(
+        ...,
+        description="Time the notifications were stored in ISO 8601 format",
+        examples=["2024-06-06T12:00:02Z"],
+    )
+    items: List[NotificationBatchItem] = Field(
+        ...,
+        description="Results in the order of the request items",
+    )
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+# Names are used in URLs and as `audience` of notifications
+CHAT_GROUP_NAME_PATTERN = r"^[A-Za-z0-9_.-]{1,64}$"
+
+
+class ChatGroupCreateRequest(BaseModel):
+    name: str = Field(
+        ...,
+        pattern=CHAT_GROUP_NAME_PATTERN,
+        description="Unique name of the group: up to 64 letters, digits, `_`, `.` or `-`",
+        examples=["oncall-backend"],
+    )
+    chatIds: List[int] = Field(
+        default_factory=list,
+        description="Chat or channel IDs of the members",
+        examples=[[123456789, 987654321]],
+    )
+
+
+class ChatGroupUpdateRequest(BaseModel):
+    chatIds: List[int] = Field(
+        ...,
+        description="Chat or channel IDs of the members, replacing the current ones",
+        examples=[[123456789, 987654321]],
+    )
+
+
+class ChatGroupSummary(BaseModel):
+    name: str = Field(..., description="Name of the group", examples=["oncall-backend"])
+    version: int = Field(
+        ...,
+        description="Version of the members, bumped on every change",
+        examples=[1],
+    )
+    size: int = Field(..., description="Number of members", examples=[2])
+    createdAt: datetime = Field(
+        ...,
+        description="Time the group was created in ISO 8601 format",
+        examples=["2024-06-06T12:00:02Z"],
+    )
+    updatedAt: datetime = Field(
+        ...,
+        description="Time the members were last changed in ISO 8601 format",
+        examples=["2024-06-06T12:00:02Z"],
+    )
+
+
+class ChatGroupResponse(ChatGroupSummary):
+    chatIds: List[int] = Field(
+        ...,
+        description="Chat or channel IDs of the members in ascending order",
+        examples=[[123456789, 987654321]],
+    )
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DeadLetterResponse(BaseModel):
+    id: int = Field(..., description="Dead letter ID", examples=[1])
+    notificationId: int = Field(
+        ...,
+        description="ID of the notification that ran out of delivery attempts",
+        examples=[42],
+    )
+    error: str | None = Field(
+        None,
+        description="Error of the last delivery attempt",
+        examples=["Failed to send message to 123456789: Request timeout error"],
+    )
+    attempts: int = Field(..., description="Number of delivery attempts", examples=[5])
+    createdAt: datetime = Field(
+        ...,
+        description="Time the notification was given up on in ISO 8601 format",
+        examples=["2024-06-06T12:00:02Z"],
+    )
+    replayedAt: datetime | None = Field(
+        None,
+        description="Time the notification was queued for delivery again",
+        examples=[None],
+    )
+
+
+class DeadLetterReplayRequest(BaseModel):
+    ids: List[int] | None = Field(
+        None,
+        description="IDs of the dead letters to replay, all that were not replayed yet if omitted",
+        examples=[[1, 2]],
+    )
+
+
+class DeadLetterReplayResponse(BaseModel):
+    notificationIds: List[int] = Field(
+        default_factory=list,
+        description="IDs of the notifications queued for delivery again",
+        examples=[[42, 43]],
+    )
@@ -0,0 +1,57 @@
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+class DeliveryStatus(str, Enum):
+    SENT = "sent"
+    FAILED = "failed"
+    RETRYING = "retrying"
+
+
+class DeliveryResult(BaseModel):
+    chatId: int = Field(
+        ...,
+        description="Chat or channel ID the message was sent to",
+        examples=[123456789],
+    )
+    status: DeliveryStatus = Field(
+        ...,
+        description="Delivery status for this chat",
+        examples=[DeliveryStatus.SENT],
+    )
+    error: str | None = Field(
+        None,
+        description="Error description if the delivery failed",
+        examples=[None],
+    )
+    messageIds: List[int] = Field(
+        default_factory=list,
+        description="IDs of the Telegram messages sent to this chat",
+        examples=[[42, 43]],
+    )
+    botId: int | None = Field(
+        None,
+        description="Telegram ID of the bot that served this chat",
+        examples=[1234567890],
+    )
+    sentAt: datetime | None = Field(
+        None,
+        description="Time Telegram accepted the message in ISO 8601 format",
+        examples=["2024-06-06T12:00:01Z"],
+    )
+    latencyMs: int | None = Field(
+        None,
+        description="Time the delivery took in milliseconds, rate limit waits included",
+        examples=[180],
+    )
+    retryAt: datetime | None = Field(
+        None,
+        description="Time of the next delivery attempt if the delivery is retried",
+        examples=[None],
+    )
+
+    # Minimum seconds before a retry, None if the failure is permanent
+    _retry_hint: float | None = PrivateAttr(None)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import Base64Bytes, BaseModel, Field
 
 
 class Document(BaseModel):
-    buffer: bytes = Field(..., description="Byte buffer of the document")
+    # Decoded once during validation, the rest of the application works with raw bytes
+    buffer: Base64Bytes = Field(..., description="File in Base64 format")
     name: str = Field(..., description="Name of the document")
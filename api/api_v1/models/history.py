@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DocumentInfo(BaseModel):
+    id: int = Field(..., description="Document ID", examples=[1])
+    name: str = Field(..., description="Name of the document", examples=["Report.pdf"])
+    size: int = Field(..., description="Size of the document in bytes", examples=[1024])
+    mime: str | None = Field(
+        None,
+        description="MIME type guessed from the name",
+        examples=["application/pdf"],
+    )
+    sha256: str = Field(
+        ...,
+        description="Hex-encoded SHA-256 of the content",
+        examples=["9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"],
+    )
+
+
+class NotificationHistoryItem(BaseModel):
+    id: int = Field(..., description="Notification ID", examples=[1])
+    chatId: int = Field(
+        ...,
+        description="Chat or channel ID the notification is addressed to",
+        examples=[123456789],
+    )
+    message: str = Field(
+        ...,
+        description="Message body in MarkdownV2 format",
+        examples=["Hello, this is a message with *markdown* formatting"],
+    )
+    buttonUrl: str | None = Field(
+        None,
+        description="URL of the inline button in the message",
+        examples=["https://example.com"],
+    )
+    status: str = Field(
+        ...,
+        description="Delivery status: `scheduled`, `pending`, `processing`, `retrying`, `sent` or `failed`",
+        examples=["sent"],
+    )
+    createdAt: datetime = Field(
+        ...,
+        description="Time the notification was created in ISO 8601 format",
+        examples=["2024-06-06T12:00:02Z"],
+    )
+    scheduledAt: datetime | None = Field(
+        None,
+        description="Requested time of delivery of a scheduled notification",
+        examples=[None],
+    )
+    sentAt: datetime | None = Field(
+        None,
+        description="Time Telegram accepted the message in ISO 8601 format",
+        examples=["2024-06-06T12:00:03Z"],
+    )
+    attempts: int = Field(..., description="Number of delivery attempts", examples=[1])
+    lastError: str | None = Field(
+        None,
+        description="Error of the last delivery attempt if it failed",
+        examples=[None],
+    )
+    botId: int | None = Field(
+        None,
+        description="Telegram ID of the bot that delivered the notification",
+        examples=[1234567890],
+    )
+    messageIds: List[int] = Field(
+        default_factory=list,
+        description="IDs of the Telegram messages the notification was sent as",
+        examples=[[42]],
+    )
+    latencyMs: int | None = Field(
+        None,
+        description="Time the last delivery attempt took in milliseconds",
+        examples=[180],
+    )
+    documents: List[DocumentInfo] | None = Field(
+        None,
+        description="Attached documents without their contents, only if requested",
+    )
+
+
+class NotificationHistoryResponse(BaseModel):
+    items: List[NotificationHistoryItem] = Field(
+        ...,
+        description="Notifications, the newest first",
+    )
+    nextCursor: str | None = Field(
+        None,
+        description="Cursor of the next page, null on the last page",
+        examples=["WyIyMDI0LTA2LTA2VDEyOjAwOjAyKzAwOjAwIiwxXQ"],
+    )
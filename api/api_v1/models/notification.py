@@ -1,17 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from .delivery import DeliveryResult
 from .document import Document
 
 
 class NotificationRequest(BaseModel):
     chatIds: List[int] = Field(
-        ...,
-        description="List of chat or channel IDs where the message will be sent",
+        default_factory=list,
+        description="List of chat or channel IDs where the message will be sent. May be omitted if `audience` is set.",
         examples=[[123456789, 987654321]],
     )
+    audience: str | None = Field(
+        None,
+        description="Optional name of a chat group whose members receive the message as well",
+        examples=["oncall-backend"],
+    )
     message: str = Field(
         ...,
         description="Message body in MarkdownV2 format",
@@ -32,6 +38,21 @@ class NotificationRequest(BaseModel):
             ]
         ],
     )
+    sendAt: datetime | None = Field(
+        None,
+        description="Optional time of delivery in ISO 8601 format; the notification is scheduled if it is in the future. Times without a time zone are in UTC.",
+        examples=["2024-06-07T09:00:00Z"],
+    )
+
+    @field_validator("sendAt")
+    @classmethod
+    def check_time_zone(cls, send_at: datetime | None) -> datetime | None:
+        """
+        Read times without a time zone as UTC.
+        """
+        if send_at is not None and send_at.tzinfo is None:
+            return send_at.replace(tzinfo=timezone.utc)
+        return send_at
 
 
 class NotificationResponse(NotificationRequest):
@@ -40,3 +61,12 @@ class NotificationResponse(NotificationRequest):
         description="Time of notification sending in ISO 8601 format",
         examples=["2024-06-06T12:00:02Z"],
     )
+    notificationIds: List[int] = Field(
+        default_factory=list,
+        description="IDs of the created notifications, one per chat",
+        examples=[[1, 2]],
+    )
+    results: List[DeliveryResult] = Field(
+        default_factory=list,
+        description="Per-chat delivery results. Empty if delivery was queued",
+    )
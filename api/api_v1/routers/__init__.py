@@ -1,10 +1,14 @@
 from fastapi import APIRouter
 
 from config import config
+from .admin import router as admin_router
+from .chat_group import router as chat_group_router
 from .notification import router as notification_router
 
 routers_list = [
     notification_router,
+    chat_group_router,
+    admin_router,
 ]
 
 routers = APIRouter(
@@ -0,0 +1,110 @@
+from typing import List
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    status,
+    Depends,
+    HTTPException,
+    Query,
+    Security,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import get_dead_letters, replay_dead_letters
+from api.api_v1.models import (
+    DeadLetterReplayRequest,
+    DeadLetterReplayResponse,
+    DeadLetterResponse,
+)
+from api.api_v1.services import outbox, verify_token
+from config import config
+from database import session_manager
+from database.models import NotificationStatus
+
+router = APIRouter(prefix="/admin", tags=[config.api.tags.admin])
+
+
+@router.get(
+    "/dead-letters",
+    response_model=List[DeadLetterResponse],
+    summary="List dead letters",
+    response_description="Notifications that ran out of delivery attempts",
+)
+async def get_dead_letters_list(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items"),
+    include_replayed: bool = Query(
+        False,
+        alias="includeReplayed",
+        description="Whether to include dead letters that were replayed",
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    List the notifications that ran out of delivery attempts, the oldest first.
+    """
+    dead_letters = await get_dead_letters(session, limit, include_replayed)
+    return [
+        DeadLetterResponse(
+            id=dead_letter.id,
+            notificationId=dead_letter.notification_id,
+            error=dead_letter.error,
+            attempts=dead_letter.attempts,
+            createdAt=dead_letter.created_at,
+            replayedAt=dead_letter.replayed_at,
+        )
+        for dead_letter in dead_letters
+    ]
+
+
+@router.post(
+    "/dead-letters:replay",
+    response_model=DeadLetterReplayResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Replay dead letters",
+    response_description="Notifications were queued for delivery again",
+)
+async def post_dead_letters_replay(
+    background_tasks: BackgroundTasks,
+    replay_request: DeadLetterReplayRequest | None = None,
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Queue the notifications of dead letters for delivery again.
+
+    The notifications start over with no delivery attempts made. Without
+    `ids`, all dead letters that were not replayed yet are replayed, up to the
+    batch size limit.
+    """
+    # In outbox mode the rows are the queue, otherwise they are sent right
+    # after the response
+    initial_status = (
+        NotificationStatus.PENDING
+        if config.outbox.enabled
+        else NotificationStatus.PROCESSING
+    )
+
+    try:
+        notifications = await replay_dead_letters(
+            session=session,
+            dead_letter_ids=replay_request.ids if replay_request else None,
+            status=initial_status,
+            limit=config.api.batch_max_size,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"DB error: {str(e)}",
+        )
+
+    if notifications:
+        if config.outbox.enabled:
+            outbox.notify()
+        else:
+            background_tasks.add_task(outbox.deliver_claimed, notifications)
+
+    return DeadLetterReplayResponse(
+        notificationIds=[notification.id for notification in notifications]
+    )
@@ -0,0 +1,207 @@
+from typing import List
+
+from fastapi import (
+    APIRouter,
+    status,
+    Depends,
+    HTTPException,
+    Path,
+    Response,
+    Security,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    count_chat_group_members,
+    create_chat_group,
+    delete_chat_group,
+    get_chat_group_members,
+    get_chat_groups,
+    replace_chat_group_members,
+)
+from api.api_v1.models import (
+    CHAT_GROUP_NAME_PATTERN,
+    ChatGroupCreateRequest,
+    ChatGroupResponse,
+    ChatGroupSummary,
+    ChatGroupUpdateRequest,
+)
+from api.api_v1.services import verify_token
+from config import config
+from database import session_manager
+from database.models import ChatGroup
+
+router = APIRouter(prefix="/chat-groups", tags=[config.api.tags.chat_group])
+
+
+@router.get(
+    "",
+    response_model=List[ChatGroupSummary],
+    summary="List chat groups",
+    response_description="Chat groups without their members",
+)
+async def get_chat_groups_list(
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    List the chat groups ordered by name, with the number of their members.
+    """
+    chat_groups = await get_chat_groups(session)
+    sizes = await count_chat_group_members(
+        session, [chat_group.id for chat_group in chat_groups]
+    )
+    return [
+        chat_group_summary(chat_group, sizes[chat_group.id])
+        for chat_group in chat_groups
+    ]
+
+
+@router.post(
+    "",
+    response_model=ChatGroupResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a chat group",
+    response_description="Chat group was created",
+)
+async def post_chat_group(
+    chat_group_request: ChatGroupCreateRequest,
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Create a chat group:
+
+    - `name` (String): Unique name, used as `audience` of notifications
+    - `chatIds` (Array of integers): Chat or channel IDs of the members
+    """
+    chat_group = await create_chat_group(
+        session, chat_group_request.name, chat_group_request.chatIds
+    )
+    if chat_group is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Chat group {chat_group_request.name} already exists",
+        )
+    return await chat_group_response(session, chat_group)
+
+
+@router.get(
+    "/{name}",
+    response_model=ChatGroupResponse,
+    summary="Get a chat group",
+    response_description="Chat group with its members",
+)
+async def get_chat_group(
+    name: str = Path(
+        ..., pattern=CHAT_GROUP_NAME_PATTERN, description="Name of the chat group"
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Get a chat group with its members.
+    """
+    chat_groups = await get_chat_groups(session, [name])
+    if not chat_groups:
+        raise not_found(name)
+    return await chat_group_response(session, chat_groups[0])
+
+
+@router.put(
+    "/{name}",
+    response_model=ChatGroupResponse,
+    summary="Replace the members of a chat group",
+    response_description="Members were replaced",
+)
+async def put_chat_group(
+    chat_group_request: ChatGroupUpdateRequest,
+    name: str = Path(
+        ..., pattern=CHAT_GROUP_NAME_PATTERN, description="Name of the chat group"
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Replace the members of a chat group:
+
+    - `chatIds` (Array of integers): Chat or channel IDs of the members
+
+    The version of the group is bumped, so every process reloads the members
+    the next time the group is an `audience`.
+    """
+    chat_group = await replace_chat_group_members(
+        session, name, chat_group_request.chatIds
+    )
+    if chat_group is None:
+        raise not_found(name)
+    return await chat_group_response(session, chat_group)
+
+
+@router.delete(
+    "/{name}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a chat group",
+    response_description="Chat group was deleted",
+)
+async def delete_chat_group_by_name(
+    name: str = Path(
+        ..., pattern=CHAT_GROUP_NAME_PATTERN, description="Name of the chat group"
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Delete a chat group. Notifications already sent to it are kept.
+    """
+    if not await delete_chat_group(session, name):
+        raise not_found(name)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def chat_group_summary(chat_group: ChatGroup, size: int) -> ChatGroupSummary:
+    """
+    Describe a chat group without its members.
+
+    :param chat_group: Chat group.
+    :param size: Number of its members.
+    :return: Chat group summary.
+    """
+    return ChatGroupSummary(
+        name=chat_group.name,
+        version=chat_group.version,
+        size=size,
+        createdAt=chat_group.created_at,
+        updatedAt=chat_group.updated_at,
+    )
+
+
+async def chat_group_response(
+    session: AsyncSession, chat_group: ChatGroup
+) -> ChatGroupResponse:
+    """
+    Describe a chat group with its members.
+
+    :param session: Async database session.
+    :param chat_group: Chat group.
+    :return: Chat group response.
+    """
+    members = await get_chat_group_members(session, [chat_group.id])
+    chat_ids = members[chat_group.id]
+    return ChatGroupResponse(
+        **chat_group_summary(chat_group, len(chat_ids)).model_dump(),
+        chatIds=chat_ids,
+    )
+
+
+def not_found(name: str) -> HTTPException:
+    """
+    Build the error of an unknown chat group.
+
+    :param name: Group name.
+    :return: 404 error.
+    """
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Chat group {name} not found",
+    )
@@ -1,19 +1,164 @@
-from fastapi import APIRouter, status, Depends, HTTPException, Security
-from fastapi.security.api_key import APIKeyHeader
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    status,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    Security,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.api_v1.crud import create_notification
-from api.api_v1.models import NotificationResponse, NotificationRequest
+from api.api_v1.crud import (
+    NotificationDraft,
+    create_notification_batch,
+    create_notifications,
+    get_notifications,
+    save_document_file_ids,
+)
+from api.api_v1.models import (
+    DeliveryStatus,
+    Document,
+    NotificationBatchItem,
+    NotificationBatchResponse,
+    NotificationHistoryResponse,
+    NotificationResponse,
+    NotificationRequest,
+)
 
-from api.api_v1.services import generate_token
+from api.api_v1.services import (
+    NDJSON_MEDIA_TYPES,
+    BatchTooLargeError,
+    StoredResponse,
+    UploadedDocument,
+    audiences,
+    decode_cursor,
+    encode_cursor,
+    fan_out,
+    history_item,
+    idempotency,
+    map_uploads,
+    ndjson_lines,
+    outbox,
+    read_batch,
+    retries,
+    scheduler,
+    verify_token,
+)
 
 from config import config
 from database import session_manager
+from database.models import NotificationStatus
 from tg_bot.bot import BotService
 
 router = APIRouter(tags=[config.api.tags.notification])
 
-api_key_header = APIKeyHeader(name="Authorization")
+
+@router.get(
+    "/notifications",
+    response_model=NotificationHistoryResponse,
+    summary="List sent notifications",
+    response_description="One page of notifications, the newest first",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Cursor of the next page (NDJSON only)",
+                    "schema": {"type": "string"},
+                }
+            },
+        }
+    },
+)
+async def get_notifications_history(
+    request: Request,
+    chat_id: int | None = Query(
+        None, alias="chatId", description="Only notifications to this chat"
+    ),
+    created_from: datetime | None = Query(
+        None,
+        alias="createdFrom",
+        description="Only notifications created at or after this time",
+    ),
+    created_to: datetime | None = Query(
+        None,
+        alias="createdTo",
+        description="Only notifications created before this time",
+    ),
+    statuses: List[NotificationStatus] | None = Query(
+        None, alias="status", description="Only notifications with these statuses"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items"),
+    cursor: str | None = Query(None, description="`nextCursor` of the previous page"),
+    include_documents: bool = Query(
+        False,
+        alias="includeDocuments",
+        description="Whether to include the attached documents, without contents",
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    List notifications, the newest first:
+
+    - `chatId` (Integer | Null): Only notifications to this chat
+    - `createdFrom`, `createdTo` (String | Null): Time range in ISO 8601 format
+    - `status` (String, repeated | Null): Only notifications with these statuses
+    - `limit` (Integer): Page size, at most 1000
+    - `cursor` (String | Null): `nextCursor` of the previous page
+    - `includeDocuments` (Boolean): Whether to include the document metadata
+
+    Pages are read by keyset over `(createdAt, id)`, so deep pages are as
+    cheap as the first one and rows added meanwhile do not shift them.
+
+    With `Accept: application/x-ndjson` the items are streamed one per line
+    and the next cursor is sent in the `X-Next-Cursor` header.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    notifications = await get_notifications(
+        session=session,
+        limit=limit,
+        chat_id=chat_id,
+        created_from=created_from,
+        created_to=created_to,
+        statuses=statuses,
+        after=after,
+        with_documents=include_documents,
+    )
+    items = [
+        history_item(notification, include_documents) for notification in notifications
+    ]
+    next_cursor = (
+        encode_cursor(notifications[-1]) if len(notifications) == limit else None
+    )
+
+    accept = request.headers.get("accept", "")
+    if any(media_type in accept for media_type in NDJSON_MEDIA_TYPES):
+        return StreamingResponse(
+            ndjson_lines(items),
+            media_type="application/x-ndjson",
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None,
+        )
+    return NotificationHistoryResponse(items=items, nextCursor=next_cursor)
 
 
 @router.post(
@@ -25,68 +170,504 @@ api_key_header = APIKeyHeader(name="Authorization")
 )
 async def post_notifications(
     notification_request: NotificationRequest,
-    token: str = Security(api_key_header),
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Optional key making retries of the request safe",
+    ),
+    token: str = Security(verify_token),
     session: AsyncSession = Depends(session_manager.session_getter),
 ):
     """
     Send a notification:
 
     - `chatIds` (Array of integers): List of chat or channel IDs where the message will be sent
+    - `audience` (String | Null): Optional name of a chat group whose members receive the message as well
     - `message` (String): Message body in MarkdownV2 format
     - `buttonUrl` (String | Null): Optional URL for an inline button in the message
     - `documents` (Array of Document objects | Null)
         - `buffer` (String): File in Base64 format
         - `name` (String): Document name
+    - `sendAt` (String | Null): Optional time of delivery in ISO 8601 format
+
+    A notification with a future `sendAt` is stored with the `scheduled`
+    status and the request returns 202 with its IDs; it is delivered when
+    due.
+
+    Chats are served concurrently. The response contains a delivery result for
+    every chat. Deliveries failing with a transient error are retried in the
+    background and reported as `retrying`. The request fails with 502 only if
+    all deliveries failed for good, and returns 202 if nothing was sent yet
+    but some deliveries are retried.
+
+    If the outbox is enabled, the notifications are only queued and the request
+    returns 202 with their IDs; background workers deliver them.
+
+    A request repeated with the same `Idempotency-Key` header gets the response
+    of the first one without sending anything again.
+
+    With an `audience`, the members of the chat group are added to `chatIds`;
+    `chatIds` may then be omitted. The response lists all chats the message
+    was addressed to.
     """
-    generated_token = generate_token()
-    if token != generated_token:
+    if not notification_request.chatIds and notification_request.audience is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid token",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="chatIds must not be empty",
         )
-
-    if not notification_request.chatIds:
+    if not notification_request.message.strip() and not notification_request.documents:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="chatIds must not be empty",
+            detail="message must not be empty without documents",
+        )
+
+    if idempotency_key is None:
+        return await dispatch_notifications(
+            session=session,
+            response=response,
+            chat_ids=await resolve_recipients(
+                session, notification_request.chatIds, notification_request.audience
+            ),
+            audience=notification_request.audience,
+            message=notification_request.message,
+            button_url=notification_request.buttonUrl,
+            documents=notification_request.documents,
+            response_documents=notification_request.documents,
+            send_at=notification_request.sendAt,
         )
 
-    created_at = None
-    for chat_id in notification_request.chatIds:
+    # The body has already been read for validation, hashing it is cheap
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+    stored = await idempotency.begin(session, idempotency_key, fingerprint)
+    if stored is not None:
+        # Documents are not stored, the repeated request carries the same ones
+        replayed = NotificationResponse.model_validate_json(stored.body)
+        replayed.documents = notification_request.documents
+        response.status_code = stored.status_code
+        return replayed
+
+    try:
         try:
-            notification = await create_notification(
+            notification_response = await dispatch_notifications(
                 session=session,
-                chat_id=chat_id,
+                response=response,
+                chat_ids=await resolve_recipients(
+                    session,
+                    notification_request.chatIds,
+                    notification_request.audience,
+                ),
+                audience=notification_request.audience,
                 message=notification_request.message,
                 button_url=notification_request.buttonUrl,
                 documents=notification_request.documents,
+                response_documents=notification_request.documents,
+                send_at=notification_request.sendAt,
             )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"DB error: {str(e)}",
-            )
+        except BaseException:
+            # A cancelled request (client gone, shutdown) releases its key too
+            await idempotency.abort(session, idempotency_key)
+            raise
+
+        stored = StoredResponse(
+            fingerprint=fingerprint,
+            status_code=response.status_code or status.HTTP_201_CREATED,
+            # Echoed documents would keep every upload in the table and the cache
+            body=notification_response.model_dump_json(exclude={"documents"}).encode(),
+        )
+        await idempotency.finish(session, idempotency_key, stored)
+    finally:
+        # Local duplicates must not wait for a request that is gone
+        idempotency.resolve(idempotency_key)
+    return notification_response
+
+
+@router.post(
+    "/notifications/upload",
+    response_model=NotificationResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Send a notification with files uploaded as multipart/form-data",
+    response_description="Notification was sent",
+)
+async def post_notifications_upload(
+    response: Response,
+    chatIds: List[int] = Form(
+        [],
+        description="Chat or channel IDs where the message will be sent, one field per ID",
+    ),
+    audience: str | None = Form(
+        None,
+        description="Optional name of a chat group whose members receive the message as well",
+    ),
+    message: str = Form(..., description="Message body in MarkdownV2 format"),
+    buttonUrl: str | None = Form(
+        None, description="Optional URL for an inline button in the message"
+    ),
+    documents: List[UploadFile] | None = File(
+        None, description="Optional attached documents"
+    ),
+    sendAt: datetime | None = Form(
+        None, description="Optional time of delivery in ISO 8601 format"
+    ),
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Send a notification with attachments uploaded as `multipart/form-data`:
+
+    - `chatIds` (Integer, repeated): Chat or channel IDs where the message will be sent
+    - `audience` (String | Null): Optional name of a chat group whose members receive the message as well
+    - `message` (String): Message body in MarkdownV2 format
+    - `buttonUrl` (String | Null): Optional URL for an inline button in the message
+    - `documents` (File, repeated | Null): Attached documents
+    - `sendAt` (String | Null): Optional time of delivery in ISO 8601 format
 
+    Large files are streamed to temporary files instead of being sent in
+    Base64 inside JSON. The response does not echo the documents back.
+    """
+    if not chatIds and audience is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="chatIds must not be empty",
+        )
+    if not message.strip() and not documents:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="message must not be empty without documents",
+        )
+
+    documents = documents or []
+    uploaded = await map_uploads(documents)
+    try:
+        return await dispatch_notifications(
+            session=session,
+            response=response,
+            chat_ids=await resolve_recipients(session, chatIds, audience),
+            audience=audience,
+            message=message,
+            button_url=buttonUrl,
+            documents=uploaded,
+            digests=[document.sha256 for document in uploaded],
+            send_at=sendAt,
+        )
+    finally:
+        for document in documents:
+            await document.close()
+
+
+@router.post(
+    "/notifications:batch",
+    response_model=NotificationBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Send many different notifications at once",
+    response_description="Notifications were queued",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/NotificationRequest"},
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/NotificationRequest"}
+                },
+            },
+        }
+    },
+)
+async def post_notifications_batch(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    token: str = Security(verify_token),
+    session: AsyncSession = Depends(session_manager.session_getter),
+):
+    """
+    Send many notifications, each with its own message, in one request.
+
+    The body is a JSON array of notifications in the format of
+    `POST /notifications`, or NDJSON (`Content-Type: application/x-ndjson`)
+    with one notification per line.
+
+    Valid notifications are stored in one transaction and delivered in the
+    background, or when due if they have a future `sendAt`, so the request
+    returns 202 right away. The response holds a
+    result for every item in the request order; invalid items are reported
+    with an error and skipped.
+
+    The audiences of all items are resolved at once, from the in-process
+    cache or in one query.
+    """
+    try:
+        items = await read_batch(request, config.api.batch_max_size)
+    except BatchTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid batch: {str(e)}",
+        )
+
+    results = [
+        NotificationBatchItem(index=index, error=item)
+        for index, item in enumerate(items)
+        if isinstance(item, str)
+    ]
+    requests = [
+        (index, item)
+        for index, item in enumerate(items)
+        if isinstance(item, NotificationRequest)
+    ]
+    members = await audiences.resolve(
+        session, [item.audience for _, item in requests if item.audience is not None]
+    )
+    valid = []
+    for index, item in requests:
         try:
-            await BotService.send_message(
-                chat_id=chat_id,
-                text=notification_request.message,
-                button_url=notification_request.buttonUrl,
-                files=notification_request.documents,
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"BOT error: {str(e)}",
+            valid.append(
+                (index, item, recipients(item.chatIds, item.audience, members))
             )
+        except ValueError as e:
+            results.append(NotificationBatchItem(index=index, error=str(e)))
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[result.model_dump() for result in results]
+            or "Batch must not be empty",
+        )
+
+    # In outbox mode the rows are the queue, otherwise they are sent right
+    # after the response
+    initial_status = (
+        NotificationStatus.PENDING
+        if config.outbox.enabled
+        else NotificationStatus.PROCESSING
+    )
+
+    try:
+        notifications = await create_notification_batch(
+            session=session,
+            drafts=[
+                NotificationDraft(
+                    chat_ids=chat_ids,
+                    message=item.message,
+                    button_url=item.buttonUrl,
+                    documents=item.documents,
+                    scheduled_at=scheduled_time(item.sendAt),
+                )
+                for _, item, chat_ids in valid
+            ],
+            status=initial_status,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"DB error: {str(e)}",
+        )
+
+    due = []
+    for group in notifications:
+        for notification in group:
+            if notification.scheduled_at is None:
+                due.append(notification)
+            else:
+                scheduler.schedule(notification.id, notification.scheduled_at)
+
+    if config.outbox.enabled:
+        outbox.notify()
+    elif due:
+        background_tasks.add_task(outbox.deliver_claimed, due)
+
+    results.extend(
+        NotificationBatchItem(
+            index=index,
+            notificationIds=[notification.id for notification in group],
+        )
+        for (index, _, _), group in zip(valid, notifications)
+    )
+    results.sort(key=lambda result: result.index)
+    return NotificationBatchResponse(
+        createdAt=notifications[0][0].created_at,
+        items=results,
+    )
+
+
+async def dispatch_notifications(
+    session: AsyncSession,
+    response: Response,
+    chat_ids: List[int],
+    message: str,
+    button_url: str | None = None,
+    documents: List[Document | UploadedDocument] | None = None,
+    response_documents: List[Document] | None = None,
+    digests: List[str] | None = None,
+    send_at: datetime | None = None,
+    audience: str | None = None,
+) -> NotificationResponse:
+    """
+    Store notifications and either deliver them, queue them in the outbox or
+    schedule them.
+
+    :param session: Async database session.
+    :param response: Response whose status code is set to 202 when queued.
+    :param chat_ids: Telegram chat ids.
+    :param message: Text to send.
+    :param button_url: Optional URL for an inline button in the message.
+    :param documents: List of files to send.
+    :param response_documents: Documents echoed back in the response.
+    :param digests: Digests of the files if they are already known.
+    :param send_at: Time of delivery, the notifications are sent right away if
+        it is not in the future.
+    :param audience: Chat group echoed back in the response, its members are
+        already in `chat_ids`.
+    :return: Notification response.
+    """
+    scheduled_at = scheduled_time(send_at)
+    # In outbox mode the rows are the queue, otherwise they are sent right away
+    initial_status = (
+        NotificationStatus.PENDING
+        if config.outbox.enabled
+        else NotificationStatus.PROCESSING
+    )
 
-        # Use the latest time for the answer
-        created_at = notification.created_at
+    try:
+        notifications = await create_notifications(
+            session=session,
+            chat_ids=chat_ids,
+            message=message,
+            button_url=button_url,
+            documents=documents,
+            status=initial_status,
+            digests=digests,
+            scheduled_at=scheduled_at,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"DB error: {str(e)}",
+        )
+
+    created_at = notifications[0].created_at
+    notification_ids = [notification.id for notification in notifications]
+
+    if scheduled_at is not None or config.outbox.enabled:
+        if scheduled_at is not None:
+            for notification_id in notification_ids:
+                scheduler.schedule(notification_id, scheduled_at)
+        else:
+            outbox.notify()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return NotificationResponse(
+            chatIds=chat_ids,
+            audience=audience,
+            message=message,
+            buttonUrl=button_url,
+            documents=response_documents,
+            sendAt=send_at,
+            createdAt=created_at,
+            notificationIds=notification_ids,
+        )
+
+    results = await fan_out(
+        chat_ids=chat_ids,
+        text=message,
+        button_url=button_url,
+        files=notifications[0].documents,
+    )
+
+    await save_document_file_ids(session, BotService.take_new_file_ids())
+    await retries.record(session, notifications, dict(zip(notification_ids, results)))
+
+    # A partial failure is reported per chat, only a total one fails the request
+    if all(result.status == DeliveryStatus.FAILED for result in results):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"BOT error: {'; '.join(result.error for result in results)}",
+        )
+    # Nothing was sent yet, but the transient failures are retried
+    if not any(result.status == DeliveryStatus.SENT for result in results):
+        response.status_code = status.HTTP_202_ACCEPTED
 
     return NotificationResponse(
-        chatIds=notification_request.chatIds,
-        message=notification_request.message,
-        buttonUrl=notification_request.buttonUrl,
-        documents=notification_request.documents,
+        chatIds=chat_ids,
+        audience=audience,
+        message=message,
+        buttonUrl=button_url,
+        documents=response_documents,
+        sendAt=send_at,
         createdAt=created_at,
+        notificationIds=notification_ids,
+        results=results,
     )
+
+
+def scheduled_time(send_at: datetime | None) -> datetime | None:
+    """
+    Get the time a notification is scheduled for.
+
+    :param send_at: Requested time of delivery, naive times are in UTC.
+    :return: The time of delivery if it is in the future, otherwise None.
+    """
+    if send_at is None:
+        return None
+    if send_at.tzinfo is None:
+        send_at = send_at.replace(tzinfo=timezone.utc)
+    return send_at if send_at > datetime.now(timezone.utc) else None
+
+
+async def resolve_recipients(
+    session: AsyncSession,
+    chat_ids: List[int],
+    audience: str | None,
+) -> List[int]:
+    """
+    Get the chats a notification request is sent to.
+
+    :param session: Async database session.
+    :param chat_ids: Chats listed in the request.
+    :param audience: Chat group named in the request.
+    :return: Listed chats followed by the members of the audience.
+    :raises HTTPException: 422 if the audience is unknown or there is no chat.
+    """
+    members = await audiences.resolve(session, [audience]) if audience else {}
+    try:
+        return recipients(chat_ids, audience, members)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+
+def recipients(
+    chat_ids: List[int],
+    audience: str | None,
+    members: Dict[str, Sequence[int]],
+) -> List[int]:
+    """
+    Get the chats a notification is sent to.
+
+    :param chat_ids: Chats listed in the request.
+    :param audience: Chat group named in the request.
+    :param members: Members of the resolved chat groups by name.
+    :return: Listed chats followed by the members of the audience not listed.
+    :raises ValueError: If the audience is unknown or there is no chat.
+    """
+    if audience is None:
+        if not chat_ids:
+            raise ValueError("chatIds must not be empty")
+        return chat_ids
+
+    if audience not in members:
+        raise ValueError(f"audience: Unknown chat group {audience}")
+    chat_ids = list(dict.fromkeys([*chat_ids, *members[audience]]))
+    if not chat_ids:
+        raise ValueError(f"audience: Chat group {audience} has no members")
+    return chat_ids
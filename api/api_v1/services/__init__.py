@@ -1,3 +1,42 @@
-__all__ = ("generate_token",)
+__all__ = (
+    "NDJSON_MEDIA_TYPES",
+    "AudienceCache",
+    "BatchTooLargeError",
+    "MaintenanceTask",
+    "NotificationScheduler",
+    "RetryScheduler",
+    "StoredResponse",
+    "TokenVerifier",
+    "UploadedDocument",
+    "audiences",
+    "decode_cursor",
+    "delivery_record",
+    "encode_cursor",
+    "fan_out",
+    "generate_token",
+    "history_item",
+    "idempotency",
+    "maintenance",
+    "map_uploads",
+    "ndjson_lines",
+    "outbox",
+    "read_batch",
+    "retries",
+    "scheduler",
+    "send_to_chat",
+    "token_verifier",
+    "verify_token",
+)
 
+from .audience import AudienceCache, audiences
+from .auth import TokenVerifier, token_verifier, verify_token
+from .batch import NDJSON_MEDIA_TYPES, BatchTooLargeError, read_batch
+from .fanout import delivery_record, fan_out, send_to_chat
 from .generate_token import generate_token
+from .history import decode_cursor, encode_cursor, history_item, ndjson_lines
+from .idempotency import StoredResponse, idempotency
+from .maintenance import MaintenanceTask, maintenance
+from .outbox import outbox
+from .retry import RetryScheduler, retries
+from .scheduler import NotificationScheduler, scheduler
+from .upload import UploadedDocument, map_uploads
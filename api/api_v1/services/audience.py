@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import get_chat_group_members, get_chat_groups
+from config import config
+
+
+class AudienceCache:
+    """
+    Members of the chat groups named as `audience` of notifications.
+
+    Memberships are kept in an in-process LRU cache together with the id and
+    version of their group. Resolving reads only the versions of the named
+    groups; the members are loaded, in one query for all of them, only for the
+    groups new to the cache or changed since, in any process.
+    """
+
+    def __init__(self, cache_size: int = 256) -> None:
+        self.cache_size = cache_size
+
+        # Group name -> (group id, version, member chat ids)
+        self._groups: OrderedDict[str, Tuple[int, int, Tuple[int, ...]]] = OrderedDict()
+
+    async def resolve(
+        self,
+        session: AsyncSession,
+        names: List[str],
+    ) -> Dict[str, Tuple[int, ...]]:
+        """
+        Get the members of chat groups.
+
+        :param session: Async database session.
+        :param names: Group names.
+        :return: Telegram chat ids of the members by group name. Unknown
+            groups are left out.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        resolved = {}
+        stale = {}
+        for chat_group in await get_chat_groups(session, names):
+            cached = self._get(chat_group.name)
+            if cached is not None and cached[:2] == (chat_group.id, chat_group.version):
+                resolved[chat_group.name] = cached[2]
+            else:
+                stale[chat_group.id] = chat_group
+
+        if stale:
+            # Members changed after the versions were read are cached under
+            # the old version, so they are merely loaded again next time
+            members = await get_chat_group_members(session, list(stale))
+            for chat_group_id, chat_group in stale.items():
+                chat_ids = tuple(members[chat_group_id])
+                self._put(
+                    chat_group.name, (chat_group_id, chat_group.version, chat_ids)
+                )
+                resolved[chat_group.name] = chat_ids
+
+        for name in names:
+            if name not in resolved:
+                self._groups.pop(name, None)
+        return resolved
+
+    def _get(self, name: str) -> Tuple[int, int, Tuple[int, ...]] | None:
+        cached = self._groups.get(name)
+        if cached is not None:
+            self._groups.move_to_end(name)
+        return cached
+
+    def _put(self, name: str, cached: Tuple[int, int, Tuple[int, ...]]) -> None:
+        self._groups[name] = cached
+        self._groups.move_to_end(name)
+        if len(self._groups) > self.cache_size:
+            self._groups.popitem(last=False)
+
+
+audiences = AudienceCache(cache_size=config.api.audience_cache_size)
@@ -0,0 +1,95 @@
+import hashlib
+import hmac
+import time
+from typing import Dict, List
+
+from fastapi import HTTPException, Security, status
+from fastapi.security.api_key import APIKeyHeader
+
+from config import config
+
+api_key_header = APIKeyHeader(name="Authorization")
+
+
+class TokenVerifier:
+    """
+    Verifier of the time-based API tokens.
+
+    A token is the HMAC of a Unix timestamp. Tokens of the current second and
+    of `skew` seconds around it are accepted. Their HMACs are computed once per
+    second, a verification compares the token with each of them in constant
+    time.
+
+    A token carries no nonce: every client computes the same token within a
+    second, so a token cannot be accepted only once.
+    """
+
+    def __init__(self, access_token: str, skew: int = 1) -> None:
+        self.key = access_token.encode()
+        self.skew = skew
+
+        self._second: int | None = None
+        self._window: Dict[int, str] = {}
+        self._expected: List[bytes] = []
+
+    def generate(self, timestamp: int) -> str:
+        """
+        Generate the token of a second.
+
+        :param timestamp: Unix timestamp.
+        :return: A token for the API request.
+        """
+        token = self._window.get(timestamp)
+        if token is None:
+            token = hmac.new(
+                self.key, str(timestamp).encode(), hashlib.sha256
+            ).hexdigest()
+        return token
+
+    def verify(self, token: str, now: float | None = None) -> bool:
+        """
+        Verify a token.
+
+        :param token: Token from the `Authorization` header.
+        :param now: Current Unix time.
+        :return: True if the token is valid.
+        """
+        now = time.time() if now is None else now
+        self._slide(int(now))
+
+        token = token.encode()
+        # Every token of the window is compared, a match does not end it early
+        matches = [hmac.compare_digest(expected, token) for expected in self._expected]
+        return any(matches)
+
+    def _slide(self, second: int) -> None:
+        if second == self._second:
+            return
+
+        window = {}
+        for timestamp in range(second - self.skew, second + self.skew + 1):
+            window[timestamp] = self.generate(timestamp)
+        self._window = window
+        self._expected = [token.encode() for token in window.values()]
+        self._second = second
+
+
+token_verifier = TokenVerifier(
+    access_token=config.api.access_token,
+    skew=config.api.token_skew,
+)
+
+
+async def verify_token(token: str = Security(api_key_header)) -> str:
+    """
+    Check the token of the API request.
+
+    :param token: Token from the `Authorization` header.
+    :return: The verified token.
+    """
+    if not token_verifier.verify(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid token",
+        )
+    return token
@@ -0,0 +1,92 @@
+import json
+from typing import Any, List
+
+from fastapi import Request
+from pydantic import ValidationError
+
+from api.api_v1.models import NotificationRequest
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+class BatchTooLargeError(ValueError):
+    pass
+
+
+async def read_batch(
+    request: Request, max_size: int
+) -> List[NotificationRequest | str]:
+    """
+    Read and validate the notifications of a batch request.
+
+    The body is either a JSON array or NDJSON, one notification per line.
+    NDJSON is parsed while it is streamed, so an oversized batch is rejected
+    before the whole body has arrived.
+
+    :param request: Incoming request.
+    :param max_size: Maximum number of notifications in the batch.
+    :return: Valid notifications, or the reasons the items were rejected.
+    :raises BatchTooLargeError: If the batch holds more than `max_size` items.
+    :raises ValueError: If the body is not a JSON array or NDJSON.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";")[0].strip() in NDJSON_MEDIA_TYPES:
+        return await _read_ndjson(request, max_size)
+
+    items = json.loads(await request.body())
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of notifications")
+    if len(items) > max_size:
+        raise BatchTooLargeError(f"A batch holds at most {max_size} notifications")
+    return [validate_item(item) for item in items]
+
+
+async def _read_ndjson(
+    request: Request, max_size: int
+) -> List[NotificationRequest | str]:
+    items = []
+
+    def add(line: bytes) -> None:
+        if not line.strip():
+            return
+        if len(items) == max_size:
+            raise BatchTooLargeError(f"A batch holds at most {max_size} notifications")
+        items.append(validate_item(line))
+
+    pending: List[bytes] = []
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")
+        if lines:
+            lines[0] = b"".join(pending) + lines[0]
+            pending = []
+            for line in lines:
+                add(line)
+        pending.append(rest)
+    add(b"".join(pending))
+
+    return items
+
+
+def validate_item(item: Any) -> NotificationRequest | str:
+    """
+    Validate one notification of a batch.
+
+    :param item: Decoded JSON value or a raw JSON document.
+    :return: Valid notification, or the reason it was rejected.
+    """
+    try:
+        if isinstance(item, bytes):
+            notification = NotificationRequest.model_validate_json(item)
+        else:
+            notification = NotificationRequest.model_validate(item)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(map(str, error['loc'])) or 'body'}: {error['msg']}"
+            for error in e.errors()
+        )
+
+    if not notification.chatIds and notification.audience is None:
+        return "chatIds: must not be empty"
+    if not notification.message.strip() and not notification.documents:
+        return "message: must not be empty without documents"
+    return notification
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from database.models import Notification
+from tg_bot.utils import TEXT_LIMIT, text_length
+
+
+@dataclass
+class Digest:
+    """Notifications of one chat delivered as a single message."""
+
+    notifications: List[Notification]
+    text: str
+
+    @property
+    def lead(self) -> Notification:
+        return self.notifications[0]
+
+
+def coalesce(
+    notifications: List[Notification],
+    window_for: Callable[[int], float],
+) -> List[Digest]:
+    """
+    Merge the notifications of coalesced chats into digests.
+
+    Text-only notifications of a chat with a coalescing window are merged if
+    they share the inline button. Identical messages collapse into one with a
+    `×N` counter, the others are joined by blank lines as long as the text
+    fits into a single Telegram message. Everything else is delivered as is.
+
+    :param notifications: Notifications to deliver.
+    :param window_for: Returns the coalescing window of a chat.
+    :return: Digests in the order of their first notification.
+    """
+    digests: List[Digest] = []
+    groups: Dict[Tuple[int, str | None], List[Notification]] = {}
+    for notification in notifications:
+        if notification.documents or not window_for(notification.chat_id):
+            digests.append(Digest([notification], notification.message))
+        else:
+            key = (notification.chat_id, notification.button_url)
+            groups.setdefault(key, []).append(notification)
+
+    for group in groups.values():
+        digests += _merge(group)
+    digests.sort(key=lambda digest: digest.lead.id)
+    return digests
+
+
+def _merge(notifications: List[Notification]) -> List[Digest]:
+    digests = []
+    entries: Dict[str, List[Notification]] = {}
+    for notification in notifications:
+        entries.setdefault(notification.message, []).append(notification)
+        if text_length(_text(entries)) > TEXT_LIMIT:
+            # Start a new digest with the notification that did not fit
+            entries[notification.message].pop()
+            if not entries[notification.message]:
+                del entries[notification.message]
+            if entries:
+                digests.append(_digest(entries))
+            entries = {notification.message: [notification]}
+
+    if entries:
+        digests.append(_digest(entries))
+    return digests
+
+
+def _digest(entries: Dict[str, List[Notification]]) -> Digest:
+    notifications = [n for group in entries.values() for n in group]
+    notifications.sort(key=lambda notification: notification.id)
+    return Digest(notifications, _text(entries))
+
+
+def _text(entries: Dict[str, List[Notification]]) -> str:
+    return "\n\n".join(
+        message if len(group) == 1 else f"{message}\n×{len(group)}"
+        for message, group in entries.items()
+    )
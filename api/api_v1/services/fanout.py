@@ -0,0 +1,144 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from api.api_v1.crud import DeliveryRecord
+from api.api_v1.models import DeliveryResult, DeliveryStatus
+from config import config
+from database.models import Document, NotificationStatus
+from tg_bot.bot import BotService
+from tg_bot.errors import retry_hint
+from tracing import is_enabled, span
+
+
+async def send_to_chat(
+    chat_id: int,
+    text: str,
+    button_url: str | None = None,
+    files: List[Document] | None = None,
+    parts: List[str | None] | None = None,
+) -> DeliveryResult:
+    """
+    Send a notification to one chat and report the outcome instead of raising.
+
+    :param chat_id: Telegram chat id.
+    :param text: Text to send.
+    :param button_url: Optional URL for an inline button in the message.
+    :param files: List of files to send.
+    :param parts: Parts of the text split by `BotService.split_text`.
+    :return: Delivery result for the chat.
+    """
+    bot = BotService.route(chat_id)
+    attributes = None
+    if is_enabled():
+        attributes = {
+            "telegram.chat_id": chat_id,
+            "telegram.bot_id": bot.id,
+            "notification.documents": len(files or ()),
+            "notification.document_bytes": sum(file.size for file in files or ()),
+        }
+
+    started = time.perf_counter()
+    try:
+        with span("notification.send", attributes):
+            messages = await BotService.send_message(
+                chat_id=chat_id,
+                text=text,
+                button_url=button_url,
+                files=files,
+                bot=bot,
+                parts=parts,
+            )
+    except Exception as e:
+        result = DeliveryResult(
+            chatId=chat_id,
+            status=DeliveryStatus.FAILED,
+            error=str(e),
+            botId=bot.id,
+            latencyMs=_elapsed_ms(started),
+        )
+        result._retry_hint = retry_hint(e)
+        return result
+
+    return DeliveryResult(
+        chatId=chat_id,
+        status=DeliveryStatus.SENT,
+        messageIds=[message.message_id for message in messages],
+        botId=bot.id,
+        sentAt=datetime.now(timezone.utc),
+        latencyMs=_elapsed_ms(started),
+    )
+
+
+def delivery_record(notification_id: int, result: DeliveryResult) -> DeliveryRecord:
+    """
+    Describe the delivery of a notification for storing.
+
+    :param notification_id: Notification id.
+    :param result: Delivery result of the notification's chat.
+    :return: Delivery record.
+    """
+    return DeliveryRecord(
+        notification_id=notification_id,
+        status=NotificationStatus(result.status.value),
+        bot_id=result.botId,
+        error=result.error,
+        sent_at=result.sentAt,
+        message_ids=result.messageIds or None,
+        latency_ms=result.latencyMs,
+        next_attempt_at=result.retryAt,
+    )
+
+
+def _elapsed_ms(started: float) -> int:
+    return round((time.perf_counter() - started) * 1000)
+
+
+async def fan_out(
+    chat_ids: List[int],
+    text: str,
+    button_url: str | None = None,
+    files: List[Document] | None = None,
+    concurrency: int | None = None,
+) -> List[DeliveryResult]:
+    """
+    Send the same notification to many chats concurrently.
+
+    The text is split into messages once for all chats.
+
+    :param chat_ids: Telegram chat ids.
+    :param text: Text to send.
+    :param button_url: Optional URL for an inline button in the message.
+    :param files: List of files to send.
+    :param concurrency: Maximum number of chats served at the same time.
+    :return: Delivery results in the order of `chat_ids`.
+    """
+    chat_ids = list(chat_ids)
+    results: List[DeliveryResult | None] = [None] * len(chat_ids)
+    semaphore = asyncio.Semaphore(concurrency or config.tg_bot.concurrency)
+    parts = BotService.split_text(text, bool(files))
+
+    async def deliver(index: int) -> None:
+        async with semaphore:
+            results[index] = await send_to_chat(
+                chat_id=chat_ids[index],
+                text=text,
+                button_url=button_url,
+                files=files,
+                parts=parts,
+            )
+
+    async def deliver_by(indexes: List[int]) -> None:
+        # Upload the files once, the remaining chats reuse the bot's file ids
+        while indexes and BotService.needs_upload(files, chat_ids[indexes[0]]):
+            await deliver(indexes.pop(0))
+        await asyncio.gather(*(deliver(index) for index in indexes))
+
+    # File ids are only valid for the bot that uploaded the files
+    by_bot: Dict[int, List[int]] = {}
+    for index, chat_id in enumerate(chat_ids):
+        by_bot.setdefault(BotService.route(chat_id).id, []).append(index)
+
+    await asyncio.gather(*(deliver_by(indexes) for indexes in by_bot.values()))
+    return results
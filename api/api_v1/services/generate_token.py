@@ -1,8 +1,6 @@
-import hashlib
-import hmac
 import time
 
-from config import config
+from .auth import token_verifier
 
 
 def generate_token() -> str:
@@ -11,9 +9,4 @@ def generate_token() -> str:
 
     :return: A token for the API request.
     """
-    current_time = str(int(time.time()))
-    return hmac.new(
-        config.api.access_token.encode(),
-        current_time.encode(),
-        hashlib.sha256,
-    ).hexdigest()
+    return token_verifier.generate(int(time.time()))
@@ -0,0 +1,89 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+import orjson
+
+from api.api_v1.models import DocumentInfo, NotificationHistoryItem
+from database.models import Notification
+
+
+def encode_cursor(notification: Notification) -> str:
+    """
+    Encode the position after a notification as an opaque page cursor.
+
+    :param notification: Last notification of a page.
+    :return: URL-safe cursor.
+    """
+    key = orjson.dumps([notification.created_at.isoformat(), notification.id])
+    return base64.urlsafe_b64encode(key).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a page cursor.
+
+    :param cursor: Cursor made by `encode_cursor`.
+    :return: `(created_at, id)` of the last notification of the previous page.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        key = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, notification_id = orjson.loads(key)
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def history_item(
+    notification: Notification, with_documents: bool = False
+) -> NotificationHistoryItem:
+    """
+    Describe a stored notification.
+
+    :param notification: Notification, with its documents loaded if they are
+        included.
+    :param with_documents: Whether to include the documents.
+    :return: History item.
+    """
+    return NotificationHistoryItem(
+        id=notification.id,
+        chatId=notification.chat_id,
+        message=notification.message,
+        buttonUrl=notification.button_url,
+        status=notification.status.value,
+        createdAt=notification.created_at,
+        scheduledAt=notification.scheduled_at,
+        sentAt=notification.sent_at,
+        attempts=notification.attempts,
+        lastError=notification.last_error,
+        botId=notification.bot_id,
+        messageIds=notification.telegram_message_ids or [],
+        latencyMs=notification.send_latency_ms,
+        documents=(
+            [
+                DocumentInfo(
+                    id=document.id,
+                    name=document.name,
+                    size=document.size,
+                    mime=document.mime,
+                    sha256=document.sha256,
+                )
+                for document in notification.documents
+            ]
+            if with_documents
+            else None
+        ),
+    )
+
+
+def ndjson_lines(items: List[NotificationHistoryItem]) -> Iterator[bytes]:
+    """
+    Serialize items as NDJSON, one line at a time.
+
+    :param items: History items.
+    :return: Iterator over the lines.
+    """
+    for item in items:
+        yield orjson.dumps(item.model_dump()) + b"\n"
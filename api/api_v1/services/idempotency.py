@@ -0,0 +1,208 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    claim_idempotency_key,
+    get_idempotency_key,
+    release_idempotency_key,
+    save_idempotent_response,
+)
+from config import config
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: bytes
+    cached_at: float = field(default_factory=time.monotonic)
+
+
+class IdempotencyStore:
+    """
+    Responses of requests sent with an `Idempotency-Key` header.
+
+    Keys are claimed in the `idempotency_key` table, so only one request with
+    a key does the work across all processes. Finished responses are also kept
+    in an in-process LRU cache, and duplicates arriving while the first
+    request is still running wait for its response.
+
+    A key expires `ttl` seconds after it was claimed, a request with the key
+    is then processed again; the maintenance deletes the expired rows.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        timeout: float = 60,
+        ttl: float = 86400,
+        poll_interval: float = 0.2,
+    ) -> None:
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+
+        self._responses: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def begin(
+        self,
+        session: AsyncSession,
+        key: str,
+        fingerprint: str,
+    ) -> StoredResponse | None:
+        """
+        Start processing a request with an idempotency key.
+
+        :param session: Async database session.
+        :param key: Idempotency key.
+        :param fingerprint: Digest of the request.
+        :return: Response of an earlier request with the key, or None if the
+            caller must process the request and then call `finish` or `abort`.
+        :raises HTTPException: 422 if the key was used for another request,
+            409 if an earlier request with the key did not finish in time.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            stored = self._get(key)
+            if stored is None and key in self._in_flight:
+                stored = await self._wait_local(key, deadline)
+                if stored is None:
+                    # The request failed, the key is up for grabs again
+                    continue
+            if stored is not None:
+                self._check(stored.fingerprint, fingerprint)
+                return stored
+
+            # Local duplicates wait for this request instead of the database
+            self._in_flight[key] = asyncio.get_running_loop().create_future()
+            try:
+                row = await claim_idempotency_key(
+                    session, key, fingerprint, self.timeout, self.ttl
+                )
+            except BaseException:
+                self.resolve(key)
+                raise
+            if row is None:
+                return None
+            self.resolve(key)
+
+            self._check(row.fingerprint, fingerprint)
+            if row.status_code is not None:
+                stored = StoredResponse(row.fingerprint, row.status_code, row.response)
+                self._put(key, stored)
+                return stored
+
+            # Another process is working on the request
+            await self._wait_remote(session, key, deadline)
+
+    async def finish(
+        self,
+        session: AsyncSession,
+        key: str,
+        stored: StoredResponse,
+    ) -> None:
+        """
+        Store the final response of a request.
+
+        :param session: Async database session.
+        :param key: Idempotency key.
+        :param stored: Response to return to repeated requests.
+        """
+        try:
+            await save_idempotent_response(
+                session, key, stored.status_code, stored.body
+            )
+            self._put(key, stored)
+        finally:
+            self.resolve(key)
+
+    async def abort(self, session: AsyncSession, key: str) -> None:
+        """
+        Release the key of a failed request, so it can be retried.
+
+        :param session: Async database session.
+        :param key: Idempotency key.
+        """
+        try:
+            await release_idempotency_key(session, key)
+        finally:
+            self.resolve(key)
+
+    def _get(self, key: str) -> StoredResponse | None:
+        stored = self._responses.get(key)
+        if stored is None:
+            return None
+        if self.ttl and time.monotonic() - stored.cached_at > self.ttl:
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return stored
+
+    def _put(self, key: str, stored: StoredResponse) -> None:
+        self._responses[key] = stored
+        self._responses.move_to_end(key)
+        if len(self._responses) > self.cache_size:
+            self._responses.popitem(last=False)
+
+    def resolve(self, key: str) -> None:
+        """
+        Stop the duplicates in this process from waiting for a request.
+
+        Called however the request ended, even when it was cancelled; the
+        duplicates then look for the response or claim the key themselves.
+
+        :param key: Idempotency key.
+        """
+        future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    async def _wait_local(self, key: str, deadline: float) -> StoredResponse | None:
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._in_flight[key]),
+                timeout=max(deadline - time.monotonic(), 0),
+            )
+        except asyncio.TimeoutError:
+            self._still_running()
+        return self._get(key)
+
+    async def _wait_remote(
+        self, session: AsyncSession, key: str, deadline: float
+    ) -> None:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            row = await get_idempotency_key(session, key)
+            if row is None or row.status_code is not None:
+                return
+        self._still_running()
+
+    @staticmethod
+    def _check(stored_fingerprint: str, fingerprint: str) -> None:
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+
+    @staticmethod
+    def _still_running() -> None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+        )
+
+
+idempotency = IdempotencyStore(
+    cache_size=config.api.idempotency_cache_size,
+    timeout=config.api.idempotency_timeout,
+    ttl=config.api.idempotency_ttl,
+)
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    PARTITIONED_TABLES,
+    add_months,
+    claim_abandoned,
+    create_partitions,
+    delete_expired_idempotency_keys,
+    delete_expired_notifications,
+    delete_orphan_dead_letters,
+    delete_orphan_documents,
+    drop_partition,
+    get_partitions,
+    is_partitioned,
+    lock_partitions,
+    month_start,
+    split_default_partitions,
+)
+from config import config
+from database import session_manager
+from .outbox import outbox
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceTask:
+    """
+    Periodic upkeep of the tables that grow with every notification.
+
+    In PostgreSQL the `notification` and `notification_document` tables are
+    partitioned by month: the partitions of the coming months are created
+    ahead, the ones past the retention are dropped (or detached) as a whole.
+    Rows of months without a partition, kept in the default partitions, are
+    moved to partitions of their months.
+    Plain tables have their expired rows deleted in batches instead. Documents
+    and dead letters left without notifications and expired idempotency keys
+    are deleted in batches, so no statement holds its locks for long.
+
+    With `retention_days` of 0 no notification expires. Idempotency keys
+    expire `idempotency_ttl` seconds after they were claimed, regardless of
+    the retention; with 0 they are kept.
+
+    With `recover_abandoned` notifications claimed for a direct delivery more
+    than `lease_timeout` seconds ago are claimed again and delivered: the
+    process that claimed them is gone, and without the outbox there are no
+    workers to pick them up.
+    """
+
+    def __init__(
+        self,
+        interval: float = 3600,
+        retention_days: int = 0,
+        partitions_ahead: int = 3,
+        detach_expired: bool = False,
+        batch_size: int = 1000,
+        idempotency_ttl: float = 86400,
+        recover_abandoned: bool = False,
+        lease_timeout: int = 300,
+    ) -> None:
+        self.interval = interval
+        self.retention_days = retention_days
+        self.partitions_ahead = partitions_ahead
+        self.detach_expired = detach_expired
+        self.batch_size = batch_size
+        self.idempotency_ttl = idempotency_ttl
+        self.recover_abandoned = recover_abandoned
+        self.lease_timeout = lease_timeout
+
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Start the periodic maintenance, the first run begins right away.
+
+        :return: None
+        """
+        self._stopping = False
+        self._wakeup.clear()
+        self._task = asyncio.create_task(self._run(), name="maintenance")
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop the periodic maintenance.
+
+        The run at hand is given `timeout` seconds to finish the batch it is
+        deleting.
+
+        :param timeout: Seconds to wait for the run in progress.
+        :return: None
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        if timeout:
+            await asyncio.wait([self._task], timeout=timeout)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> None:
+        """
+        Maintain the partitions and delete what expired.
+
+        :return: None
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = (
+            now - timedelta(days=self.retention_days) if self.retention_days else None
+        )
+
+        if self.recover_abandoned:
+            await self._recover_abandoned()
+
+        async with session_manager.session_factory() as session:
+            if await is_partitioned(session, "notification"):
+                await self._maintain_partitions(session, cutoff)
+            elif cutoff is not None:
+                await self._delete_batches(
+                    "expired notifications",
+                    lambda: delete_expired_notifications(
+                        session, cutoff, self.batch_size
+                    ),
+                )
+
+            await self._delete_batches(
+                "orphaned dead letters",
+                lambda: delete_orphan_dead_letters(session, self.batch_size),
+            )
+            await self._delete_batches(
+                "orphaned documents",
+                lambda: delete_orphan_documents(session, self.batch_size),
+            )
+            if self.idempotency_ttl:
+                keys_cutoff = now - timedelta(seconds=self.idempotency_ttl)
+                await self._delete_batches(
+                    "expired idempotency keys",
+                    lambda: delete_expired_idempotency_keys(
+                        session, keys_cutoff, self.batch_size
+                    ),
+                )
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Maintenance failed")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _recover_abandoned(self) -> None:
+        recovered = 0
+        while not self._stopping:
+            async with session_manager.session_factory() as session:
+                notifications = await claim_abandoned(
+                    session, outbox.batch_size, self.lease_timeout
+                )
+                if not notifications:
+                    break
+                await outbox.deliver(session, notifications)
+            recovered += len(notifications)
+        if recovered:
+            logger.info("Delivered %s abandoned notifications", recovered)
+
+    async def _maintain_partitions(
+        self, session: AsyncSession, cutoff: datetime | None
+    ) -> None:
+        if not await lock_partitions(session):
+            await session.commit()
+            return
+
+        for month in await split_default_partitions(session):
+            logger.warning(
+                "Moved the notifications of %s out of the default partitions",
+                month.strftime("%Y-%m"),
+            )
+
+        current = month_start(datetime.now(timezone.utc).date())
+        months = [add_months(current, i) for i in range(self.partitions_ahead + 1)]
+        for table in PARTITIONED_TABLES:
+            await create_partitions(session, table, months)
+
+        if cutoff is not None:
+            # Whole months past the retention, the referencing table first
+            for table in reversed(PARTITIONED_TABLES):
+                partitions = await get_partitions(session, table)
+                for month, name in sorted(partitions.items()):
+                    if add_months(month, 1) <= cutoff.date():
+                        await drop_partition(session, table, name, self.detach_expired)
+                        logger.info("Removed expired partition %s", name)
+        await session.commit()
+
+    async def _delete_batches(
+        self, kind: str, delete_batch: Callable[[], Awaitable[int]]
+    ) -> None:
+        deleted = 0
+        while not self._stopping:
+            count = await delete_batch()
+            deleted += count
+            if count < self.batch_size:
+                break
+        if deleted:
+            logger.info("Deleted %s %s", deleted, kind)
+
+
+maintenance = MaintenanceTask(
+    interval=config.maintenance.interval,
+    retention_days=config.maintenance.retention_days,
+    partitions_ahead=config.maintenance.partitions_ahead,
+    detach_expired=config.maintenance.detach_expired,
+    batch_size=config.maintenance.batch_size,
+    idempotency_ttl=config.api.idempotency_ttl,
+    # The outbox workers recover abandoned claims themselves
+    recover_abandoned=not config.outbox.enabled,
+    lease_timeout=config.outbox.lease_timeout,
+)
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    claim_notifications,
+    save_document_file_ids,
+    set_notification_digests,
+)
+from api.api_v1.models import DeliveryResult, DeliveryStatus
+from config import config
+from database import session_manager
+from database.models import Notification
+from tg_bot.bot import BotService
+from .coalesce import Digest, coalesce
+from .fanout import send_to_chat
+from .retry import retries
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxWorkerPool:
+    """
+    Background workers delivering notifications stored in the outbox.
+
+    Every gunicorn worker runs its own pool; the pools share the queue through
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so a notification is sent only once.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        batch_size: int = 30,
+        poll_interval: float = 1.0,
+        lease_timeout: int = 300,
+        coalesce_window: float = 0,
+        chat_windows: Dict[int, float] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.coalesce_window = coalesce_window
+        self.chat_windows = chat_windows or {}
+
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Start the delivery workers.
+
+        :return: None
+        """
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"outbox-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop the delivery workers.
+
+        Workers finish the batch at hand within `timeout` seconds and are
+        cancelled after that. Claimed but undelivered notifications are picked
+        up again by any pool once their lease expires.
+
+        :param timeout: Seconds to wait for the batches in progress.
+        :return: None
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks and timeout:
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """
+        Wake up idle workers after new notifications were queued.
+
+        :return: None
+        """
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                delivered = await self.drain_once()
+            except Exception:
+                logger.exception("Outbox delivery failed")
+                delivered = 0
+
+            # A full batch means there is probably more work waiting
+            if delivered < self.batch_size and not self._stopping:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Claim one batch of notifications and deliver it.
+
+        :return: Number of claimed notifications.
+        """
+        async with session_manager.session_factory() as session:
+            notifications = await claim_notifications(
+                session=session,
+                limit=self.batch_size,
+                lease_timeout=self.lease_timeout,
+                coalesce_window=self.coalesce_window,
+                chat_windows=self.chat_windows,
+            )
+            if not notifications:
+                return 0
+
+            await self.deliver(session, notifications)
+
+        return len(notifications)
+
+    async def deliver(
+        self, session: AsyncSession, notifications: List[Notification]
+    ) -> None:
+        """
+        Deliver claimed notifications and store their delivery status.
+
+        :param session: Async database session.
+        :param notifications: Notifications with their documents and file ids
+            loaded.
+        :return: None
+        """
+        # Bursts sent to a coalesced chat become a single message
+        digests = coalesce(notifications, self.window_for)
+        await set_notification_digests(
+            session,
+            {
+                notification.id: digest.lead.id
+                for digest in digests
+                if len(digest.notifications) > 1
+                for notification in digest.notifications
+            },
+        )
+
+        # Notifications with the same documents and bot are delivered as a
+        # group, file ids are only valid for the bot that uploaded the files
+        groups: Dict[Tuple[int, ...], List[Digest]] = {}
+        for digest in digests:
+            key = (
+                BotService.route(digest.lead.chat_id).id,
+                *(document.id for document in digest.lead.documents),
+            )
+            groups.setdefault(key, []).append(digest)
+
+        # A broadcast claims one row per chat, its text is split only once
+        parts: Dict[Tuple[str, bool], List[str | None]] = {}
+        for digest in digests:
+            key = (digest.text, bool(digest.lead.documents))
+            if key not in parts:
+                parts[key] = BotService.split_text(*key)
+
+        results = {}
+        for group_results in await asyncio.gather(
+            *(self._deliver_group(group, parts) for group in groups.values())
+        ):
+            results.update(group_results)
+
+        await save_document_file_ids(session, BotService.take_new_file_ids())
+        await retries.record(session, notifications, results)
+
+    async def deliver_claimed(self, notifications: List[Notification]) -> None:
+        """
+        Deliver notifications claimed outside of the workers in a new session.
+
+        A failure is only logged: the notifications stay claimed and the
+        workers pick them up once their lease expires.
+
+        :param notifications: Notifications with their documents and file ids
+            loaded.
+        :return: None
+        """
+        try:
+            async with session_manager.session_factory() as session:
+                await self.deliver(session, notifications)
+        except Exception:
+            logger.exception("Delivery of %s notifications failed", len(notifications))
+
+    def window_for(self, chat_id: int) -> float:
+        """
+        Get the coalescing window of a chat.
+
+        :param chat_id: Telegram chat id.
+        :return: Window in seconds, 0 if the chat is not coalesced.
+        """
+        return self.chat_windows.get(chat_id, self.coalesce_window)
+
+    async def _deliver_group(
+        self,
+        digests: List[Digest],
+        parts: Dict[Tuple[str, bool], List[str | None]],
+    ) -> Dict[int, DeliveryResult]:
+        results = {}
+        digests = list(digests)
+
+        # Upload the documents once, the rest of the group reuses their file ids
+        while digests and BotService.needs_upload(
+            digests[0].lead.documents, digests[0].lead.chat_id
+        ):
+            digest = digests.pop(0)
+            results.update(await self._deliver(digest, parts))
+
+        for delivered in await asyncio.gather(
+            *(self._deliver(digest, parts) for digest in digests)
+        ):
+            results.update(delivered)
+        return results
+
+    @staticmethod
+    async def _deliver(
+        digest: Digest,
+        parts: Dict[Tuple[str, bool], List[str | None]],
+    ) -> Dict[int, DeliveryResult]:
+        notification = digest.lead
+        result = await send_to_chat(
+            chat_id=notification.chat_id,
+            text=digest.text,
+            button_url=notification.button_url,
+            files=notification.documents,
+            parts=parts[(digest.text, bool(notification.documents))],
+        )
+        if result.status == DeliveryStatus.FAILED:
+            logger.warning(
+                "Notification %s was not delivered: %s",
+                notification.id,
+                result.error,
+            )
+        return {n.id: result for n in digest.notifications}
+
+
+outbox = OutboxWorkerPool(
+    workers=config.outbox.workers,
+    batch_size=config.outbox.batch_size,
+    poll_interval=config.outbox.poll_interval,
+    lease_timeout=config.outbox.lease_timeout,
+    coalesce_window=config.outbox.coalesce_window,
+    chat_windows=config.outbox.coalesce_chat_windows,
+)
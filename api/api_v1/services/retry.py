@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    claim_retries,
+    create_dead_letters,
+    get_retry_schedule,
+    record_deliveries,
+)
+from api.api_v1.models import DeliveryResult, DeliveryStatus
+from config import config
+from database import session_manager
+from database.models import Notification
+from metrics import NOTIFICATION_DEAD_LETTERS, NOTIFICATION_DELIVERIES
+from .fanout import delivery_record
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[AsyncSession, List[Notification]], Awaitable[None]]
+
+
+class RetryScheduler:
+    """
+    Scheduler of delivery attempts after transient errors.
+
+    Deliveries failing with an error a later attempt may not run into (flood
+    control, Bot API server and network errors) are attempted again after a
+    jittered exponential backoff, never earlier than Telegram's
+    `retry_after`. Notifications that run out of attempts are moved to the
+    dead letters.
+
+    Pending retries are kept in a heap ordered by their due time, nothing
+    polls the table for them. The rows are only read on startup to take over
+    the retries of a previous run: the ones due within `max_delay` seconds,
+    at most `max_items` of them, the earliest first. Every process takes them
+    over, the one that claims a retry first attempts it. Retries left out are
+    claimed as abandoned once they are overdue by the lease timeout.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        max_items: int = 10000,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_items = max_items
+
+        self._heap: List[Tuple[float, int]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._deliver: Deliver | None = None
+        self._stopping = False
+
+    def backoff(self, attempt: int, retry_after: float = 0) -> float:
+        """
+        Compute the delay before the next delivery attempt.
+
+        Half of the exponential delay is fixed and half is random, so the
+        retries of a burst of failures are spread out.
+
+        :param attempt: Number of the failed attempt, starting from 1.
+        :param retry_after: Minimum delay, e.g. the `retry_after` of Telegram.
+        :return: Delay in seconds.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return max(retry_after, delay / 2 + random.uniform(0, delay / 2))
+
+    async def record(
+        self,
+        session: AsyncSession,
+        notifications: List[Notification],
+        results: Dict[int, DeliveryResult],
+    ) -> None:
+        """
+        Store the outcome of delivery attempts and schedule the retries.
+
+        Results of transient failures are turned into `retrying` ones with
+        the time of the next attempt.
+
+        :param session: Async database session.
+        :param notifications: Delivered notifications.
+        :param results: Delivery results by notification id; notifications
+            delivered as one message share their result.
+        :return: None
+        """
+        groups: Dict[int, Tuple[DeliveryResult, List[Notification]]] = {}
+        for notification in notifications:
+            if (result := results.get(notification.id)) is not None:
+                groups.setdefault(id(result), (result, []))[1].append(notification)
+
+        now = datetime.now(timezone.utc)
+        delays: Dict[int, float] = {}
+        dead_letters: Dict[int, Tuple[str | None, int]] = {}
+        for result, group in groups.values():
+            if result.status != DeliveryStatus.FAILED or result._retry_hint is None:
+                continue
+
+            attempt = max(notification.attempts for notification in group) + 1
+            if attempt < self.max_attempts:
+                delay = self.backoff(attempt, result._retry_hint)
+                result.status = DeliveryStatus.RETRYING
+                result.retryAt = now + timedelta(seconds=delay)
+                delays.update({notification.id: delay for notification in group})
+            else:
+                dead_letters.update(
+                    {notification.id: (result.error, attempt) for notification in group}
+                )
+
+        await record_deliveries(
+            session,
+            [
+                delivery_record(notification_id, result)
+                for notification_id, result in results.items()
+            ],
+        )
+        await create_dead_letters(session, dead_letters)
+
+        for result, group in groups.values():
+            NOTIFICATION_DELIVERIES.labels(result.status.value).inc(len(group))
+        NOTIFICATION_DEAD_LETTERS.inc(len(dead_letters))
+
+        for notification_id, delay in delays.items():
+            self.schedule(notification_id, delay)
+
+    def schedule(self, notification_id: int, delay: float) -> None:
+        """
+        Schedule the next delivery attempt of a retrying notification.
+
+        :param notification_id: Notification id.
+        :param delay: Seconds until the attempt.
+        :return: None
+        """
+        due = asyncio.get_running_loop().time() + delay
+        heapq.heappush(self._heap, (due, notification_id))
+        self._wakeup.set()
+
+    def start(self, deliver: Deliver) -> None:
+        """
+        Start attempting the scheduled deliveries.
+
+        :param deliver: Delivers claimed notifications and records the
+            outcome, e.g. `OutboxWorkerPool.deliver`.
+        :return: None
+        """
+        self._deliver = deliver
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="retry-scheduler")
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop attempting the scheduled deliveries.
+
+        The attempt at hand is given `timeout` seconds to finish. Retries
+        still scheduled stay in the table and are taken over on the next
+        start.
+
+        :param timeout: Seconds to wait for the attempt in progress.
+        :return: None
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        if timeout:
+            await asyncio.wait([self._task], timeout=timeout)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+
+    async def _run(self) -> None:
+        try:
+            await self._take_over()
+        except Exception:
+            logger.exception("Taking over scheduled retries failed")
+
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            delay = self._heap[0][0] - loop.time() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            due_ids = []
+            while self._heap and self._heap[0][0] <= loop.time():
+                due_ids.append(heapq.heappop(self._heap)[1])
+            try:
+                await self._attempt(due_ids)
+            except Exception:
+                logger.exception("Retry of %s notifications failed", len(due_ids))
+
+    async def _attempt(self, notification_ids: List[int]) -> None:
+        async with session_manager.session_factory() as session:
+            # Another process may have attempted some of them already
+            notifications = await claim_retries(session, notification_ids)
+            if notifications:
+                await self._deliver(session, notifications)
+
+    async def _take_over(self) -> None:
+        now = datetime.now(timezone.utc)
+        until = now + timedelta(seconds=self.max_delay)
+        async with session_manager.session_factory() as session:
+            schedule = await get_retry_schedule(session, until, self.max_items)
+
+        for notification_id, due in schedule:
+            # SQLite returns the times without their time zone
+            if due.tzinfo is None:
+                due = due.replace(tzinfo=timezone.utc)
+            self.schedule(notification_id, max((due - now).total_seconds(), 0))
+
+
+retries = RetryScheduler(
+    max_attempts=config.retry.max_attempts,
+    base_delay=config.retry.base_delay,
+    max_delay=config.retry.max_delay,
+    max_items=config.retry.max_items,
+)
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Set, Tuple
+
+from api.api_v1.crud import (
+    claim_scheduled,
+    get_scheduled_notifications,
+    release_scheduled,
+)
+from config import config
+from database import session_manager
+from .outbox import outbox
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationScheduler:
+    """
+    Scheduler releasing notifications at their time of delivery.
+
+    Only the notifications due within the next `window` seconds are kept in
+    memory, in a heap ordered by their due time, and never more than
+    `max_items` of them. The heap is refilled from the `scheduled_at` index
+    when the window has passed, so the table is not polled every second and
+    any number of notifications can be scheduled far ahead.
+
+    Every process runs a scheduler; a notification is released by the one
+    that claims it first.
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        max_items: int = 10000,
+        batch_size: int = 30,
+    ) -> None:
+        self.window = window
+        self.max_items = max_items
+        self.batch_size = batch_size
+
+        self._heap: List[Tuple[float, int]] = []
+        self._ids: Set[int] = set()
+        # All notifications due until this timestamp are in the heap
+        self._horizon = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def schedule(self, notification_id: int, send_at: datetime) -> None:
+        """
+        Add a new scheduled notification if it is due within the loaded window.
+
+        Later notifications are loaded from the table when their window comes.
+
+        :param notification_id: Notification id.
+        :param send_at: Time of delivery.
+        :return: None
+        """
+        due = send_at.timestamp()
+        if due > self._horizon or notification_id in self._ids:
+            return
+        if len(self._heap) >= self.max_items:
+            # Left in the table, the window is shortened to load it in time
+            self._horizon = min(self._horizon, due)
+        else:
+            self._push(notification_id, due)
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """
+        Start releasing the scheduled notifications.
+
+        :return: None
+        """
+        self._stopping = False
+        self._horizon = 0.0
+        self._task = asyncio.create_task(self._run(), name="notification-scheduler")
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop releasing the scheduled notifications.
+
+        The release at hand is given `timeout` seconds to finish. The rest
+        stays in the table for the next start.
+
+        :param timeout: Seconds to wait for the release in progress.
+        :return: None
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        if timeout:
+            await asyncio.wait([self._task], timeout=timeout)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+        self._ids.clear()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self._release_due()
+                if time.time() >= self._horizon:
+                    await self._refill()
+            except Exception:
+                logger.exception("Releasing scheduled notifications failed")
+                # Do not hammer the database while it is failing
+                self._horizon = time.time() + self.window
+
+            wake_at = (
+                min(self._heap[0][0], self._horizon) if self._heap else self._horizon
+            )
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=max(wake_at - time.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _release_due(self) -> None:
+        while self._heap and self._heap[0][0] <= time.time() and not self._stopping:
+            due_ids = []
+            while (
+                self._heap
+                and self._heap[0][0] <= time.time()
+                and len(due_ids) < self.batch_size
+            ):
+                due_ids.append(heapq.heappop(self._heap)[1])
+            self._ids.difference_update(due_ids)
+            await self._release(due_ids)
+
+    async def _release(self, notification_ids: List[int]) -> None:
+        async with session_manager.session_factory() as session:
+            # In outbox mode the workers deliver them, otherwise they are
+            # delivered right here
+            if config.outbox.enabled:
+                if await release_scheduled(session, notification_ids):
+                    outbox.notify()
+                return
+
+            notifications = await claim_scheduled(session, notification_ids)
+            if notifications:
+                await outbox.deliver(session, notifications)
+
+    async def _refill(self) -> None:
+        limit = self.max_items - len(self._heap)
+        if limit <= 0:
+            # Nothing fits, loaded again once the earliest is released
+            self._horizon = (
+                self._heap[0][0] if self._heap else time.time() + self.window
+            )
+            return
+
+        until = datetime.now(timezone.utc) + timedelta(seconds=self.window)
+        async with session_manager.session_factory() as session:
+            schedule = await get_scheduled_notifications(session, until, limit)
+
+        for notification_id, due in schedule:
+            if notification_id not in self._ids:
+                self._push(notification_id, due.timestamp())
+        # Notifications cut off by the limit are loaded once these are due
+        self._horizon = (
+            schedule[-1][1].timestamp() if len(schedule) >= limit else until.timestamp()
+        )
+
+    def _push(self, notification_id: int, due: float) -> None:
+        heapq.heappush(self._heap, (due, notification_id))
+        self._ids.add(notification_id)
+
+
+scheduler = NotificationScheduler(
+    window=config.scheduler.window,
+    max_items=config.scheduler.max_items,
+    batch_size=config.outbox.batch_size,
+)
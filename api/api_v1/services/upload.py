@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import mmap
+from dataclasses import dataclass
+from typing import List
+
+from fastapi import UploadFile
+
+
+@dataclass
+class UploadedDocument:
+    name: str
+    buffer: memoryview
+    sha256: str
+
+
+def map_upload(file: UploadFile) -> UploadedDocument:
+    """
+    Map an uploaded file into memory and compute its digest.
+
+    The multipart parser has already streamed the file part into a spooled
+    temporary file. The file is memory-mapped rather than read, so the
+    digest, the database driver and the Telegram upload all work on the page
+    cache instead of private copies of the content.
+
+    Rolling the file over to disk and hashing it are blocking, so this runs
+    in a worker thread; ``hashlib`` releases the GIL while it hashes.
+
+    :param file: Uploaded file.
+    :return: Document backed by the mapped file.
+    """
+    # Rolls a small in-memory upload over to disk, so every file can be mapped
+    fileno = file.file.fileno()
+    file.file.seek(0, 2)
+    if file.file.tell() == 0:
+        buffer = memoryview(b"")
+    else:
+        # The mapping outlives the temporary file and is released with the
+        # last reference to the buffer
+        buffer = memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))
+
+    return UploadedDocument(
+        name=file.filename or "document",
+        buffer=buffer,
+        sha256=hashlib.sha256(buffer).hexdigest(),
+    )
+
+
+async def map_uploads(files: List[UploadFile]) -> List[UploadedDocument]:
+    """
+    Map uploaded files into memory and compute their digests off the event
+    loop.
+
+    :param files: Uploaded files.
+    :return: Documents backed by the mapped files.
+    """
+    return list(
+        await asyncio.gather(*(asyncio.to_thread(map_upload, file) for file in files))
+    )
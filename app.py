@@ -1,19 +1,43 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from api import routers
+from api.api_v1.services import maintenance, outbox, retries, scheduler
+from config import config
 from database import session_manager
+from metrics import MetricsMiddleware, render_metrics
+from tg_bot.bot import BotService
+from tracing import (
+    instrument_app,
+    instrument_engine,
+    setup_tracing,
+    shutdown_tracing,
+)
 
 
 def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         # Some logic, at the beginning of the application
+        await BotService.start()
+        retries.start(outbox.deliver)
+        scheduler.start()
+        maintenance.start()
+        if config.outbox.enabled:
+            outbox.start()
         yield
         # Some logic, at the end of the application
+        shutdown_timeout = config.tg_bot.session.shutdown_timeout
+        await maintenance.stop(timeout=shutdown_timeout)
+        await scheduler.stop(timeout=shutdown_timeout)
+        await retries.stop(timeout=shutdown_timeout)
+        await outbox.stop(timeout=shutdown_timeout)
+        await BotService.close(timeout=shutdown_timeout)
         await session_manager.dispose()
+        shutdown_tracing()
 
     app = FastAPI(
         title="Notification API",
@@ -24,4 +48,24 @@ def create_app() -> FastAPI:
     )
     app.include_router(routers)
 
+    if config.metrics.enabled:
+        app.add_middleware(MetricsMiddleware)
+        app.add_route(config.metrics.path, get_metrics, include_in_schema=False)
+
+    if config.tracing.enabled:
+        setup_tracing(config.tracing)
+        # Added last, the request span encloses the metrics middleware
+        instrument_app(app)
+        instrument_engine(session_manager.engine)
+
     return app
+
+
+async def get_metrics(request: Request) -> Response:
+    """
+    Expose the metrics to Prometheus.
+
+    :param request: Incoming request.
+    :return: Metrics in the Prometheus text format.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
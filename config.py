@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,11 +17,19 @@ class ApiV1Prefix(BaseModel):
 
 class ApiTags(BaseModel):
     notification: str = "Notification"
+    admin: str = "Admin"
+    chat_group: str = "Chat group"
 
 
 class ApiConfig(BaseModel):
     prefix: str = "/api"
     access_token: str = "access_token"
+    token_skew: int = 1
+    batch_max_size: int = 1000
+    idempotency_cache_size: int = 1024
+    idempotency_timeout: float = 60
+    idempotency_ttl: float = 86400
+    audience_cache_size: int = 256
 
     run: RunConfig = RunConfig()
     v1: ApiV1Prefix = ApiV1Prefix()
@@ -38,6 +46,8 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    blob_backend: Literal["filesystem", "database"] = "filesystem"
+    blob_path: str = "blobs"
 
     def construct_url(self, driver="asyncpg", host=None, port=5432) -> str:
         if not host:
@@ -63,8 +73,92 @@ class DatabaseConfig(BaseModel):
     }
 
 
+class RateLimitConfig(BaseModel):
+    backend: Literal["memory", "database"] = "memory"
+    global_rate: float = 30
+    global_burst: float = 30
+    chat_rate: float = 1
+    chat_burst: float = 1
+    group_rate: float = 20 / 60
+    group_burst: float = 1
+    max_retries: int = 3
+
+
+class BotSessionConfig(BaseModel):
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15
+    ttl_dns_cache: int = 3600
+    timeout: float = 60
+    proxy: Optional[str] = None
+    shutdown_timeout: float = 30
+
+
 class TgBotConfig(BaseModel):
     token: str
+    # Further bots sharing the load, see `tg_bot.pool`
+    tokens: List[str] = []
+    # Chat ids mapped to the id of the bot serving them
+    routes: Dict[int, int] = {}
+    ring_replicas: int = 100
+    failure_threshold: int = 5
+    failure_cooldown: float = 30
+    concurrency: int = 30
+    file_id_cache_size: int = 1024
+
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    # Rate limits overridden for single bots by bot id
+    bot_rate_limits: Dict[int, RateLimitConfig] = {}
+    session: BotSessionConfig = BotSessionConfig()
+
+    @property
+    def pool_tokens(self) -> List[str]:
+        return list(dict.fromkeys([self.token, *self.tokens]))
+
+
+class OutboxConfig(BaseModel):
+    enabled: bool = False
+    workers: int = 2
+    batch_size: int = 30
+    poll_interval: float = 1.0
+    lease_timeout: int = 300
+    coalesce_window: float = 0
+    coalesce_chat_windows: Dict[int, float] = {}
+
+
+class RetryConfig(BaseModel):
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 300.0
+    max_items: int = 10000
+
+
+class SchedulerConfig(BaseModel):
+    window: float = 60
+    max_items: int = 10000
+
+
+class MaintenanceConfig(BaseModel):
+    interval: float = 3600
+    retention_days: int = 0
+    partitions_ahead: int = 3
+    detach_expired: bool = False
+    batch_size: int = 1000
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True
+    path: str = "/metrics"
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = False
+    exporter: Literal["otlp", "file"] = "otlp"
+    # OTLP/HTTP traces endpoint, the OTEL_EXPORTER_OTLP_* variables by default
+    endpoint: Optional[str] = None
+    file_path: str = "traces.jsonl"
+    service_name: str = "tg-notify-bot"
+    sample_ratio: float = 1.0
 
 
 class Config(BaseSettings):
@@ -78,6 +172,12 @@ class Config(BaseSettings):
     api: ApiConfig = ApiConfig()
     db: Optional[DatabaseConfig] = None
     tg_bot: Optional[TgBotConfig] = None
+    outbox: OutboxConfig = OutboxConfig()
+    retry: RetryConfig = RetryConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    maintenance: MaintenanceConfig = MaintenanceConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    tracing: TracingConfig = TracingConfig()
 
     test_chat_id: Optional[int] = None
 
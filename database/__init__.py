@@ -1,7 +1,9 @@
 __all__ = (
     "Base",
+    "blob_storage",
     "session_manager",
 )
 
 from .models import Base
 from .session import session_manager
+from .storage import blob_storage
@@ -1,11 +1,24 @@
 __all__ = (
     "Base",
+    "ChatGroup",
+    "ChatGroupMember",
+    "DeadLetter",
     "Document",
+    "DocumentFileId",
+    "IdempotencyKey",
     "Notification",
     "NotificationDocument",
+    "NotificationStatus",
+    "RateLimitBucket",
 )
 
 from ._base import Base
+from .chat_group import ChatGroup
+from .chat_group_member import ChatGroupMember
+from .dead_letter import DeadLetter
 from .document import Document
-from .notification import Notification
+from .document_file_id import DocumentFileId
+from .idempotency_key import IdempotencyKey
+from .notification import Notification, NotificationStatus
 from .notification_document import NotificationDocument
+from .rate_limit_bucket import RateLimitBucket
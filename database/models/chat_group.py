@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import String, func
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class ChatGroup(Base, TableNameMixin):
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True)
+    # Bumped on every change of the members, cached memberships are checked
+    # against it
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+    )
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(id={self.id}, "
+            f"name={self.name!r}, "
+            f"version={self.version}, "
+            f"created_at={self.created_at!r}, "
+            f"updated_at={self.updated_at!r})"
+        )
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,22 @@
+from sqlalchemy import BIGINT, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class ChatGroupMember(Base, TableNameMixin):
+    chat_group_id: Mapped[int] = mapped_column(
+        ForeignKey("chat_group.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    chat_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(chat_group_id={self.chat_group_id}, "
+            f"chat_id={self.chat_id})"
+        )
+
+    def __repr__(self):
+        return str(self)
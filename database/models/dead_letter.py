@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import Text, func
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class DeadLetter(Base, TableNameMixin):
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Not a foreign key, the partitions of notifications are dropped as a
+    # whole; dead letters left without a notification are purged
+    notification_id: Mapped[int] = mapped_column(index=True)
+    error: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    attempts: Mapped[int]
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+    )
+    # Set once the notification was queued for delivery again
+    replayed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(id={self.id}, "
+            f"notification_id={self.notification_id}, "
+            f"error={self.error!r}, "
+            f"attempts={self.attempts}, "
+            f"created_at={self.created_at!r}, "
+            f"replayed_at={self.replayed_at!r})"
+        )
+
+    def __repr__(self):
+        return str(self)
@@ -1,29 +1,55 @@
-from typing import List
+from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Text, LargeBinary
+from sqlalchemy import BIGINT, String, Text, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ._base import Base, TableNameMixin
 from .notification import Notification
 
+if TYPE_CHECKING:
+    from .document_file_id import DocumentFileId
+
 
 class Document(Base, TableNameMixin):
+    __table_args__ = (
+        # Documents are deduplicated by content digest and name
+        UniqueConstraint("sha256", "name"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    buffer: Mapped[bytes] = mapped_column(LargeBinary, index=True)
+    # Only used by the database blob storage, read through `blob_storage`
+    buffer: Mapped[bytes | None] = mapped_column(
+        LargeBinary,
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
+    )
     name: Mapped[str] = mapped_column(Text(), index=True)
+    sha256: Mapped[str] = mapped_column(String(64))
+    size: Mapped[int] = mapped_column(BIGINT)
+    mime: Mapped[str | None] = mapped_column(Text(), nullable=True)
 
     notifications: Mapped[List["Notification"]] = relationship(
         secondary="notification_document",
         back_populates="documents",
-        lazy="joined",
+        # A document may be attached to thousands of notifications
+        lazy="raise",
+    )
+    # Telegram file ids of the bots that uploaded the document
+    file_ids: Mapped[List["DocumentFileId"]] = relationship(
+        # Load explicitly with selectinload() where the documents are sent
+        lazy="raise",
+        cascade="all, delete-orphan",
     )
 
     def __str__(self):
         return (
             f"{self.__class__.__name__}"
             f"(id={self.id}, "
-            f"buffer={self.buffer!r}, "
-            f"name={self.name!r})"
+            f"name={self.name!r}, "
+            f"sha256={self.sha256!r}, "
+            f"size={self.size}, "
+            f"mime={self.mime!r})"
         )
 
     def __repr__(self):
@@ -0,0 +1,25 @@
+from sqlalchemy import BIGINT, ForeignKey, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class DocumentFileId(Base, TableNameMixin):
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("document.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    # A file id is only valid for the bot that uploaded the file
+    bot_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    file_id: Mapped[str] = mapped_column(Text())
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(document_id={self.document_id}, "
+            f"bot_id={self.bot_id}, "
+            f"file_id={self.file_id!r})"
+        )
+
+    def __repr__(self):
+        return str(self)
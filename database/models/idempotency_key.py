@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import LargeBinary, String, func
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class IdempotencyKey(Base, TableNameMixin):
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    # Both are empty while the request is being processed
+    status_code: Mapped[int | None] = mapped_column(nullable=True)
+    response: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(key={self.key!r}, "
+            f"fingerprint={self.fingerprint!r}, "
+            f"status_code={self.status_code!r}, "
+            f"created_at={self.created_at!r})"
+        )
+
+    def __repr__(self):
+        return str(self)
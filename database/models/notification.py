@@ -1,7 +1,8 @@
 from datetime import datetime
+from enum import Enum
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Text, BIGINT, func
+from sqlalchemy import JSON, Text, BIGINT, Enum as SAEnum, Index, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,9 +12,37 @@ if TYPE_CHECKING:
     from .document import Document
 
 
+class NotificationStatus(str, Enum):
+    SCHEDULED = "scheduled"
+    PENDING = "pending"
+    PROCESSING = "processing"
+    RETRYING = "retrying"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class Notification(Base, TableNameMixin):
+    # In PostgreSQL the table is partitioned by range of `created_at`, which
+    # makes the primary key (id, created_at) there; see the migrations
+    __table_args__ = (
+        # Only unfinished rows are looked up by the outbox workers
+        Index(
+            "ix_notification_outbox",
+            "id",
+            postgresql_where="status IN ('pending', 'processing', 'retrying')",
+        ),
+        # History of a chat is read page by page in time order
+        Index("ix_notification_chat_id_created_at", "chat_id", "created_at", "id"),
+        # The scheduler reads the upcoming notifications in time order
+        Index(
+            "ix_notification_scheduled",
+            "scheduled_at",
+            postgresql_where="status = 'scheduled'",
+        ),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    chat_id: Mapped[int] = mapped_column(BIGINT, index=True)
+    chat_id: Mapped[int] = mapped_column(BIGINT)
     message: Mapped[str] = mapped_column(Text())
     button_url: Mapped[str | None] = mapped_column(Text(), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -21,11 +50,51 @@ class Notification(Base, TableNameMixin):
         server_default=func.now(),
         index=True,
     )
+    status: Mapped[NotificationStatus] = mapped_column(
+        SAEnum(
+            NotificationStatus,
+            native_enum=False,
+            length=16,
+            values_callable=lambda enum: [member.value for member in enum],
+        ),
+        default=NotificationStatus.PENDING,
+        server_default=NotificationStatus.PENDING.value,
+    )
+    claimed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+    # ID of the notification whose message also carried this one
+    digest_id: Mapped[int | None] = mapped_column(nullable=True)
+    # Telegram id of the bot that delivered the notification
+    bot_id: Mapped[int | None] = mapped_column(BIGINT, nullable=True)
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+    telegram_message_ids: Mapped[List[int] | None] = mapped_column(
+        JSON,
+        nullable=True,
+    )
+    send_latency_ms: Mapped[int | None] = mapped_column(nullable=True)
+    # Time of the next delivery attempt of a retrying notification
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+    # Time a scheduled notification is due for delivery
+    scheduled_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
 
     documents: Mapped[List["Document"]] = relationship(
         secondary="notification_document",
         back_populates="notifications",
-        lazy="selectin",
+        # Load explicitly with selectinload() where the documents are needed
+        lazy="raise",
         cascade="save-update",
     )
 
@@ -36,7 +105,17 @@ class Notification(Base, TableNameMixin):
             f"chat_id={self.chat_id}, "
             f"message={self.message!r}, "
             f"button_url={self.button_url!r}, "
-            f"created_at={self.created_at!r})"
+            f"created_at={self.created_at!r}, "
+            f"status={self.status!r}, "
+            f"digest_id={self.digest_id!r}, "
+            f"bot_id={self.bot_id!r}, "
+            f"attempts={self.attempts}, "
+            f"last_error={self.last_error!r}, "
+            f"sent_at={self.sent_at!r}, "
+            f"telegram_message_ids={self.telegram_message_ids!r}, "
+            f"send_latency_ms={self.send_latency_ms!r}, "
+            f"next_attempt_at={self.next_attempt_at!r}, "
+            f"scheduled_at={self.scheduled_at!r})"
         )
 
     def __repr__(self):
@@ -1,24 +1,41 @@
-from sqlalchemy import ForeignKey
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, ForeignKeyConstraint
+from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ._base import Base, TableNameMixin
 
 
 class NotificationDocument(Base, TableNameMixin):
-    notification_id: Mapped[int] = mapped_column(
-        ForeignKey("notification.id", ondelete="CASCADE", onupdate="CASCADE"),
-        primary_key=True,
+    __table_args__ = (
+        # The partitions of both tables are aligned on `created_at`
+        ForeignKeyConstraint(
+            ["notification_id", "created_at"],
+            ["notification.id", "notification.created_at"],
+            ondelete="CASCADE",
+            onupdate="CASCADE",
+        ),
     )
+
+    notification_id: Mapped[int] = mapped_column(primary_key=True)
     document_id: Mapped[int] = mapped_column(
         ForeignKey("document.id", ondelete="CASCADE", onupdate="CASCADE"),
         primary_key=True,
+        index=True,
+    )
+    # Copy of the creation time of the notification, the partition key
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        primary_key=True,
     )
 
     def __str__(self):
         return (
             f"{self.__class__.__name__}"
             f"(notification_id={self.notification_id}, "
-            f"document_id={self.document_id})"
+            f"document_id={self.document_id}, "
+            f"created_at={self.created_at!r})"
         )
 
     def __repr__(self):
@@ -0,0 +1,21 @@
+from sqlalchemy import Double, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ._base import Base, TableNameMixin
+
+
+class RateLimitBucket(Base, TableNameMixin):
+    key: Mapped[str] = mapped_column(Text(), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Double())
+    updated_at: Mapped[float] = mapped_column(Double())
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"(key={self.key!r}, "
+            f"tokens={self.tokens}, "
+            f"updated_at={self.updated_at})"
+        )
+
+    def __repr__(self):
+        return str(self)
@@ -8,6 +8,8 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from config import config
+from metrics import track_pool
+from tracing import is_enabled, span
 
 
 class SessionManager:
@@ -25,6 +27,7 @@ class SessionManager:
             pool_size=pool_size,
             max_overflow=max_overflow,
         )
+        track_pool(self.engine)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -47,6 +50,11 @@ class SessionManager:
         :return: An asynchronous generator yielding an AsyncSession.
         """
         async with self.session_factory() as session:
+            if is_enabled():
+                # The connection is checked out up front to time the wait
+                # for the pool, otherwise it is taken on the first statement
+                with span("db.checkout"):
+                    await session.connection()
             yield session
 
 
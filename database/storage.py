@@ -0,0 +1,166 @@
+import asyncio
+import mmap
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from sqlalchemy import inspect, select
+
+from config import config
+from .models import Document
+from .session import session_manager
+
+
+class BlobStorage(ABC):
+    """Storage of document contents."""
+
+    # Whether the content is kept in the `buffer` column of the document row
+    stores_in_database: bool = False
+
+    @abstractmethod
+    async def put(self, sha256: str, buffer: bytes | memoryview) -> None:
+        """
+        Store the content of a document.
+
+        :param sha256: Hex-encoded SHA-256 of the content.
+        :param buffer: Document content.
+        """
+
+    @abstractmethod
+    async def read(self, document: Document) -> memoryview:
+        """
+        Read the content of a document.
+
+        :param document: Stored document.
+        :return: Document content.
+        """
+
+    @abstractmethod
+    async def delete(self, sha256: str) -> None:
+        """
+        Delete a content no document row refers to any more.
+
+        :param sha256: Hex-encoded SHA-256 of the content.
+        """
+
+
+class DatabaseBlobStorage(BlobStorage):
+    """Contents kept in the `buffer` column of the `document` table."""
+
+    stores_in_database = True
+
+    async def put(self, sha256: str, buffer: bytes | memoryview) -> None:
+        # The content is written together with the document row
+        pass
+
+    async def read(self, document: Document) -> memoryview:
+        if "buffer" not in inspect(document).unloaded:
+            return memoryview(document.buffer or b"")
+
+        async with session_manager.session_factory() as session:
+            buffer = await session.scalar(
+                select(Document.buffer).where(Document.id == document.id)
+            )
+        return memoryview(buffer or b"")
+
+    async def delete(self, sha256: str) -> None:
+        # The content went with the document row
+        pass
+
+
+class FileSystemBlobStorage(BlobStorage):
+    """
+    Content-addressed files in a local directory.
+
+    A document is stored once per content under `<root>/ab/cd/abcd...`, the
+    path being derived from its digest. Documents whose content is not in a
+    file, such as ones stored while the `database` storage was configured,
+    are still read from the database.
+
+    Storing a content that exists touches its file; a file touched within
+    the last `delete_grace` seconds is not deleted, as a request storing the
+    same content may not have committed its document row yet.
+    """
+
+    def __init__(self, root: str | Path, delete_grace: float = 3600) -> None:
+        self.root = Path(root)
+        self.delete_grace = delete_grace
+        self._legacy = DatabaseBlobStorage()
+
+    def path(self, sha256: str) -> Path:
+        """
+        Get the path of a blob.
+
+        :param sha256: Hex-encoded SHA-256 of the content.
+        :return: Path of the blob file.
+        """
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    async def put(self, sha256: str, buffer: bytes | memoryview) -> None:
+        await asyncio.to_thread(self._write, self.path(sha256), buffer)
+
+    async def read(self, document: Document) -> memoryview:
+        buffer = await asyncio.to_thread(self._map, self.path(document.sha256))
+        if buffer is None:
+            return await self._legacy.read(document)
+        return buffer
+
+    async def delete(self, sha256: str) -> None:
+        await asyncio.to_thread(self._delete, self.path(sha256), self.delete_grace)
+
+    @staticmethod
+    def _write(path: Path, buffer: bytes | memoryview) -> None:
+        try:
+            # Keeps the content from being deleted until the row is committed
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(buffer)
+            # Readers never see a partially written blob
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _map(path: Path) -> memoryview | None:
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        with file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b"")
+            # The mapping stays valid after the file is closed
+            return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def _delete(path: Path, grace: float) -> None:
+        try:
+            if time.time() - path.stat().st_mtime >= grace:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def create_blob_storage() -> BlobStorage:
+    """
+    Create the configured blob storage.
+
+    :return: Blob storage.
+    """
+    if config.db.blob_backend == "database":
+        return DatabaseBlobStorage()
+    return FileSystemBlobStorage(root=config.db.blob_path)
+
+
+blob_storage = create_blob_storage()
@@ -7,5 +7,11 @@ sleep 5  # Allow time for the database to run
 echo "Applying migrations..."
 alembic upgrade head
 
+echo "Preparing metrics directory..."
+# The workers write their metrics there, the /metrics endpoint aggregates them
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "Starting application..."
-exec gunicorn main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
+exec gunicorn main:app --config gunicorn.conf.py --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Gauges of the workers that are gone are no longer summed
+    multiprocess.mark_process_dead(worker.pid)
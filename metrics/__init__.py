@@ -0,0 +1,28 @@
+__all__ = (
+    "DB_CALL_SECONDS",
+    "DB_POOL_CHECKED_OUT",
+    "HTTP_REQUEST_BYTES",
+    "HTTP_REQUEST_SECONDS",
+    "NOTIFICATION_DEAD_LETTERS",
+    "NOTIFICATION_DELIVERIES",
+    "TELEGRAM_RATE_LIMITED",
+    "TELEGRAM_REQUEST_SECONDS",
+    "MetricsMiddleware",
+    "render_metrics",
+    "track_db_time",
+    "track_pool",
+)
+
+from .collectors import (
+    DB_CALL_SECONDS,
+    DB_POOL_CHECKED_OUT,
+    HTTP_REQUEST_BYTES,
+    HTTP_REQUEST_SECONDS,
+    NOTIFICATION_DEAD_LETTERS,
+    NOTIFICATION_DELIVERIES,
+    TELEGRAM_RATE_LIMITED,
+    TELEGRAM_REQUEST_SECONDS,
+    render_metrics,
+)
+from .instrument import track_db_time, track_pool
+from .middleware import MetricsMiddleware
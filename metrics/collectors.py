@@ -0,0 +1,80 @@
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# From a cache hit of the database to a slow upload to Telegram
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 256 B to 64 MB: from a short message to a request with large Base64 documents
+SIZE_BUCKETS = tuple(256 * 4**power for power in range(10))
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_BYTES = Histogram(
+    "http_request_size_bytes",
+    "Size of HTTP request bodies with a Content-Length",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+DB_CALL_SECONDS = Histogram(
+    "db_call_duration_seconds",
+    "Time spent in a CRUD call, waiting for a pooled connection included",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections checked out of the pool",
+    # Summed over the running workers
+    multiprocess_mode="livesum",
+)
+TELEGRAM_REQUEST_SECONDS = Histogram(
+    "telegram_request_duration_seconds",
+    "Time of a Bot API call, rate limit waits excluded",
+    ["method", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+TELEGRAM_RATE_LIMITED = Counter(
+    "telegram_rate_limited_total",
+    "Bot API calls refused with 429 Too Many Requests",
+    ["method"],
+)
+NOTIFICATION_DELIVERIES = Counter(
+    "notification_deliveries_total",
+    "Delivery attempts of notifications by outcome",
+    ["status"],
+)
+NOTIFICATION_DEAD_LETTERS = Counter(
+    "notification_dead_letters_total",
+    "Notifications that ran out of delivery attempts",
+)
+
+
+def render_metrics() -> bytes:
+    """
+    Render the metrics in the Prometheus text format.
+
+    With `PROMETHEUS_MULTIPROC_DIR` set, as under gunicorn, the samples every
+    worker wrote to that directory are aggregated, so any worker serves the
+    metrics of all of them. Otherwise the metrics of this process are
+    rendered.
+
+    :return: Metrics exposition.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
@@ -0,0 +1,58 @@
+import functools
+import time
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from tracing import span
+
+from .collectors import DB_CALL_SECONDS, DB_POOL_CHECKED_OUT
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+def track_db_time(
+    func: Callable[P, Awaitable[T]],
+) -> Callable[P, Awaitable[T]]:
+    """
+    Observe the duration of every call of a CRUD function.
+
+    The histogram child is bound once, a call only costs two clock reads and
+    an observation. With tracing enabled the call is also recorded as a
+    `crud.<name>` span, the parent of the spans of its SQL statements.
+
+    :param func: Async CRUD function.
+    :return: Timed function, labelled with the name of `func`.
+    """
+    histogram = DB_CALL_SECONDS.labels(func.__name__)
+    span_name = f"crud.{func.__name__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        started = time.perf_counter()
+        try:
+            with span(span_name):
+                return await func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def track_pool(engine: AsyncEngine) -> None:
+    """
+    Keep the gauge of the connections checked out of the pool of an engine.
+
+    :param engine: Async database engine.
+    :return: None
+    """
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def checkout(*args) -> None:
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def checkin(*args) -> None:
+        DB_POOL_CHECKED_OUT.dec()
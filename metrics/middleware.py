@@ -0,0 +1,48 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .collectors import HTTP_REQUEST_BYTES, HTTP_REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing the latency and body size of HTTP requests.
+
+    Requests are labelled with the path template of their route rather than
+    the path, so the number of series stays bounded; requests matching no
+    route share one label. Being plain ASGI, the middleware neither buffers
+    nor wraps the bodies.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, path, status_code).observe(elapsed)
+
+            for name, value in scope["headers"]:
+                if name == b"content-length" and value.isdigit():
+                    HTTP_REQUEST_BYTES.labels(method, path).observe(int(value))
+                    break
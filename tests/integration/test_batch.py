@@ -0,0 +1,151 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from api.api_v1.services import generate_token, outbox
+from config import config
+from database.models import Notification, NotificationStatus
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+URL = config.api.prefix + config.api.v1.prefix + "/notifications:batch"
+
+CHAT_IDS = [config.test_chat_id]
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch):
+    """Enables the outbox and points its workers at the test database."""
+    monkeypatch.setattr(config.outbox, "enabled", True)
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+class TestBatch:
+    """Sending many notifications in one request."""
+
+    async def test_batch__json(self, client: AsyncClient, outbox_enabled):
+        """Every item of a JSON array gets its own notifications."""
+        headers = {"Authorization": generate_token()}
+        data = [
+            {"chatIds": CHAT_IDS, "message": f"Batch message {i}"} for i in range(3)
+        ]
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        items = response.json().get("items")
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert all(len(item["notificationIds"]) == len(CHAT_IDS) for item in items)
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification.message).where(
+                    Notification.id.in_(
+                        [id_ for item in items for id_ in item["notificationIds"]]
+                    )
+                )
+            )
+            assert sorted(result.scalars()) == [item["message"] for item in data]
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_batch__same_chat_and_text(self, client: AsyncClient, outbox_enabled):
+        """Items differing only by attachments and `sendAt` keep their own."""
+        headers = {"Authorization": generate_token()}
+        send_at = datetime.now(timezone.utc) + timedelta(days=1)
+        data = [
+            {
+                "chatIds": CHAT_IDS,
+                "message": "Batch twin message",
+                "documents": [{"buffer": "VHdpbiBB", "name": "twin_a.txt"}],
+                "sendAt": send_at.isoformat(),
+            },
+            {
+                "chatIds": CHAT_IDS,
+                "message": "Batch twin message",
+                "documents": [{"buffer": "VHdpbiBC", "name": "twin_b.txt"}],
+            },
+        ]
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        items = response.json().get("items")
+        async with TestingSessionLocal() as session:
+            for item, name, expected_status in zip(
+                items,
+                ["twin_a.txt", "twin_b.txt"],
+                [NotificationStatus.SCHEDULED, NotificationStatus.PENDING],
+            ):
+                notification = await session.scalar(
+                    select(Notification)
+                    .where(Notification.id == item["notificationIds"][0])
+                    .options(selectinload(Notification.documents))
+                )
+                assert [document.name for document in notification.documents] == [name]
+                assert notification.status == expected_status
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_batch__ndjson(self, client: AsyncClient, outbox_enabled):
+        """Invalid NDJSON lines are reported without failing the rest."""
+        headers = {
+            "Authorization": generate_token(),
+            "Content-Type": "application/x-ndjson",
+        }
+        lines = [
+            json.dumps({"chatIds": CHAT_IDS, "message": "Batch NDJSON message"}),
+            json.dumps({"chatIds": [], "message": "No chats"}),
+            "",
+            "not json",
+        ]
+
+        response = await client.post(url=URL, content="\n".join(lines), headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        items = response.json().get("items")
+        assert len(items) == 3
+        assert len(items[0]["notificationIds"]) == len(CHAT_IDS)
+        assert items[1]["error"] is not None
+        assert items[2]["error"] is not None
+
+        while await outbox.drain_once():
+            pass
+
+
+class TestBatchError:
+    """Errors of the batch endpoint."""
+
+    async def test_error__not_array(self, client: AsyncClient):
+        """A JSON object instead of an array is rejected."""
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": "Not an array"}
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_error__too_large(self, client: AsyncClient, monkeypatch):
+        """A batch over the size limit is rejected."""
+        monkeypatch.setattr(config.api, "batch_max_size", 1)
+        headers = {"Authorization": generate_token()}
+        data = [{"chatIds": CHAT_IDS, "message": "Too large"}] * 2
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    async def test_error__invalid_token(self, client: AsyncClient):
+        """A batch with an invalid token is rejected."""
+        headers = {"Authorization": "invalid_token"}
+
+        response = await client.post(url=URL, json=[], headers=headers)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
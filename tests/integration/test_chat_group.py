@@ -0,0 +1,222 @@
+import itertools
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import replace_chat_group_members
+from api.api_v1.services import AudienceCache, generate_token
+from config import config
+from database.models import Notification
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+API = config.api.prefix + config.api.v1.prefix
+PREFIX = API + "/chat-groups"
+
+CHAT_IDS = [config.test_chat_id]
+MESSAGE = "Chat group test message"
+
+# Every test works with groups of its own
+NAMES = (f"test-group-{i}" for i in itertools.count())
+
+
+@pytest.fixture
+async def group(client: AsyncClient) -> str:
+    """Creates a chat group of the test chat, returns its name."""
+    name = next(NAMES)
+    headers = {"Authorization": generate_token()}
+
+    response = await client.post(
+        url=PREFIX, json={"name": name, "chatIds": CHAT_IDS}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    return name
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch):
+    """Enables the outbox and points its workers at the test database."""
+    monkeypatch.setattr(config.outbox, "enabled", True)
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+class TestChatGroup:
+    """Managing chat groups."""
+
+    async def test_create(self, client: AsyncClient):
+        """A new group holds its members once each, at version 1."""
+        name = next(NAMES)
+        headers = {"Authorization": generate_token()}
+        data = {"name": name, "chatIds": [3, 1, 3, 2]}
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("name") == name
+        assert response.json().get("chatIds") == [1, 2, 3]
+        assert response.json().get("size") == 3
+        assert response.json().get("version") == 1
+
+    async def test_create__duplicate(self, client: AsyncClient, group: str):
+        """Fail: a group with the name exists."""
+        headers = {"Authorization": generate_token()}
+
+        response = await client.post(
+            url=PREFIX, json={"name": group, "chatIds": [1]}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    async def test_create__invalid_name(self, client: AsyncClient):
+        """Fail: the name cannot be used in a URL."""
+        headers = {"Authorization": generate_token()}
+
+        response = await client.post(
+            url=PREFIX,
+            json={"name": "on call/backend", "chatIds": [1]},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_get_and_list(self, client: AsyncClient, group: str):
+        """A group is listed without its members and read with them."""
+        response = await client.get(
+            url=f"{PREFIX}/{group}", headers={"Authorization": generate_token()}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json().get("chatIds") == CHAT_IDS
+
+        response = await client.get(
+            url=PREFIX, headers={"Authorization": generate_token()}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        listed = {item["name"]: item for item in response.json()}
+        assert listed[group]["size"] == len(CHAT_IDS)
+        assert "chatIds" not in listed[group]
+
+    async def test_replace(self, client: AsyncClient, group: str):
+        """Replacing the members bumps the version."""
+        headers = {"Authorization": generate_token()}
+
+        response = await client.put(
+            url=f"{PREFIX}/{group}", json={"chatIds": [5, 4]}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json().get("chatIds") == [4, 5]
+        assert response.json().get("version") == 2
+
+    async def test_delete(self, client: AsyncClient, group: str):
+        """A deleted group is gone."""
+        response = await client.delete(
+            url=f"{PREFIX}/{group}", headers={"Authorization": generate_token()}
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await client.get(
+            url=f"{PREFIX}/{group}", headers={"Authorization": generate_token()}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_missing(self, client: AsyncClient):
+        """Fail: the group does not exist."""
+        headers = {"Authorization": generate_token()}
+
+        response = await client.put(
+            url=f"{PREFIX}/missing", json={"chatIds": [1]}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestAudience:
+    """Sending notifications to a chat group."""
+
+    async def test_send__audience(self, client: AsyncClient, group: str):
+        """The members of the audience receive the message."""
+        headers = {"Authorization": generate_token()}
+        data = {"audience": group, "message": MESSAGE}
+
+        response = await client.post(
+            url=API + "/notifications", json=data, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("chatIds") == CHAT_IDS
+        assert response.json().get("audience") == group
+        assert [result["chatId"] for result in response.json()["results"]] == CHAT_IDS
+
+    async def test_send__audience_and_chat_ids(self, client: AsyncClient, group: str):
+        """Chats both listed and in the audience receive the message once."""
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "audience": group, "message": MESSAGE}
+
+        response = await client.post(
+            url=API + "/notifications", json=data, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.json().get("notificationIds")) == len(CHAT_IDS)
+
+    async def test_send__unknown_audience(self, client: AsyncClient):
+        """Fail: the audience does not exist."""
+        headers = {"Authorization": generate_token()}
+        data = {"audience": "missing", "message": MESSAGE}
+
+        response = await client.post(
+            url=API + "/notifications", json=data, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_batch__audience(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        group: str,
+        outbox_enabled,
+    ):
+        """Batch items may name audiences, unknown ones are reported."""
+        headers = {"Authorization": generate_token()}
+        data = [
+            {"audience": group, "message": MESSAGE},
+            {"audience": "missing", "message": MESSAGE},
+        ]
+
+        response = await client.post(
+            url=API + "/notifications:batch", json=data, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        first, second = response.json().get("items")
+        assert second["notificationIds"] == []
+        assert "missing" in second["error"]
+
+        result = await db_session.execute(
+            select(Notification.chat_id).where(
+                Notification.id.in_(first["notificationIds"])
+            )
+        )
+        assert list(result.scalars()) == CHAT_IDS
+
+
+class TestAudienceCache:
+    """Memberships cached by group version."""
+
+    async def test_cache(self, db_session: AsyncSession, group: str):
+        """Members are reused until the version of the group changes."""
+        cache = AudienceCache()
+
+        first = await cache.resolve(db_session, [group, "missing"])
+        again = await cache.resolve(db_session, [group])
+        assert first == {group: tuple(CHAT_IDS)}
+        assert again[group] is first[group]
+
+        await replace_chat_group_members(db_session, group, [7])
+        changed = await cache.resolve(db_session, [group])
+        assert changed == {group: (7,)}
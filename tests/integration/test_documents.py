@@ -0,0 +1,83 @@
+import base64
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import document_digest, resolve_documents
+from api.api_v1.models import Document as DocumentRequest
+from database import blob_storage
+from database.models import Document
+
+CONTENT = b"Deduplication test"
+SHA256 = document_digest(CONTENT)
+
+
+def sent(name: str, content: bytes = CONTENT) -> DocumentRequest:
+    return DocumentRequest(buffer=base64.b64encode(content), name=name)
+
+
+async def count_documents(session: AsyncSession, sha256: str) -> int:
+    return await session.scalar(
+        select(func.count()).select_from(Document).where(Document.sha256 == sha256)
+    )
+
+
+class TestDocumentDedup:
+    """Deduplication of stored documents by content digest and name."""
+
+    async def test_resolve__same_document(self, db_session: AsyncSession):
+        """A document sent again is resolved to its stored row."""
+        first = await resolve_documents(db_session, [sent("dedup.txt")])
+        await db_session.commit()
+
+        second = await resolve_documents(db_session, [sent("dedup.txt")])
+        await db_session.commit()
+
+        assert first[0].id == second[0].id
+        assert first[0].sha256 == SHA256
+        assert await count_documents(db_session, SHA256) == 1
+
+    async def test_resolve__repeated(self, db_session: AsyncSession):
+        """A document repeated within one request is stored once."""
+        content = b"Deduplication test, repeated"
+        documents = await resolve_documents(
+            db_session, [sent("repeated.txt", content)] * 2
+        )
+        await db_session.commit()
+
+        assert documents[0] is documents[1]
+        assert await count_documents(db_session, document_digest(content)) == 1
+
+    async def test_resolve__other_name(self, db_session: AsyncSession):
+        """The same content under another name is another document, one blob."""
+        content = b"Deduplication test, renamed"
+        sha256 = document_digest(content)
+        documents = await resolve_documents(
+            db_session,
+            [sent("original.txt", content), sent("renamed.txt", content)],
+        )
+        await db_session.commit()
+
+        assert documents[0].id != documents[1].id
+        assert {document.sha256 for document in documents} == {sha256}
+        assert await count_documents(db_session, sha256) == 2
+        assert bytes(await blob_storage.read(documents[1])) == content
+
+    async def test_unique__digest_and_name(self, db_session: AsyncSession):
+        """The table refuses a second row with the same digest and name."""
+        content = b"Deduplication test, unique"
+        await resolve_documents(db_session, [sent("unique.txt", content)])
+        await db_session.commit()
+
+        db_session.add(
+            Document(
+                name="unique.txt",
+                sha256=document_digest(content),
+                size=len(content),
+            )
+        )
+        with pytest.raises(IntegrityError):
+            await db_session.commit()
+        await db_session.rollback()
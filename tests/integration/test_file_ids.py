@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import itertools
+import uuid
+from datetime import datetime
+
+import pytest
+from aiogram import Bot
+from aiogram.methods import SendMediaGroup
+from aiogram.types import Chat, Document as TelegramDocument, Message
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from api.api_v1.services import generate_token
+from config import config
+from database.models import Document, DocumentFileId
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+from tg_bot.bot import BotService
+from tg_bot.utils.file_id_cache import FileIdCache
+
+URL = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id, config.test_chat_id + 1, config.test_chat_id + 2]
+MESSAGE = "File id test message"
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    """
+    Answers Bot API requests like Telegram, a new file id for every upload.
+
+    :return: Media of the sent albums, file ids and uploaded files alike.
+    """
+    media = []
+    ids = itertools.count(1)
+
+    async def answer(self, method, request_timeout=None):
+        chat = Chat(id=method.chat_id, type="private")
+        if not isinstance(method, SendMediaGroup):
+            return Message(message_id=next(ids), date=datetime.now(), chat=chat)
+
+        messages = []
+        for item in method.media:
+            media.append(item.media)
+            file_id = item.media if isinstance(item.media, str) else f"file-{next(ids)}"
+            messages.append(
+                Message(
+                    message_id=next(ids),
+                    date=datetime.now(),
+                    chat=chat,
+                    document=TelegramDocument(file_id=file_id, file_unique_id=file_id),
+                )
+            )
+        return messages
+
+    monkeypatch.setattr(Bot, "__call__", answer)
+    monkeypatch.setattr(BotService, "file_ids", FileIdCache())
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+    return media
+
+
+def document() -> dict:
+    # Unique content, so the document is not shared with other tests
+    content = f"File id test {uuid.uuid4()}".encode()
+    return {
+        "name": "file_id.txt",
+        "buffer": base64.b64encode(content).decode(),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+async def send(client: AsyncClient, data: dict) -> None:
+    headers = {"Authorization": generate_token()}
+    response = await client.post(url=URL, json=data, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+class TestFileIds:
+    """Reuse of the Telegram file ids of uploaded documents."""
+
+    async def test_upload_once(self, client: AsyncClient, telegram):
+        """A document sent to many chats is uploaded once."""
+        file = document()
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": MESSAGE,
+            "documents": [{"name": file["name"], "buffer": file["buffer"]}],
+        }
+
+        await send(client, data)
+
+        async with TestingSessionLocal() as session:
+            stored = (
+                await session.scalars(
+                    select(DocumentFileId)
+                    .join(Document)
+                    .where(Document.sha256 == file["sha256"])
+                )
+            ).all()
+        assert [row.bot_id for row in stored] == [BotService.route(CHAT_IDS[0]).id]
+
+        # The first chat gets the upload, the others its file id
+        assert len(telegram) == len(CHAT_IDS)
+        assert not isinstance(telegram[0], str)
+        assert telegram[1:] == [stored[0].file_id] * (len(CHAT_IDS) - 1)
+
+    async def test_reuse__cached(self, client: AsyncClient, telegram):
+        """A later send reuses the file id kept in memory."""
+        file = document()
+        data = {
+            "chatIds": CHAT_IDS[:1],
+            "message": MESSAGE,
+            "documents": [{"name": file["name"], "buffer": file["buffer"]}],
+        }
+
+        await send(client, data)
+        await send(client, data)
+
+        assert len(telegram) == 2
+        assert not isinstance(telegram[0], str)
+        assert isinstance(telegram[1], str)
+
+    async def test_reuse__stored(self, client: AsyncClient, telegram, monkeypatch):
+        """A later send reuses the stored file id once it left the memory."""
+        file = document()
+        data = {
+            "chatIds": CHAT_IDS[:1],
+            "message": MESSAGE,
+            "documents": [{"name": file["name"], "buffer": file["buffer"]}],
+        }
+
+        await send(client, data)
+        monkeypatch.setattr(BotService, "file_ids", FileIdCache())
+        await send(client, data)
+
+        assert len(telegram) == 2
+        assert not isinstance(telegram[0], str)
+        assert isinstance(telegram[1], str)
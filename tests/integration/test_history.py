@@ -0,0 +1,125 @@
+import itertools
+
+import orjson
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import create_notifications
+from api.api_v1.models import Document as DocumentRequest
+from api.api_v1.services import generate_token
+from config import config
+from database.models import NotificationStatus
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+MESSAGE = "History test message"
+
+# Every test lists a chat of its own
+CHAT_IDS = itertools.count(-1002000000000, -1)
+
+
+@pytest.fixture
+async def history(db_session: AsyncSession) -> tuple[int, list[int]]:
+    """Creates notifications to a new chat, returns the chat and their ids."""
+    chat_id = next(CHAT_IDS)
+    notifications = []
+    for i in range(5):
+        notifications += await create_notifications(
+            session=db_session,
+            chat_ids=[chat_id],
+            message=f"{MESSAGE} {i}",
+            status=NotificationStatus.SENT if i % 2 else NotificationStatus.FAILED,
+            documents=[
+                DocumentRequest(buffer=b"SGlzdG9yeQ==", name="history.txt"),
+            ],
+        )
+    await db_session.commit()
+    return chat_id, [notification.id for notification in notifications]
+
+
+async def get_history(client: AsyncClient, **params) -> dict:
+    headers = {"Authorization": generate_token()}
+    response = await client.get(url=PREFIX, params=params, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+class TestHistory:
+    """Listing the stored notifications."""
+
+    async def test_history__chat(self, client: AsyncClient, history: tuple):
+        """Only the notifications to the chat are listed, the newest first."""
+        chat_id, ids = history
+
+        body = await get_history(client, chatId=chat_id)
+
+        assert [item["id"] for item in body["items"]] == ids[::-1]
+        assert body["nextCursor"] is None
+        assert all(item["message"].startswith(MESSAGE) for item in body["items"])
+
+    async def test_history__pages(self, client: AsyncClient, history: tuple):
+        """Pages follow each other without gaps or overlaps."""
+        chat_id, ids = history
+
+        listed = []
+        cursor = None
+        while True:
+            params = {"chatId": chat_id, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            body = await get_history(client, **params)
+            listed += [item["id"] for item in body["items"]]
+            cursor = body["nextCursor"]
+            if cursor is None:
+                break
+
+        assert listed == ids[::-1]
+
+    async def test_history__status(self, client: AsyncClient, history: tuple):
+        """Only the notifications with the requested statuses are listed."""
+        chat_id, ids = history
+
+        body = await get_history(client, chatId=chat_id, status="sent")
+
+        assert [item["id"] for item in body["items"]] == ids[1::2][::-1]
+        assert {item["status"] for item in body["items"]} == {"sent"}
+
+    async def test_history__documents(self, client: AsyncClient, history: tuple):
+        """Documents are only included on request, without their contents."""
+        chat_id, _ = history
+
+        body = await get_history(client, chatId=chat_id, limit=1)
+        assert body["items"][0]["documents"] is None
+
+        body = await get_history(client, chatId=chat_id, limit=1, includeDocuments=True)
+        documents = body["items"][0]["documents"]
+        assert [document["name"] for document in documents] == ["history.txt"]
+        assert "buffer" not in documents[0]
+
+    async def test_history__ndjson(self, client: AsyncClient, history: tuple):
+        """Items are streamed one per line with the cursor in a header."""
+        chat_id, ids = history
+        headers = {"Authorization": generate_token(), "Accept": "application/x-ndjson"}
+
+        response = await client.get(
+            url=PREFIX, params={"chatId": chat_id, "limit": 3}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = response.content.splitlines()
+        assert [orjson.loads(line)["id"] for line in lines] == ids[:-4:-1]
+        assert response.headers.get("X-Next-Cursor")
+
+    async def test_history__invalid_cursor(self, client: AsyncClient):
+        """A malformed cursor is rejected."""
+        headers = {"Authorization": generate_token()}
+
+        response = await client.get(
+            url=PREFIX, params={"cursor": "not-a-cursor"}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from api.api_v1.routers import notification as notification_router
+from api.api_v1.services import generate_token, idempotency, outbox
+from config import config
+from database.models import IdempotencyKey, Notification
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch):
+    """Enables the outbox and points its workers at the test database."""
+    monkeypatch.setattr(config.outbox, "enabled", True)
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+async def count_notifications(message: str) -> int:
+    async with TestingSessionLocal() as session:
+        result = await session.execute(
+            select(func.count()).where(Notification.message == message)
+        )
+        return result.scalar_one()
+
+
+class TestIdempotency:
+    """Requests repeated with an Idempotency-Key."""
+
+    async def test_repeat__cached(self, client: AsyncClient, outbox_enabled):
+        """A repeated request gets the first response and creates nothing."""
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "repeat"}
+        data = {"chatIds": CHAT_IDS, "message": "Idempotent message"}
+
+        first = await client.post(url=PREFIX, json=data, headers=headers)
+        second = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert first.status_code == status.HTTP_202_ACCEPTED
+        assert second.status_code == first.status_code
+        assert second.json() == first.json()
+        assert await count_notifications(data["message"]) == len(CHAT_IDS)
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_repeat__documents(self, client: AsyncClient, outbox_enabled):
+        """Documents are echoed by a repeated request, but not stored."""
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "documents"}
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": "Idempotent message with a document",
+            "documents": [{"buffer": "SWRlbXBvdGVudA==", "name": "idempotent.txt"}],
+        }
+
+        first = await client.post(url=PREFIX, json=data, headers=headers)
+        idempotency._responses.clear()
+        second = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert first.json()["documents"] == data["documents"]
+        assert second.json() == first.json()
+        async with TestingSessionLocal() as session:
+            row = await session.get(IdempotencyKey, "documents")
+            assert b"SWRlbXBvdGVudA==" not in row.response
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_repeat__expired(
+        self, client: AsyncClient, outbox_enabled, monkeypatch
+    ):
+        """A request with an expired key is processed again."""
+        monkeypatch.setattr(idempotency, "ttl", 0.05)
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "expired"}
+        data = {"chatIds": CHAT_IDS, "message": "Expired idempotent message"}
+
+        first = await client.post(url=PREFIX, json=data, headers=headers)
+        await asyncio.sleep(0.1)
+        second = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert second.status_code == first.status_code
+        assert second.json()["notificationIds"] != first.json()["notificationIds"]
+        assert await count_notifications(data["message"]) == 2 * len(CHAT_IDS)
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_repeat__concurrent(self, client: AsyncClient, outbox_enabled):
+        """A concurrent duplicate waits for the first request."""
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "concurrent"}
+        data = {"chatIds": CHAT_IDS, "message": "Concurrent idempotent message"}
+
+        responses = await asyncio.gather(
+            *(client.post(url=PREFIX, json=data, headers=headers) for _ in range(3))
+        )
+
+        assert len({response.text for response in responses}) == 1
+        assert await count_notifications(data["message"]) == len(CHAT_IDS)
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_repeat__cancelled(
+        self, client: AsyncClient, outbox_enabled, monkeypatch
+    ):
+        """A request retried after the first one was cancelled is processed."""
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "cancelled"}
+        data = {"chatIds": CHAT_IDS, "message": "Cancelled idempotent message"}
+        dispatch = notification_router.dispatch_notifications
+        started = asyncio.Event()
+
+        async def hang(**kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        monkeypatch.setattr(notification_router, "dispatch_notifications", hang)
+        first = asyncio.create_task(client.post(url=PREFIX, json=data, headers=headers))
+        await started.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert "cancelled" not in idempotency._in_flight
+
+        monkeypatch.setattr(notification_router, "dispatch_notifications", dispatch)
+        headers["Authorization"] = generate_token()
+        response = await asyncio.wait_for(
+            client.post(url=PREFIX, json=data, headers=headers), timeout=5
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert await count_notifications(data["message"]) == len(CHAT_IDS)
+
+        while await outbox.drain_once():
+            pass
+
+    async def test_error__different_request(self, client: AsyncClient, outbox_enabled):
+        """Fail: the key was used for another request."""
+        headers = {"Authorization": generate_token(), "Idempotency-Key": "different"}
+
+        await client.post(
+            url=PREFIX,
+            json={"chatIds": CHAT_IDS, "message": "First message"},
+            headers=headers,
+        )
+        response = await client.post(
+            url=PREFIX,
+            json={"chatIds": CHAT_IDS, "message": "Second message"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        while await outbox.drain_once():
+            pass
@@ -0,0 +1,190 @@
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select, update
+
+from api.api_v1.crud import document_digest
+from api.api_v1.services import MaintenanceTask, generate_token
+from config import config
+from database import blob_storage
+from database.models import (
+    DeadLetter,
+    Document,
+    IdempotencyKey,
+    Notification,
+    NotificationDocument,
+    NotificationStatus,
+)
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+MESSAGE = "Maintenance test message"
+
+
+@pytest.fixture
+def test_sessions(monkeypatch):
+    """Points the maintenance at the test database."""
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+    # Blobs written by the tests are deleted right away
+    monkeypatch.setattr(blob_storage, "delete_grace", 0)
+
+
+async def send(client: AsyncClient, documents: list | None = None) -> list[int]:
+    headers = {"Authorization": generate_token()}
+    data = {"chatIds": CHAT_IDS, "message": MESSAGE, "documents": documents}
+
+    response = await client.post(url=PREFIX, json=data, headers=headers)
+
+    return response.json().get("notificationIds")
+
+
+class TestMaintenance:
+    """Retention of notifications in tables that are not partitioned."""
+
+    async def test_retention(self, client: AsyncClient, test_sessions):
+        """Expired rows and what only they referenced are deleted in batches."""
+        content = uuid.uuid4().bytes
+        buffer = base64.b64encode(content).decode()
+        blob_path = blob_storage.path(document_digest(content))
+        expired_ids = await send(client, [{"buffer": buffer, "name": "old.txt"}])
+        kept_ids = await send(client)
+        old = datetime.now(timezone.utc) - timedelta(days=31)
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(expired_ids))
+                .values(created_at=old)
+            )
+            await session.execute(
+                insert(DeadLetter).values(notification_id=expired_ids[0], attempts=5)
+            )
+            await session.execute(
+                insert(IdempotencyKey).values(
+                    key="maintenance", fingerprint="0" * 64, created_at=old
+                )
+            )
+            await session.commit()
+            document_ids = list(
+                await session.scalars(
+                    select(NotificationDocument.document_id).where(
+                        NotificationDocument.notification_id.in_(expired_ids)
+                    )
+                )
+            )
+
+        assert blob_path.exists()
+
+        await MaintenanceTask(retention_days=30, batch_size=1).run_once()
+
+        assert not blob_path.exists()
+        async with TestingSessionLocal() as session:
+            notification_ids = set(
+                await session.scalars(
+                    select(Notification.id).where(
+                        Notification.id.in_(expired_ids + kept_ids)
+                    )
+                )
+            )
+            assert notification_ids == set(kept_ids)
+            assert not await session.scalar(
+                select(NotificationDocument.document_id).where(
+                    NotificationDocument.notification_id.in_(expired_ids)
+                )
+            )
+            assert not await session.scalar(
+                select(Document.id).where(Document.id.in_(document_ids))
+            )
+            assert not await session.scalar(
+                select(DeadLetter.id).where(DeadLetter.notification_id.in_(expired_ids))
+            )
+            assert not await session.get(IdempotencyKey, "maintenance")
+
+    async def test_retention__shared_blob(self, client: AsyncClient, test_sessions):
+        """A blob is kept while another document has the same content."""
+        content = uuid.uuid4().bytes
+        buffer = base64.b64encode(content).decode()
+        expired_ids = await send(client, [{"buffer": buffer, "name": "old.txt"}])
+        await send(client, [{"buffer": buffer, "name": "new.txt"}])
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(expired_ids))
+                .values(created_at=datetime.now(timezone.utc) - timedelta(days=31))
+            )
+            await session.commit()
+
+        await MaintenanceTask(retention_days=30).run_once()
+
+        async with TestingSessionLocal() as session:
+            names = await session.scalars(
+                select(Document.name).where(Document.sha256 == document_digest(content))
+            )
+            assert list(names) == ["new.txt"]
+        assert blob_storage.path(document_digest(content)).exists()
+
+    async def test_retention__disabled(self, client: AsyncClient, test_sessions):
+        """Nothing expires without a retention."""
+        notification_ids = await send(client)
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(notification_ids))
+                .values(created_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+            )
+            await session.commit()
+
+        await MaintenanceTask(retention_days=0).run_once()
+
+        async with TestingSessionLocal() as session:
+            result = await session.scalars(
+                select(Notification.id).where(Notification.id.in_(notification_ids))
+            )
+            assert list(result) == notification_ids
+
+
+class TestRecovery:
+    """Direct deliveries abandoned by a process that is gone."""
+
+    async def test_recover_abandoned(self, client: AsyncClient, test_sessions):
+        """Notifications claimed long ago are claimed again and delivered."""
+        abandoned_ids = await send(client)
+        claimed_ids = await send(client)
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(abandoned_ids + claimed_ids))
+                .values(status=NotificationStatus.PROCESSING)
+            )
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(abandoned_ids))
+                .values(claimed_at=datetime.now(timezone.utc) - timedelta(hours=1))
+            )
+            await session.commit()
+
+        await MaintenanceTask(recover_abandoned=True, lease_timeout=300).run_once()
+
+        async with TestingSessionLocal() as session:
+            statuses = dict(
+                (
+                    await session.execute(
+                        select(Notification.id, Notification.status).where(
+                            Notification.id.in_(abandoned_ids + claimed_ids)
+                        )
+                    )
+                ).all()
+            )
+        assert all(
+            statuses[notification_id] != NotificationStatus.PROCESSING
+            for notification_id in abandoned_ids
+        )
+        assert all(
+            statuses[notification_id] == NotificationStatus.PROCESSING
+            for notification_id in claimed_ids
+        )
@@ -0,0 +1,37 @@
+from fastapi import status
+from httpx import AsyncClient
+
+from api.api_v1.services import generate_token
+from config import config
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+
+
+class TestMetricsEndpoint:
+    """Prometheus metrics exposed by the application."""
+
+    async def test_metrics(self, client: AsyncClient):
+        """A sent notification shows up in the HTTP, CRUD and delivery metrics."""
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": "Metrics test message"}
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = await client.get(url=config.metrics.path)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert (
+            'http_request_duration_seconds_count{method="POST",'
+            f'route="{PREFIX}",status="201"}}'
+        ) in body
+        assert (
+            f'http_request_size_bytes_count{{method="POST",route="{PREFIX}"}}' in body
+        )
+        assert (
+            'db_call_duration_seconds_count{operation="create_notifications"}' in body
+        )
+        assert 'notification_deliveries_total{status="sent"}' in body
@@ -1,11 +1,17 @@
 import base64
+import hashlib
 from pathlib import Path
 
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 from api.api_v1.services import generate_token
 from config import config
+from database import blob_storage
+from database.models import Notification
+from fixtures.database import TestingSessionLocal
 
 PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
 
@@ -101,6 +107,56 @@ class TestNotificationSuccess:
         assert response.json().get("documents") == data["documents"]
         assert response.json().get("createdAt") is not None
 
+    async def test_send__binary_file(self, client: AsyncClient):
+        """A binary file is stored as raw bytes and echoed back in Base64."""
+        content = bytes(range(256))
+        token = generate_token()
+        headers = {"Authorization": token}
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": MESSAGE,
+            "documents": [
+                {
+                    "buffer": base64.b64encode(content).decode("utf-8"),
+                    "name": "binary.bin",
+                },
+            ],
+        }
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("documents") == data["documents"]
+        async with TestingSessionLocal() as session:
+            notification = await session.scalar(
+                select(Notification)
+                .where(Notification.id == response.json()["notificationIds"][0])
+                .options(selectinload(Notification.documents))
+            )
+        document = notification.documents[0]
+        assert document.size == len(content)
+        assert document.sha256 == hashlib.sha256(content).hexdigest()
+        assert bytes(await blob_storage.read(document)) == content
+
+    async def test_upload__with_file(self, client: AsyncClient):
+        """Send message with a file uploaded as multipart/form-data."""
+        token = generate_token()
+        headers = {"Authorization": token}
+        data = {
+            "chatIds": [str(chat_id) for chat_id in CHAT_IDS],
+            "message": MESSAGE,
+        }
+        files = [("documents", (FILE_NAME, FILE_PATH.read_bytes()))]
+
+        response = await client.post(
+            url=PREFIX + "/upload", data=data, files=files, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("message") == data["message"]
+        assert response.json().get("documents") is None
+        assert response.json().get("createdAt") is not None
+
 
 class TestNotificationFailure:
     """Notification error handling."""
@@ -180,3 +236,16 @@ class TestNotificationFailure:
 
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
         assert response.json().get("detail") == "chatIds must not be empty"
+
+    async def test_error__empty_message(self, client: AsyncClient):
+        """Fail: message is empty and there are no documents."""
+        token = generate_token()
+        headers = {"Authorization": token}
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": " ",
+        }
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
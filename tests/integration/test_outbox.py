@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from api.api_v1.services import generate_token, outbox
+from config import config
+from database.models import Notification, NotificationStatus
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+MESSAGE = "Outbox test message"
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch):
+    """Enables the outbox and points its workers at the test database."""
+    monkeypatch.setattr(config.outbox, "enabled", True)
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+class TestOutbox:
+    """Queued notification delivery."""
+
+    async def test_queue__accepted(self, client: AsyncClient, outbox_enabled):
+        """The request is accepted and the notification is delivered later."""
+        token = generate_token()
+        headers = {"Authorization": token}
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": MESSAGE,
+        }
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json().get("results") == []
+        notification_ids = response.json().get("notificationIds")
+        assert len(notification_ids) == len(CHAT_IDS)
+
+        assert await outbox.drain_once() == len(CHAT_IDS)
+        assert await outbox.drain_once() == 0
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification.status).where(Notification.id.in_(notification_ids))
+            )
+            assert set(result.scalars()) == {NotificationStatus.SENT}
+
+    async def test_queue__delivery_recorded(self, client: AsyncClient, outbox_enabled):
+        """The outcome of the delivery is stored with the notification."""
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": MESSAGE}
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+        notification_ids = response.json().get("notificationIds")
+        await outbox.drain_once()
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification).where(Notification.id.in_(notification_ids))
+            )
+            for notification in result.scalars():
+                assert notification.status == NotificationStatus.SENT
+                assert notification.attempts == 1
+                assert notification.last_error is None
+                assert notification.sent_at is not None
+                assert notification.telegram_message_ids
+                assert notification.send_latency_ms >= 0
+                assert notification.bot_id is not None
+
+    async def test_queue__coalesced(
+        self, client: AsyncClient, outbox_enabled, monkeypatch
+    ):
+        """A burst to a coalesced chat is held back and sent as one message."""
+        monkeypatch.setattr(outbox, "coalesce_window", 60)
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": "Coalesced message"}
+
+        notification_ids = []
+        for _ in range(3):
+            response = await client.post(url=PREFIX, json=data, headers=headers)
+            notification_ids += response.json().get("notificationIds")
+
+        assert await outbox.drain_once() == 0
+
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(Notification)
+                .where(Notification.id == notification_ids[0])
+                .values(created_at=datetime.now(timezone.utc) - timedelta(minutes=2))
+            )
+            await session.commit()
+
+        assert await outbox.drain_once() == len(notification_ids)
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification.digest_id, Notification.status).where(
+                    Notification.id.in_(notification_ids)
+                )
+            )
+            rows = result.all()
+        assert {digest_id for digest_id, _ in rows} == {min(notification_ids)}
+        assert len({status for _, status in rows}) == 1
@@ -0,0 +1,177 @@
+import base64
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.api_v1.crud import (
+    NotificationDraft,
+    claim_notifications,
+    create_notification_batch,
+    create_notifications,
+)
+from api.api_v1.models import Document as DocumentRequest
+from database.models import Document, NotificationDocument, NotificationStatus
+from fixtures.database import engine
+
+DOCUMENTS = [
+    DocumentRequest(
+        buffer=base64.b64encode(f"Query count {i}".encode()),
+        name=f"query_count_{i}.txt",
+    )
+    for i in range(3)
+]
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts the statements sent to the test database.
+
+    SQLite cannot return the rows of a multi-row INSERT in parameter order,
+    such an INSERT is repeated per row there while Postgres sends it in one
+    batch; the repeated statement is counted once.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statements and statement == statements[-1] and "RETURNING" in statement:
+            return
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestQueryCount:
+    """Number of statements issued by the CRUD functions."""
+
+    @pytest.mark.parametrize("chats", [1, 50])
+    async def test_create__constant(self, db_session: AsyncSession, chats: int):
+        """Creating notifications does not depend on the number of chats."""
+        with count_queries() as statements:
+            await create_notifications(
+                session=db_session,
+                chat_ids=list(range(chats)),
+                message="Query count",
+                documents=DOCUMENTS,
+            )
+
+        # Documents lookup and insert, notifications, association rows
+        assert len([s for s in statements if s.lstrip()[:6] != "COMMIT"]) <= 4
+
+    @pytest.mark.parametrize("drafts", [1, 20])
+    async def test_create_batch__constant(self, db_session: AsyncSession, drafts: int):
+        """Creating a batch does not depend on the number of notifications."""
+        with count_queries() as statements:
+            notifications = await create_notification_batch(
+                session=db_session,
+                drafts=[
+                    NotificationDraft(
+                        chat_ids=[i, i + 1],
+                        message=f"Query count {i}",
+                        documents=DOCUMENTS[i % len(DOCUMENTS) :],
+                    )
+                    for i in range(drafts)
+                ],
+            )
+
+        assert len([s for s in statements if s.lstrip()[:6] != "COMMIT"]) <= 4
+        for i, group in enumerate(notifications):
+            assert [n.chat_id for n in group] == [i, i + 1]
+            assert all(n.message == f"Query count {i}" for n in group)
+            assert all(
+                len(n.documents) == len(DOCUMENTS) - i % len(DOCUMENTS) for n in group
+            )
+
+    async def test_document__no_eager_load(self, db_session: AsyncSession):
+        """Loading a document does not drag its notifications along."""
+        await create_notifications(
+            session=db_session,
+            chat_ids=[1, 2, 3],
+            message="Query count",
+            documents=DOCUMENTS[:1],
+        )
+        db_session.expunge_all()
+
+        with count_queries() as statements:
+            result = await db_session.execute(
+                select(Document).where(Document.name == DOCUMENTS[0].name)
+            )
+            document = result.scalars().one()
+
+        assert len(statements) == 1
+        assert "notification" not in statements[0]
+        with pytest.raises(InvalidRequestError):
+            document.notifications
+
+    async def test_claim__documents_loaded(self, db_session: AsyncSession):
+        """Claimed notifications come with their documents in constant queries."""
+        created = await create_notifications(
+            session=db_session,
+            chat_ids=[1, 2, 3],
+            message="Query count",
+            documents=DOCUMENTS,
+            status=NotificationStatus.PENDING,
+        )
+        created_ids = {notification.id for notification in created}
+        db_session.expunge_all()
+
+        with count_queries() as statements:
+            notifications = await claim_notifications(
+                session=db_session, limit=100, lease_timeout=300
+            )
+
+        # Claim, documents, file ids of the documents, status update
+        assert len(statements) == 4
+        claimed = [n for n in notifications if n.id in created_ids]
+        assert len(claimed) == len(created_ids)
+        assert all(len(n.documents) == len(DOCUMENTS) for n in claimed)
+
+
+class TestBulkInsert:
+    """Notifications and their association rows written in bulk."""
+
+    async def test_create_batch__associations(self, db_session: AsyncSession):
+        """Every notification is linked to exactly the documents of its draft."""
+        drafts = [
+            NotificationDraft(
+                chat_ids=[1, 2], message="Bulk insert", documents=DOCUMENTS
+            ),
+            NotificationDraft(chat_ids=[1], message="Bulk insert"),
+            NotificationDraft(
+                chat_ids=[3, 1, 2], message="Bulk insert", documents=DOCUMENTS[1:2]
+            ),
+        ]
+
+        with count_queries() as statements:
+            notifications = await create_notification_batch(
+                session=db_session, drafts=drafts
+            )
+
+        # INSERT INTO <table> ...
+        inserted = [s.split()[2] for s in statements if s.lstrip().startswith("INSERT")]
+        assert inserted.count("notification") == 1
+        assert inserted.count("notification_document") == 1
+
+        ids = [n.id for group in notifications for n in group]
+        assert len(set(ids)) == len(ids) == 6
+        rows = await db_session.execute(
+            select(NotificationDocument.notification_id, Document.name)
+            .join(Document)
+            .where(NotificationDocument.notification_id.in_(ids))
+        )
+        linked = {}
+        for notification_id, name in rows:
+            linked.setdefault(notification_id, set()).add(name)
+        for draft, group in zip(drafts, notifications):
+            assert [n.chat_id for n in group] == draft.chat_ids
+            for notification in group:
+                assert linked.get(notification.id, set()) == {
+                    document.name for document in draft.documents or []
+                }
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from api.api_v1.services import RetryScheduler, generate_token, outbox, retries
+from config import config
+from database.models import DeadLetter, Notification, NotificationStatus
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+PREFIX = config.api.prefix + config.api.v1.prefix
+URL = PREFIX + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+MESSAGE = "Retry test message"
+
+
+@pytest.fixture
+def telegram_down(monkeypatch):
+    """Makes every Bot API request fail with a network error."""
+
+    async def fail(self, method, request_timeout=None):
+        raise TelegramNetworkError(method=method, message="Request timeout error")
+
+    monkeypatch.setattr(Bot, "__call__", fail)
+    monkeypatch.setattr(retries, "_heap", [])
+    monkeypatch.setattr(retries, "_deliver", outbox.deliver)
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+class TestRetry:
+    """Retries of deliveries failing with transient errors."""
+
+    async def test_retry__scheduled(self, client: AsyncClient, telegram_down):
+        """A transient failure is retried later instead of failing the request."""
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": MESSAGE}
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        results = response.json().get("results")
+        assert {result["status"] for result in results} == {"retrying"}
+        assert all(result["retryAt"] for result in results)
+
+        notification_ids = response.json().get("notificationIds")
+        assert sorted(id_ for _, id_ in retries._heap) == sorted(notification_ids)
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification).where(Notification.id.in_(notification_ids))
+            )
+            for notification in result.scalars():
+                assert notification.status == NotificationStatus.RETRYING
+                assert notification.attempts == 1
+                assert notification.next_attempt_at is not None
+                assert "Request timeout error" in notification.last_error
+
+    async def test_retry__dead_letter(
+        self, client: AsyncClient, telegram_down, monkeypatch
+    ):
+        """A notification running out of attempts becomes a dead letter."""
+        monkeypatch.setattr(retries, "max_attempts", 2)
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": MESSAGE}
+
+        response = await client.post(url=URL, json=data, headers=headers)
+        notification_ids = response.json().get("notificationIds")
+        await retries._attempt(notification_ids)
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification.status).where(Notification.id.in_(notification_ids))
+            )
+            assert set(result.scalars()) == {NotificationStatus.FAILED}
+            result = await session.execute(
+                select(DeadLetter).where(
+                    DeadLetter.notification_id.in_(notification_ids)
+                )
+            )
+            dead_letters = result.scalars().all()
+            assert len(dead_letters) == len(notification_ids)
+            assert all(letter.attempts == 2 for letter in dead_letters)
+
+        response = await client.get(
+            url=PREFIX + "/admin/dead-letters",
+            headers={"Authorization": generate_token()},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        listed = {letter["notificationId"] for letter in response.json()}
+        assert set(notification_ids) <= listed
+
+        monkeypatch.undo()
+        response = await client.post(
+            url=PREFIX + "/admin/dead-letters:replay",
+            json={"ids": [letter.id for letter in dead_letters]},
+            headers={"Authorization": generate_token()},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert sorted(response.json().get("notificationIds")) == sorted(
+            notification_ids
+        )
+
+    async def test_retry__permanent(self, client: AsyncClient, monkeypatch):
+        """A permanent failure is not retried."""
+
+        async def reject(self, method, request_timeout=None):
+            raise TelegramBadRequest(method=method, message="chat not found")
+
+        monkeypatch.setattr(Bot, "__call__", reject)
+        monkeypatch.setattr(retries, "_heap", [])
+        headers = {"Authorization": generate_token()}
+        data = {"chatIds": CHAT_IDS, "message": MESSAGE}
+
+        response = await client.post(url=URL, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_502_BAD_GATEWAY
+        assert retries._heap == []
+
+    async def test_take_over__window(self, monkeypatch):
+        """Only retries due within the maximum delay are taken over."""
+        monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+        now = datetime.now(timezone.utc)
+        due = Notification(
+            chat_id=config.test_chat_id,
+            message=MESSAGE,
+            status=NotificationStatus.RETRYING,
+            next_attempt_at=now + timedelta(seconds=30),
+        )
+        later = Notification(
+            chat_id=config.test_chat_id,
+            message=MESSAGE,
+            status=NotificationStatus.RETRYING,
+            next_attempt_at=now + timedelta(hours=1),
+        )
+        async with TestingSessionLocal() as session:
+            session.add_all([due, later])
+            await session.commit()
+
+        scheduler = RetryScheduler(max_delay=60)
+        await scheduler._take_over()
+
+        taken_over = {id_ for _, id_ in scheduler._heap}
+        assert due.id in taken_over
+        assert later.id not in taken_over
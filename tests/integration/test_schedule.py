@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from api.api_v1.services import NotificationScheduler, generate_token
+from config import config
+from database.models import Notification, NotificationStatus
+from database.session import session_manager
+from fixtures.database import TestingSessionLocal
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+CHAT_IDS = [config.test_chat_id]
+MESSAGE = "Scheduled test message"
+
+
+@pytest.fixture
+def test_sessions(monkeypatch):
+    """Points the scheduler at the test database."""
+    monkeypatch.setattr(session_manager, "session_factory", TestingSessionLocal)
+
+
+async def schedule(client: AsyncClient, send_at: datetime) -> list[int]:
+    headers = {"Authorization": generate_token()}
+    data = {"chatIds": CHAT_IDS, "message": MESSAGE, "sendAt": send_at.isoformat()}
+
+    response = await client.post(url=PREFIX, json=data, headers=headers)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json().get("results") == []
+    return response.json().get("notificationIds")
+
+
+async def make_due(notification_ids: list[int]) -> None:
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            update(Notification)
+            .where(Notification.id.in_(notification_ids))
+            .values(scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+class TestSchedule:
+    """Notifications delivered at a later time."""
+
+    async def test_schedule__stored(self, client: AsyncClient):
+        """A notification with a future `sendAt` is stored, not sent."""
+        send_at = datetime.now(timezone.utc) + timedelta(hours=1)
+
+        notification_ids = await schedule(client, send_at)
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification).where(Notification.id.in_(notification_ids))
+            )
+            for notification in result.scalars():
+                assert notification.status == NotificationStatus.SCHEDULED
+                assert notification.scheduled_at is not None
+                assert notification.attempts == 0
+
+    async def test_schedule__past(self, client: AsyncClient):
+        """A notification with a past `sendAt` is sent right away."""
+        headers = {"Authorization": generate_token()}
+        data = {
+            "chatIds": CHAT_IDS,
+            "message": MESSAGE,
+            "sendAt": "2024-06-07T09:00:00",
+        }
+
+        response = await client.post(url=PREFIX, json=data, headers=headers)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("sendAt") == "2024-06-07T09:00:00Z"
+
+    async def test_schedule__released(self, client: AsyncClient, test_sessions):
+        """Due notifications are loaded from the table and delivered."""
+        send_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        notification_ids = await schedule(client, send_at)
+        scheduler = NotificationScheduler(window=60)
+
+        await scheduler._refill()
+        assert not set(notification_ids) & scheduler._ids
+
+        await make_due(notification_ids)
+        await scheduler._refill()
+        assert set(notification_ids) <= scheduler._ids
+
+        await scheduler._release_due()
+        assert not scheduler._heap
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Notification.status).where(Notification.id.in_(notification_ids))
+            )
+            assert set(result.scalars()) == {NotificationStatus.SENT}
+
+    async def test_schedule__max_items(self, client: AsyncClient, test_sessions):
+        """No more than `max_items` notifications are held in memory."""
+        send_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        notification_ids = []
+        for _ in range(3):
+            notification_ids.extend(await schedule(client, send_at))
+        await make_due(notification_ids)
+        scheduler = NotificationScheduler(window=60, max_items=2)
+
+        await scheduler._refill()
+
+        assert len(scheduler._heap) == 2
+        assert scheduler._horizon == max(due for due, _ in scheduler._heap)
+        # A new notification beyond the loaded window is left in the table
+        scheduler.schedule(0, send_at)
+        assert 0 not in scheduler._ids
+
+        # Refills only fill the room left in the heap
+        scheduler = NotificationScheduler(window=60, max_items=2)
+        scheduler._push(0, send_at.timestamp())
+        await scheduler._refill()
+        assert len(scheduler._heap) == 2
+        await scheduler._refill()
+        assert len(scheduler._heap) == 2
+        assert scheduler._horizon == scheduler._heap[0][0]
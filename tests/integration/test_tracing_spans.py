@@ -0,0 +1,121 @@
+import orjson
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import tracing
+from api.api_v1.crud import create_notification
+from api.api_v1.models import Document as DocumentRequest
+from api.api_v1.services import generate_token
+from config import TracingConfig, config
+from database.session import session_manager
+from fixtures.database import engine
+from main import app
+
+# The spans are only recorded with the `tracing` extra installed
+pytest.importorskip("opentelemetry.sdk")
+
+from tracing.asgi import TracingMiddleware
+from tracing.db import trace_statements
+
+PREFIX = config.api.prefix + config.api.v1.prefix + "/notifications"
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def traced_engine():
+    """Records the SQL statements of the test database while tracing is on."""
+    trace_statements(engine)
+
+
+@pytest.fixture
+def spans(tmp_path):
+    """Enables tracing to a file, returns a reader of the exported spans."""
+    path = tmp_path / "traces.jsonl"
+    tracing.setup_tracing(
+        TracingConfig(enabled=True, exporter="file", file_path=str(path))
+    )
+
+    def read() -> list[dict]:
+        tracing.shutdown_tracing()
+        return [orjson.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    tracing.shutdown_tracing()
+
+
+def by_name(spans: list[dict]) -> dict[str, dict]:
+    return {span["name"]: span for span in spans}
+
+
+class TestTracingSpans:
+    """Spans of the API, the database and the Bot API calls."""
+
+    async def test_crud(self, db_session: AsyncSession, spans):
+        """SQL statements are recorded under the CRUD call issuing them."""
+        await create_notification(
+            session=db_session,
+            chat_id=config.test_chat_id,
+            message="Tracing test message",
+            documents=[DocumentRequest(buffer=b"VHJhY2luZw==", name="tracing.txt")],
+        )
+        await db_session.commit()
+
+        recorded = spans()
+        named = by_name(recorded)
+        outer = named["crud.create_notification"]
+        inner = named["crud.create_notifications"]
+        assert inner["parent_id"] == outer["context"]["span_id"]
+
+        statements = [
+            span for span in recorded if "db.query.text" in span["attributes"]
+        ]
+        inserts = [
+            span
+            for span in statements
+            if span["attributes"]["db.operation.name"] == "INSERT"
+        ]
+        assert inserts
+        assert all(span["attributes"]["db.system.name"] == "sqlite" for span in inserts)
+        crud_span_ids = {
+            span["context"]["span_id"]
+            for span in recorded
+            if span["name"].startswith("crud.")
+        }
+        assert all(span["parent_id"] in crud_span_ids for span in inserts)
+
+    async def test_request(self, db_session: AsyncSession, spans):
+        """A request continues the caller's trace down to the deliveries."""
+        app.dependency_overrides[session_manager.session_getter] = lambda: db_session
+        async with AsyncClient(
+            transport=ASGITransport(app=TracingMiddleware(app)),
+            base_url="http://test",
+        ) as client:
+            response = await client.post(
+                url=PREFIX,
+                json={
+                    "chatIds": [config.test_chat_id],
+                    "message": "Tracing test message",
+                },
+                headers={
+                    "Authorization": generate_token(),
+                    "traceparent": f"00-{TRACE_ID}-b7ad6b7169203331-01",
+                },
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        recorded = spans()
+        assert {span["context"]["trace_id"] for span in recorded} == {f"0x{TRACE_ID}"}
+        named = by_name(recorded)
+        server = named[f"POST {PREFIX}"]
+        assert server["kind"] == "SpanKind.SERVER"
+        assert server["parent_id"] == "0xb7ad6b7169203331"
+        assert server["attributes"]["http.route"] == PREFIX
+        assert server["attributes"]["http.response.status_code"] == 201
+        assert "crud.create_notifications" in named
+
+        send = named["notification.send"]
+        assert send["attributes"]["telegram.chat_id"] == config.test_chat_id
+        assert send["attributes"]["notification.documents"] == 0
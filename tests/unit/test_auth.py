@@ -0,0 +1,35 @@
+from api.api_v1.services import TokenVerifier
+
+NOW = 1_700_000_000.5
+
+
+class TestTokenVerifier:
+    """Time-windowed token verification."""
+
+    def test_verify__current(self):
+        """A token of the current second is accepted."""
+        verifier = TokenVerifier("secret")
+
+        assert verifier.verify(verifier.generate(int(NOW)), NOW)
+
+    def test_verify__skew(self):
+        """Tokens within the skew window are accepted, older ones are not."""
+        verifier = TokenVerifier("secret", skew=2)
+
+        assert verifier.verify(verifier.generate(int(NOW) - 2), NOW)
+        assert verifier.verify(verifier.generate(int(NOW) + 2), NOW)
+        assert not verifier.verify(verifier.generate(int(NOW) - 3), NOW)
+
+    def test_verify__wrong_key(self):
+        """A token signed with another key is rejected."""
+        verifier = TokenVerifier("secret")
+        token = TokenVerifier("other").generate(int(NOW))
+
+        assert not verifier.verify(token, NOW)
+
+    def test_verify__garbage(self):
+        """Tokens of another length or with non-ASCII characters are rejected."""
+        verifier = TokenVerifier("secret")
+
+        assert not verifier.verify("", NOW)
+        assert not verifier.verify("токен" * 13, NOW)
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from aiogram import Bot
+
+from config import RateLimitConfig
+from tg_bot.pool import BotHealth, BotPool, PooledBot
+from tg_bot.rate_limiter import create_rate_limiter
+
+CHAT_IDS = range(-500, 500)
+
+
+def pooled_bot(bot_id: int) -> PooledBot:
+    return PooledBot(
+        id=bot_id,
+        bot=Bot(token=f"{bot_id}:TOKEN"),
+        limiter=create_rate_limiter(RateLimitConfig(), key_prefix=f"bot:{bot_id}:"),
+        health=BotHealth(failure_threshold=2, cooldown=60),
+    )
+
+
+class TestBotPool:
+    """Routing of chats to the bots of a pool."""
+
+    def test_route__spread(self):
+        """Every bot serves a fair share of the chats."""
+        pool = BotPool([pooled_bot(bot_id) for bot_id in (1, 2, 3)])
+
+        shares = {}
+        for chat_id in CHAT_IDS:
+            bot_id = pool.route(chat_id).id
+            shares[bot_id] = shares.get(bot_id, 0) + 1
+
+        assert set(shares) == {1, 2, 3}
+        assert all(share > len(CHAT_IDS) / 6 for share in shares.values())
+
+    def test_route__sticky(self):
+        """Adding a bot only moves the chats the new bot takes over."""
+        bots = [pooled_bot(bot_id) for bot_id in (1, 2, 3)]
+        before = BotPool(bots)
+        after = BotPool(bots + [pooled_bot(4)])
+
+        for chat_id in CHAT_IDS:
+            bot_id = after.route(chat_id).id
+            assert bot_id in (before.route(chat_id).id, 4)
+
+    def test_route__override(self):
+        """A pinned chat is served by its bot whatever its health."""
+        bots = [pooled_bot(bot_id) for bot_id in (1, 2)]
+        pool = BotPool(bots, routes={42: 2})
+        bots[1].health.record_failure()
+        bots[1].health.record_failure()
+
+        assert pool.route(42).id == 2
+
+    def test_route__unhealthy(self):
+        """Chats of an unhealthy bot stay with it, other bots are not members."""
+        bots = [pooled_bot(bot_id) for bot_id in (1, 2)]
+        pool = BotPool(bots)
+        chat_id = next(chat_id for chat_id in CHAT_IDS if pool.route(chat_id).id == 1)
+
+        bots[0].health.record_failure()
+        bots[0].health.record_failure()
+
+        assert not bots[0].health.healthy
+        assert pool.route(chat_id).id == 1
+
+
+class TestBotHealth:
+    """Pausing of failing bots."""
+
+    async def test_wait(self):
+        """Calls of an unhealthy bot wait until its cooldown is over."""
+        health = BotHealth(failure_threshold=1, cooldown=0.05)
+        health.record_failure()
+
+        started = time.monotonic()
+        await health.wait()
+
+        assert time.monotonic() - started >= 0.04
+        assert health.healthy
+
+    async def test_wait__healthy(self):
+        """Calls of a healthy bot do not wait."""
+        health = BotHealth(failure_threshold=2, cooldown=60)
+        health.record_failure()
+
+        await asyncio.wait_for(health.wait(), 0.01)
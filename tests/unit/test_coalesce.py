@@ -0,0 +1,65 @@
+from api.api_v1.services.coalesce import coalesce
+from database.models import Notification
+from tg_bot.utils import TEXT_LIMIT, text_length
+
+
+def notification(id_, chat_id=1, message="Disk is full", button_url=None):
+    return Notification(id=id_, chat_id=chat_id, message=message, button_url=button_url)
+
+
+def window(chat_id):
+    return 5 if chat_id == 1 else 0
+
+
+class TestCoalesce:
+    """Merging of notification bursts."""
+
+    def test_coalesce__identical(self):
+        """Identical messages collapse into one with a counter."""
+        digests = coalesce([notification(i) for i in range(3)], window)
+
+        assert len(digests) == 1
+        assert digests[0].text == "Disk is full\n×3"
+        assert digests[0].lead.id == 0
+
+    def test_coalesce__distinct(self):
+        """Distinct messages are joined in the order they arrived."""
+        digests = coalesce(
+            [
+                notification(1, message="A"),
+                notification(2, message="B"),
+                notification(3, message="A"),
+            ],
+            window,
+        )
+
+        assert [d.text for d in digests] == ["A\n×2\n\nB"]
+
+    def test_coalesce__not_coalesced(self):
+        """Chats without a window and different buttons are kept apart."""
+        digests = coalesce(
+            [
+                notification(1, chat_id=2),
+                notification(2, chat_id=2),
+                notification(3, button_url="https://example.com"),
+                notification(4),
+            ],
+            window,
+        )
+
+        assert [[n.id for n in d.notifications] for d in digests] == [
+            [1],
+            [2],
+            [3],
+            [4],
+        ]
+
+    def test_coalesce__limit(self):
+        """A digest never exceeds the Telegram message limit."""
+        message = "x" * (TEXT_LIMIT // 3)
+        digests = coalesce(
+            [notification(i, message=f"{message}{i}") for i in range(5)], window
+        )
+
+        assert [len(d.notifications) for d in digests] == [2, 2, 1]
+        assert all(text_length(d.text) <= TEXT_LIMIT for d in digests)
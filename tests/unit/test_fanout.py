@@ -0,0 +1,32 @@
+from api.api_v1.services import fan_out
+from tg_bot import bot as bot_module
+from tg_bot.bot import BotService
+from tg_bot.utils import TEXT_LIMIT
+
+CHAT_IDS = [-1001, -1002, -1003]
+
+
+class TestFanOut:
+    """Sending one notification to many chats."""
+
+    async def test_split_once(self, monkeypatch):
+        """A long text is split once for all chats."""
+        splits = []
+        sent_parts = []
+
+        def split_markdown(*args):
+            splits.append(args)
+            return ["part 1", "part 2"]
+
+        async def send_message(chat_id, text, button_url, files, bot, parts):
+            sent_parts.append(parts)
+            return []
+
+        monkeypatch.setattr(bot_module, "split_markdown", split_markdown)
+        monkeypatch.setattr(BotService, "send_message", send_message)
+
+        results = await fan_out(CHAT_IDS, "x" * (TEXT_LIMIT + 1))
+
+        assert [result.chatId for result in results] == CHAT_IDS
+        assert len(splits) == 1
+        assert sent_parts == [["part 1", "part 2"]] * len(CHAT_IDS)
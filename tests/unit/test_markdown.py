@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from tg_bot.utils import markdown, split_markdown, text_length, validate_markdown
+
+SAMPLE = Path("tests/document.txt").read_text(encoding="utf-8")
+
+
+class TestValidateMarkdown:
+    """MarkdownV2 validation."""
+
+    def test_validate__sample(self):
+        """The formatting sample of the Bot API documentation is valid."""
+        validate_markdown(SAMPLE)
+
+    @pytest.mark.parametrize(
+        "text",
+        ["Build 1.2 failed", "*bold", "a | b", "```\ncode", "[link](url", "`a"],
+    )
+    def test_validate__invalid(self, text):
+        """Unescaped reserved characters and unclosed entities are rejected."""
+        with pytest.raises(ValueError):
+            validate_markdown(text)
+
+
+class TestSplitMarkdown:
+    """Splitting of long MarkdownV2 texts."""
+
+    def test_split__short(self):
+        """A text within the limit is not split."""
+        assert split_markdown(SAMPLE) == [SAMPLE]
+
+    def test_split__short_not_parsed(self, monkeypatch):
+        """A text within the limit is returned without being parsed."""
+
+        def tokenize(text):
+            raise AssertionError("Parsed a text within the limit")
+
+        monkeypatch.setattr(markdown, "_tokenize", tokenize)
+
+        assert split_markdown(SAMPLE) == [SAMPLE]
+        assert split_markdown(" ") == []
+
+    @pytest.mark.parametrize("limit", [60, 100, 200])
+    def test_split__valid_parts(self, limit):
+        """Every part fits the limit and is valid on its own."""
+        parts = split_markdown(SAMPLE, limit)
+
+        assert len(parts) > 1
+        for part in parts:
+            assert text_length(part) <= limit
+            validate_markdown(part)
+
+    def test_split__entities_reopened(self):
+        """An entity spanning parts is closed and opened again."""
+        parts = split_markdown("*" + "word " * 30 + "*", 50)
+
+        assert all(part.startswith("*") and part.endswith("*") for part in parts)
+
+    def test_split__code_block(self):
+        """A code block continues in the next part with its language."""
+        parts = split_markdown("```python\n" + "x \\= 1\n" * 20 + "```", 60)
+
+        assert all(part.startswith("```python\n") for part in parts)
+        assert all(part.endswith("```") for part in parts)
+
+    def test_split__first_limit(self):
+        """The first part may have its own limit, e.g. for a caption."""
+        parts = split_markdown("word " * 100, 200, 50)
+
+        assert text_length(parts[0]) <= 50
+        assert all(text_length(part) <= 200 for part in parts[1:])
+        assert "".join(parts).split() == ["word"] * 100
+
+    def test_split__links_kept(self):
+        """Links are never cut."""
+        link = "[inline URL](http://www.example.com/)"
+        parts = split_markdown(" ".join([link] * 10), 50)
+
+        assert all(part.strip() == link for part in parts)
@@ -0,0 +1,67 @@
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+from prometheus_client import REGISTRY
+
+from metrics import track_db_time
+from tg_bot.session import RequestMetricsMiddleware
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    """Instrumentation of the hot paths."""
+
+    async def test_bot_request(self):
+        """Bot API calls are timed per method and outcome."""
+        method = SendMessage(chat_id=1, text="Metrics")
+        before = sample(
+            "telegram_request_duration_seconds_count",
+            method="sendMessage",
+            outcome="ok",
+        )
+
+        async def make_request(bot, method):
+            return "response"
+
+        result = await RequestMetricsMiddleware()(make_request, None, method)
+
+        assert result == "response"
+        assert (
+            sample(
+                "telegram_request_duration_seconds_count",
+                method="sendMessage",
+                outcome="ok",
+            )
+            == before + 1
+        )
+
+    async def test_bot_request__rate_limited(self):
+        """Calls refused with 429 are counted."""
+        method = SendMessage(chat_id=1, text="Metrics")
+        before = sample("telegram_rate_limited_total", method="sendMessage")
+
+        async def make_request(bot, method):
+            raise TelegramRetryAfter(method, "Too Many Requests", retry_after=1)
+
+        with pytest.raises(TelegramRetryAfter):
+            await RequestMetricsMiddleware()(make_request, None, method)
+
+        assert sample("telegram_rate_limited_total", method="sendMessage") == before + 1
+
+    async def test_track_db_time(self):
+        """CRUD calls are timed by function name, failed ones as well."""
+
+        @track_db_time
+        async def failing_crud_call():
+            raise RuntimeError("DB error")
+
+        with pytest.raises(RuntimeError):
+            await failing_crud_call()
+
+        assert failing_crud_call.__name__ == "failing_crud_call"
+        assert (
+            sample("db_call_duration_seconds_count", operation="failing_crud_call") == 1
+        )
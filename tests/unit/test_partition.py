@@ -0,0 +1,32 @@
+from datetime import date
+
+from api.api_v1.crud import (
+    add_months,
+    default_partition_name,
+    month_start,
+    partition_name,
+)
+
+
+def test_month_start():
+    """Dates are truncated to the first day of their month."""
+    assert month_start(date(2026, 10, 18)) == date(2026, 10, 1)
+
+
+def test_add_months():
+    """Months are shifted across the turn of the year in both directions."""
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 10, 1), 0) == date(2026, 10, 1)
+
+
+def test_partition_name():
+    """Partitions are named after the table and their month."""
+    assert partition_name("notification", date(2026, 3, 1)) == "notification_p2026_03"
+
+
+def test_default_partition_name():
+    """The default partition does not look like a monthly one."""
+    name = default_partition_name("notification")
+    assert name == "notification_default"
+    assert not name.startswith("notification_p")
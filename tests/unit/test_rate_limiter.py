@@ -0,0 +1,113 @@
+import asyncio
+
+from config import RateLimitConfig
+from tg_bot.rate_limiter import (
+    GLOBAL_KEY,
+    Bucket,
+    MemoryRateLimitBackend,
+    RateLimiter,
+    refill,
+)
+
+BUCKET = Bucket(rate=1, capacity=1)
+
+
+class TestTokenBucket:
+    """Token bucket arithmetic."""
+
+    def test_refill__take(self):
+        """A full bucket lets a request through."""
+        assert refill(1, 0, 0, 1, BUCKET) == (0, 0)
+
+    def test_refill__wait(self):
+        """An empty bucket reports the time until the next token."""
+        tokens, wait = refill(0, 0, 0.25, 1, BUCKET)
+
+        assert tokens == 0.25
+        assert wait == 0.75
+
+    def test_refill__debt(self):
+        """A request costing more than the capacity leaves the bucket in debt."""
+        tokens, wait = refill(1, 0, 0, 10, BUCKET)
+
+        assert wait == 0
+        assert tokens == -9
+        assert refill(tokens, 0, 1, 1, BUCKET)[1] == 9
+
+
+class TestRateLimiter:
+    """Send scheduling."""
+
+    async def test_acquire__hot_chat_does_not_starve(self):
+        """A chat with a backlog does not hold back sends to other chats."""
+        limiter = RateLimiter(
+            backend=MemoryRateLimitBackend(),
+            limits=RateLimitConfig(global_rate=1000, chat_rate=20, chat_burst=1),
+        )
+        order = []
+
+        async def send(chat_id: int):
+            await limiter.acquire(chat_id)
+            order.append(chat_id)
+
+        hot = [asyncio.create_task(send(1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        cold = asyncio.create_task(send(2))
+        await asyncio.gather(*hot, cold)
+
+        assert order.index(2) < 2
+
+    async def test_retry_after__blocks_chat(self):
+        """A flood control error holds the chat back."""
+        backend = MemoryRateLimitBackend()
+        limiter = RateLimiter(backend=backend, limits=RateLimitConfig())
+
+        await limiter.retry_after(1, 5)
+
+        assert await backend.consume("chat:1", 1, limiter.chat_bucket(1)) > 5
+        assert await backend.consume("chat:2", 1, limiter.chat_bucket(2)) == 0
+
+    async def test_acquire__backend_error(self):
+        """A failing bucket fails the waiting send, not the sends after it."""
+
+        class FlakyBackend(MemoryRateLimitBackend):
+            failures = 1
+
+            async def consume(self, key, cost, bucket):
+                if key == GLOBAL_KEY and self.failures:
+                    self.failures -= 1
+                    raise ConnectionError("Database is unavailable")
+                return await super().consume(key, cost, bucket)
+
+        limiter = RateLimiter(
+            backend=FlakyBackend(), limits=RateLimitConfig(global_rate=1000)
+        )
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(limiter.acquire(chat_id) for chat_id in (1, 2, 3)),
+                return_exceptions=True,
+            ),
+            timeout=1,
+        )
+
+        assert isinstance(results[0], ConnectionError)
+        assert results[1:] == [None, None]
+
+
+class TestMemoryRateLimitBackend:
+    """Buckets in the process memory."""
+
+    async def test_sweep__evicts_full(self, monkeypatch):
+        """Buckets refilled to the capacity are evicted, the others are kept."""
+        now = 1000.0
+        monkeypatch.setattr("tg_bot.rate_limiter.time.monotonic", lambda: now)
+        backend = MemoryRateLimitBackend(sweep_interval=60)
+
+        await backend.consume("chat:1", 1, BUCKET)
+        await backend.block("chat:2", 120, BUCKET)
+        now += 60
+        await backend.consume("chat:3", 1, BUCKET)
+
+        assert set(backend._buckets) == {"chat:2", "chat:3"}
+        assert await backend.consume("chat:2", 1, BUCKET) == 61
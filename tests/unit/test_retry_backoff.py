@@ -0,0 +1,54 @@
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+from aiogram.methods import SendMessage
+
+from api.api_v1.services import RetryScheduler
+from tg_bot.errors import retry_hint
+
+METHOD = SendMessage(chat_id=1, text="Retry test message")
+
+
+def test_retry_hint__flood_control():
+    """Flood control is retried after Telegram's `retry_after`."""
+    error = TelegramRetryAfter(
+        method=METHOD, message="Too Many Requests", retry_after=7
+    )
+
+    assert retry_hint(error) == 7
+
+
+def test_retry_hint__wrapped():
+    """Errors wrapped by the sending code are classified by their cause."""
+    try:
+        try:
+            raise TelegramNetworkError(method=METHOD, message="Request timeout error")
+        except TelegramNetworkError as e:
+            raise Exception("Failed to send message") from e
+    except Exception as e:
+        assert retry_hint(e) == 0
+
+
+def test_retry_hint__permanent():
+    """Errors a later attempt runs into as well are not retried."""
+    error = TelegramBadRequest(method=METHOD, message="chat not found")
+
+    assert retry_hint(error) is None
+
+
+def test_backoff():
+    """The delay grows exponentially up to the maximum."""
+    scheduler = RetryScheduler(max_attempts=10, base_delay=1, max_delay=60)
+
+    for attempt in range(1, 10):
+        delay = min(60, 2 ** (attempt - 1))
+        assert delay / 2 <= scheduler.backoff(attempt) <= delay
+
+
+def test_backoff__retry_after():
+    """The delay is never shorter than Telegram's `retry_after`."""
+    scheduler = RetryScheduler(base_delay=1, max_delay=60)
+
+    assert scheduler.backoff(1, retry_after=30) == 30
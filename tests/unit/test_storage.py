@@ -0,0 +1,96 @@
+import mmap
+import os
+import threading
+import time
+
+from database.models import Document
+from database.storage import FileSystemBlobStorage
+
+SHA256 = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+
+
+class TestFileSystemBlobStorage:
+    """Content-addressed files of the document contents."""
+
+    async def test_put_read(self, tmp_path):
+        """A stored content is read back by the digest of its document."""
+        storage = FileSystemBlobStorage(tmp_path)
+        await storage.put(SHA256, memoryview(b"test"))
+
+        buffer = await storage.read(Document(name="test.txt", sha256=SHA256))
+
+        assert storage.path(SHA256) == tmp_path / SHA256[:2] / SHA256[2:4] / SHA256
+        assert bytes(buffer) == b"test"
+
+    async def test_put__dedup(self, tmp_path):
+        """A content stored again is kept in its one existing file."""
+        storage = FileSystemBlobStorage(tmp_path)
+        await storage.put(SHA256, b"test")
+        inode = storage.path(SHA256).stat().st_ino
+
+        await storage.put(SHA256, b"test")
+
+        assert [path for path in tmp_path.rglob("*") if path.is_file()] == [
+            storage.path(SHA256)
+        ]
+        assert storage.path(SHA256).stat().st_ino == inode
+
+    async def test_read__mapped(self, tmp_path):
+        """A content is memory-mapped rather than read into a copy."""
+        storage = FileSystemBlobStorage(tmp_path)
+        await storage.put(SHA256, b"test")
+
+        buffer = await storage.read(Document(name="test.txt", sha256=SHA256))
+
+        assert isinstance(buffer.obj, mmap.mmap)
+        assert buffer.readonly
+
+    async def test_read__off_event_loop(self, tmp_path, monkeypatch):
+        """The file is opened and mapped outside the event loop thread."""
+        storage = FileSystemBlobStorage(tmp_path)
+        await storage.put(SHA256, b"test")
+        threads = []
+        map_file = FileSystemBlobStorage._map
+
+        def record(path):
+            threads.append(threading.get_ident())
+            return map_file(path)
+
+        monkeypatch.setattr(FileSystemBlobStorage, "_map", staticmethod(record))
+
+        await storage.read(Document(name="test.txt", sha256=SHA256))
+
+        assert threads and threading.get_ident() not in threads
+
+    async def test_read__empty(self, tmp_path):
+        """An empty content, which cannot be mapped, is read as empty."""
+        storage = FileSystemBlobStorage(tmp_path)
+        await storage.put(SHA256, b"")
+
+        buffer = await storage.read(Document(name="empty.txt", sha256=SHA256))
+
+        assert bytes(buffer) == b""
+
+    async def test_delete(self, tmp_path):
+        """A blob not stored again within the grace period is deleted."""
+        storage = FileSystemBlobStorage(tmp_path, delete_grace=60)
+        await storage.put(SHA256, b"test")
+        expired = time.time() - 61
+        os.utime(storage.path(SHA256), (expired, expired))
+
+        await storage.delete(SHA256)
+        await storage.delete(SHA256)
+
+        assert not storage.path(SHA256).exists()
+
+    async def test_delete__stored_again(self, tmp_path):
+        """Storing a content again keeps it from being deleted for a while."""
+        storage = FileSystemBlobStorage(tmp_path, delete_grace=60)
+        await storage.put(SHA256, b"test")
+        expired = time.time() - 61
+        os.utime(storage.path(SHA256), (expired, expired))
+
+        await storage.put(SHA256, b"test")
+        await storage.delete(SHA256)
+
+        assert storage.path(SHA256).read_bytes() == b"test"
@@ -0,0 +1,74 @@
+import orjson
+import pytest
+from aiogram.methods import SendMediaGroup, SendMessage
+from aiogram.types import InputMediaDocument
+
+import tracing
+from config import TracingConfig
+from tg_bot.utils import MemoryInputFile
+
+
+async def make_request(bot, method):
+    return "response"
+
+
+class TestTracing:
+    """Optional OpenTelemetry spans."""
+
+    def test_disabled(self):
+        """Without setup, spans are one shared no-op."""
+        assert not tracing.is_enabled()
+        assert tracing.span("first") is tracing.span("second", {"key": 1})
+
+        with tracing.span("noop") as span:
+            assert span is None
+
+    async def test_bot_request__disabled(self):
+        """Bot API calls pass straight through."""
+        pytest.importorskip("opentelemetry.sdk")
+        from tracing.bot import RequestTracingMiddleware
+
+        method = SendMessage(chat_id=1, text="Tracing")
+
+        result = await RequestTracingMiddleware()(make_request, None, method)
+
+        assert result == "response"
+
+    async def test_bot_request(self, tmp_path):
+        """Bot API calls are recorded with their chat and uploads."""
+        pytest.importorskip("opentelemetry.sdk")
+        from tracing.bot import RequestTracingMiddleware
+
+        path = tmp_path / "traces.jsonl"
+        tracing.setup_tracing(
+            TracingConfig(enabled=True, exporter="file", file_path=str(path))
+        )
+        try:
+            method = SendMediaGroup(
+                chat_id=42,
+                media=[
+                    InputMediaDocument(media="file-id"),
+                    InputMediaDocument(
+                        media=MemoryInputFile(buffer=b"12345", filename="a.txt")
+                    ),
+                ],
+            )
+            bot = type("FakeBot", (), {"id": 7})()
+
+            result = await RequestTracingMiddleware()(make_request, bot, method)
+        finally:
+            tracing.shutdown_tracing()
+
+        assert result == "response"
+        assert not tracing.is_enabled()
+        (span,) = [orjson.loads(line) for line in path.read_text().splitlines()]
+        assert span["name"] == "telegram.sendMediaGroup"
+        assert span["kind"] == "SpanKind.CLIENT"
+        assert span["attributes"] == {
+            "telegram.method": "sendMediaGroup",
+            "telegram.bot_id": 7,
+            "telegram.chat_id": 42,
+            "telegram.media.count": 2,
+            "telegram.media.uploads": 1,
+            "telegram.media.upload_bytes": 5,
+        }
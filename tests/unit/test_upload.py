@@ -0,0 +1,45 @@
+import hashlib
+import threading
+from tempfile import SpooledTemporaryFile
+
+from fastapi import UploadFile
+
+from api.api_v1.services import upload
+from api.api_v1.services.upload import map_uploads
+
+
+def uploaded(content: bytes, filename: str = "test.txt") -> UploadFile:
+    file = SpooledTemporaryFile(max_size=1024)
+    file.write(content)
+    file.seek(0)
+    return UploadFile(file=file, filename=filename)
+
+
+class TestMapUploads:
+    """Uploaded files mapped into memory with their digests."""
+
+    async def test_map(self):
+        """Each document is backed by the file content and its digest."""
+        documents = await map_uploads([uploaded(b"test"), uploaded(b"", "empty")])
+
+        assert [bytes(document.buffer) for document in documents] == [b"test", b""]
+        assert [document.sha256 for document in documents] == [
+            hashlib.sha256(b"test").hexdigest(),
+            hashlib.sha256(b"").hexdigest(),
+        ]
+        assert documents[1].name == "empty"
+
+    async def test_map__off_event_loop(self, monkeypatch):
+        """Files are mapped and hashed outside the event loop thread."""
+        threads = []
+        map_upload = upload.map_upload
+
+        def record(file):
+            threads.append(threading.get_ident())
+            return map_upload(file)
+
+        monkeypatch.setattr(upload, "map_upload", record)
+
+        await map_uploads([uploaded(b"test")])
+
+        assert threads and threading.get_ident() not in threads
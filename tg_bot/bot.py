@@ -1,20 +1,187 @@
-from typing import List
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, TypeVar
 
 from aiogram import Bot
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message
 
 from config import config
 from database.models import Document
-from tg_bot.utils import create_media_group
+from tg_bot.pool import BOT_ERRORS, BotPool, PooledBot, create_bot_pool
+from tg_bot.utils import (
+    CAPTION_LIMIT,
+    TEXT_LIMIT,
+    FileIdCache,
+    create_media_group,
+    split_markdown,
+)
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
 
 
 class BotService:
-    bot = Bot(
-        token=config.tg_bot.token,
-        default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN_V2),
-    )
+    file_ids = FileIdCache(maxsize=config.tg_bot.file_id_cache_size)
+
+    _pool: BotPool | None = None
+    # File ids of uploads not stored in the database yet
+    _new_file_ids: Dict[Tuple[int, int], str] = {}
+    _in_flight = 0
+    _idle = asyncio.Event()
+    _idle.set()
+
+    @staticmethod
+    def get_pool() -> BotPool:
+        """
+        Get the bot pool, creating it on first use.
+
+        The application creates the pool on startup; creating it here keeps
+        code running without the application lifespan working.
+
+        :return: Bot pool.
+        """
+        if BotService._pool is None:
+            BotService._pool = create_bot_pool(config.tg_bot)
+        return BotService._pool
+
+    @staticmethod
+    def route(chat_id: int) -> PooledBot:
+        """
+        Choose the bot serving a chat.
+
+        :param chat_id: Telegram chat id.
+        :return: Bot of the pool.
+        """
+        return BotService.get_pool().route(chat_id)
+
+    @staticmethod
+    async def start() -> None:
+        """
+        Create the bot pool and open its connection pool.
+
+        :return: None
+        """
+        await BotService.get_pool().session.create_session()
+
+    @staticmethod
+    async def close(timeout: float | None = None) -> None:
+        """
+        Close the HTTP session of the bots once the sends in flight are done.
+
+        :param timeout: Seconds to wait for the sends in flight.
+        :return: None
+        """
+        pool = BotService._pool
+        if pool is None:
+            return
+
+        if timeout is None:
+            timeout = config.tg_bot.session.shutdown_timeout
+        try:
+            await asyncio.wait_for(BotService._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Closing the bot session with %s requests in flight",
+                BotService._in_flight,
+            )
+
+        BotService._pool = None
+        await pool.session.close()
+
+    @staticmethod
+    def get_file_id(file: Document, bot_id: int) -> str | None:
+        """
+        Get the Telegram file id of a document uploaded before by a bot.
+
+        :param file: Document with its file ids loaded.
+        :param bot_id: Telegram id of the bot.
+        :return: Telegram file id or None if the document must be uploaded.
+        """
+        file_id = BotService.file_ids.get(bot_id, file.id)
+        if file_id is None:
+            file_id = next(
+                (stored.file_id for stored in file.file_ids if stored.bot_id == bot_id),
+                None,
+            )
+        return file_id
+
+    @staticmethod
+    def needs_upload(files: List[Document] | None, chat_id: int) -> bool:
+        """
+        Check whether sending the documents to a chat uploads any of them.
+
+        :param files: List of files to send.
+        :param chat_id: Telegram chat id.
+        :return: True if the bot of the chat has not uploaded a file yet.
+        """
+        bot_id = BotService.route(chat_id).id
+        return any(BotService.get_file_id(file, bot_id) is None for file in files or [])
+
+    @staticmethod
+    async def request(
+        method: Callable[..., Awaitable[T]],
+        chat_id: int,
+        cost: int = 1,
+        bot: PooledBot | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Call a Bot API method within the rate limits of the bot.
+
+        Flood control errors hold the chat back for `retry_after` seconds and
+        the call is retried. Errors of the bot itself count against its health,
+        calls of an unhealthy bot wait until its cooldown is over.
+
+        :param method: Bot method to call, e.g. `Bot.send_message`.
+        :param chat_id: Telegram chat id.
+        :param cost: Number of messages the call sends.
+        :param bot: Bot to call the method of, the bot of the chat by default.
+        :param kwargs: Method arguments.
+        :return: Method result.
+        """
+        bot = bot or BotService.route(chat_id)
+        BotService._in_flight += 1
+        BotService._idle.clear()
+        try:
+            max_retries = config.tg_bot.rate_limit.max_retries
+            for attempt in range(max_retries + 1):
+                await bot.health.wait()
+                await bot.limiter.acquire(chat_id, cost)
+                try:
+                    result = await method(bot.bot, chat_id=chat_id, **kwargs)
+                except TelegramRetryAfter as e:
+                    if attempt == max_retries:
+                        raise
+                    await bot.limiter.retry_after(chat_id, e.retry_after)
+                except BOT_ERRORS:
+                    bot.health.record_failure()
+                    raise
+                else:
+                    bot.health.record_success()
+                    return result
+        finally:
+            BotService._in_flight -= 1
+            if not BotService._in_flight:
+                BotService._idle.set()
+
+    @staticmethod
+    def split_text(text: str, with_files: bool = False) -> List[str | None]:
+        """
+        Split a text into the parts sent as separate messages.
+
+        Splitting a long text takes a while; a text sent to many chats is
+        split once and its parts are passed to `send_message`.
+
+        :param text: Text in MarkdownV2 format.
+        :param with_files: Whether the text goes with files, its first part
+            is then the caption of the last album, None if the text is empty.
+        :return: Parts of the text.
+        """
+        if with_files:
+            return split_markdown(text, TEXT_LIMIT, CAPTION_LIMIT) or [None]
+        return split_markdown(text, TEXT_LIMIT) or [text]
 
     @staticmethod
     async def send_message(
@@ -22,7 +189,9 @@ class BotService:
         text: str,
         button_url: str | None = None,
         files: List[Document] = None,
-    ) -> None:
+        bot: PooledBot | None = None,
+        parts: List[str | None] | None = None,
+    ) -> List[Message]:
         """
         Send a message.
 
@@ -30,7 +199,13 @@ class BotService:
         :param text: Text to send.
         :param button_url: Optional URL for an inline button in the message.
         :param files: List of files to send.
+        :param bot: Bot sending the message, the bot of the chat by default.
+        :param parts: Parts of the text split by `split_text` for the same
+            files, the text is split here if not given.
+        :return: List of sent messages.
         """
+        bot = bot or BotService.route(chat_id)
+        parts = parts or BotService.split_text(text, bool(files))
         reply_markup = (
             InlineKeyboardMarkup(
                 inline_keyboard=[
@@ -43,20 +218,23 @@ class BotService:
 
         try:
             if files:
-                await BotService.send_files(
+                return await BotService.send_files(
                     chat_id=chat_id,
                     text=text,
                     files=files,
                     reply_markup=reply_markup,
+                    bot=bot,
+                    parts=parts,
                 )
             else:
-                await BotService.bot.send_message(
+                return await BotService.send_text(
                     chat_id=chat_id,
-                    text=text,
+                    parts=parts,
                     reply_markup=reply_markup,
+                    bot=bot,
                 )
         except Exception as e:
-            raise Exception(f"Failed to send message to {chat_id}: {e}")
+            raise Exception(f"Failed to send message to {chat_id}: {e}") from e
 
     @staticmethod
     async def send_files(
@@ -64,29 +242,119 @@ class BotService:
         text: str,
         files: List[Document],
         reply_markup: InlineKeyboardMarkup | None = None,
-    ) -> None:
+        bot: PooledBot | None = None,
+        parts: List[str | None] | None = None,
+    ) -> List[Message]:
         """
         Send files in groups of 10 as albums.
 
+        The text becomes the caption of the last file. A text too long for a
+        caption continues in messages sent after the albums.
+
         :param chat_id: Telegram chat id.
         :param text: Text to send.
         :param reply_markup: Optional inline keyboard with a button.
         :param files: List of files to send.
+        :param bot: Bot sending the files, the bot of the chat by default.
+        :param parts: Parts of the text split by `split_text` with files, the
+            text is split here if not given.
+        :return: List of sent messages.
         """
+        bot = bot or BotService.route(chat_id)
+        messages = []
+        caption, *parts = parts or BotService.split_text(text, with_files=True)
+
         # Divide files into groups of 10
         for i in range(0, len(files), 10):
-            media_group = create_media_group(files[i : i + 10])
+            group = files[i : i + 10]
+            media_group = await create_media_group(
+                group, [BotService.get_file_id(file, bot.id) for file in group]
+            )
 
             # If it's the last group and there is text, add it to the last file
-            if i + 10 >= len(files) and text:
-                media_group[-1].caption = text
+            if i + 10 >= len(files) and caption:
+                media_group[-1].caption = caption
 
-            await BotService.bot.send_media_group(chat_id=chat_id, media=media_group)
+            # Telegram counts every file of an album as a separate message
+            sent = await BotService.request(
+                Bot.send_media_group,
+                chat_id=chat_id,
+                cost=len(media_group),
+                bot=bot,
+                media=media_group,
+            )
+            BotService.remember_file_ids(bot.id, group, sent)
+            messages += sent
 
         # Send a separate message with a button if there were files
-        if reply_markup:
-            await BotService.bot.send_message(
-                chat_id=chat_id,
-                text="Click the button below:",
-                reply_markup=reply_markup,
+        if reply_markup and not parts:
+            parts = ["Click the button below:"]
+        messages += await BotService.send_text(
+            chat_id=chat_id,
+            parts=parts,
+            reply_markup=reply_markup,
+            bot=bot,
+        )
+
+        return messages
+
+    @staticmethod
+    async def send_text(
+        chat_id: int,
+        parts: List[str],
+        reply_markup: InlineKeyboardMarkup | None = None,
+        bot: PooledBot | None = None,
+    ) -> List[Message]:
+        """
+        Send the parts of a split text as consecutive messages.
+
+        :param chat_id: Telegram chat id.
+        :param parts: Parts of the text, see `split_markdown`.
+        :param reply_markup: Optional inline keyboard attached to the last part.
+        :param bot: Bot sending the text, the bot of the chat by default.
+        :return: List of sent messages.
+        """
+        messages = []
+        for i, part in enumerate(parts):
+            messages.append(
+                await BotService.request(
+                    Bot.send_message,
+                    chat_id=chat_id,
+                    bot=bot,
+                    text=part,
+                    reply_markup=reply_markup if i == len(parts) - 1 else None,
+                )
             )
+        return messages
+
+    @staticmethod
+    def remember_file_ids(
+        bot_id: int, files: List[Document], messages: List[Message]
+    ) -> None:
+        """
+        Remember the file ids Telegram assigned to uploaded documents.
+
+        File ids not stored yet are kept until `take_new_file_ids` hands them
+        over for storing.
+
+        :param bot_id: Telegram id of the bot that sent the files.
+        :param files: Sent files.
+        :param messages: Messages of the album, in the order of `files`.
+        """
+        for file, message in zip(files, messages):
+            if not message.document:
+                continue
+
+            if BotService.get_file_id(file, bot_id) is None:
+                BotService._new_file_ids[(file.id, bot_id)] = message.document.file_id
+            BotService.file_ids.set(bot_id, file.id, message.document.file_id)
+
+    @staticmethod
+    def take_new_file_ids() -> Dict[Tuple[int, int], str]:
+        """
+        Take the file ids of uploads that are not stored in the database yet.
+
+        :return: File ids by document id and bot id.
+        """
+        file_ids, BotService._new_file_ids = BotService._new_file_ids, {}
+        return file_ids
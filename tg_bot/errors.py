@@ -0,0 +1,35 @@
+import asyncio
+
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+# Errors a later attempt of the same request may not run into
+RETRYABLE_ERRORS = (
+    TelegramRetryAfter,
+    TelegramServerError,
+    TelegramNetworkError,
+    asyncio.TimeoutError,
+)
+
+
+def retry_hint(error: BaseException) -> float | None:
+    """
+    Tell whether a failed Bot API request is worth retrying.
+
+    The error and the errors it was raised from are checked, so errors
+    wrapped by `BotService` are classified by their cause.
+
+    :param error: Error the request failed with.
+    :return: Minimum seconds to wait before retrying, None if the error is
+        permanent.
+    """
+    while error is not None:
+        if isinstance(error, TelegramRetryAfter):
+            return float(error.retry_after)
+        if isinstance(error, RETRYABLE_ERRORS):
+            return 0.0
+        error = error.__cause__
+    return None
@@ -0,0 +1,174 @@
+import asyncio
+import bisect
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramServerError,
+    TelegramUnauthorizedError,
+)
+
+from config import TgBotConfig
+from tg_bot.rate_limiter import RateLimiter, create_rate_limiter
+from tg_bot.session import create_session
+
+# Errors caused by the bot or the Bot API rather than by the chat
+BOT_ERRORS = (TelegramNetworkError, TelegramServerError, TelegramUnauthorizedError)
+
+
+class BotHealth:
+    """
+    Health of a bot judged by its consecutive failures.
+
+    A bot failing `failure_threshold` times in a row is paused for `cooldown`
+    seconds: its calls wait instead of failing, then it gets a chance again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    async def wait(self) -> None:
+        """
+        Wait until the bot is healthy again.
+
+        :return: None
+        """
+        if (delay := self.unhealthy_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    def record_success(self) -> None:
+        """
+        Record a successful call of the bot.
+
+        :return: None
+        """
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Record a call that failed because of the bot.
+
+        :return: None
+        """
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.failures = 0
+            self.unhealthy_until = time.monotonic() + self.cooldown
+
+
+@dataclass
+class PooledBot:
+    """A bot of the pool with its own rate limits and health."""
+
+    id: int
+    bot: Bot
+    limiter: RateLimiter
+    health: BotHealth = field(default_factory=BotHealth)
+
+
+class BotPool:
+    """
+    Bots sharing the delivery load.
+
+    Chats are assigned to bots by consistent hashing of the chat id, so a chat
+    is always served by the same bot and adding a bot moves only the chats it
+    takes over. A bot can only message chats it is a member of: chats served
+    by a particular bot are pinned to it with `routes`. For the same reason an
+    unhealthy bot keeps its chats, the calls wait for it to recover rather
+    than go to a bot that is probably not a member of the chat.
+    """
+
+    def __init__(
+        self,
+        bots: List[PooledBot],
+        routes: Dict[int, int] | None = None,
+        replicas: int = 100,
+    ) -> None:
+        if not bots:
+            raise ValueError("A bot pool needs at least one bot")
+
+        self.bots = {member.id: member for member in bots}
+        self.routes = routes or {}
+        # Every bot owns `replicas` points of the ring to even out its share
+        ring = sorted(
+            (_hash(f"{member.id}:{replica}"), member.id)
+            for member in bots
+            for replica in range(replicas)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [bot_id for _, bot_id in ring]
+
+    @property
+    def session(self) -> BaseSession:
+        """HTTP session shared by the bots."""
+        return next(iter(self)).bot.session
+
+    def __iter__(self) -> Iterator[PooledBot]:
+        return iter(self.bots.values())
+
+    def __len__(self) -> int:
+        return len(self.bots)
+
+    def route(self, chat_id: int) -> PooledBot:
+        """
+        Choose the bot serving a chat.
+
+        :param chat_id: Telegram chat id.
+        :return: Bot of the pool.
+        """
+        if (bot_id := self.routes.get(chat_id)) in self.bots:
+            return self.bots[bot_id]
+
+        start = bisect.bisect(self._points, _hash(str(chat_id)))
+        return self.bots[self._owners[start % len(self._owners)]]
+
+
+def _hash(key: str) -> int:
+    # Stable across processes, unlike the built-in hash of strings
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def create_bot_pool(bot_config: TgBotConfig) -> BotPool:
+    """
+    Create the pool of the configured bots.
+
+    The bots share one HTTP session, every bot has its own rate limits.
+
+    :param bot_config: Bot settings.
+    :return: Bot pool.
+    """
+    session = create_session(bot_config.session)
+    bots = []
+    for token in bot_config.pool_tokens:
+        bot = Bot(
+            token=token,
+            session=session,
+            default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN_V2),
+        )
+        limits = bot_config.bot_rate_limits.get(bot.id, bot_config.rate_limit)
+        bots.append(
+            PooledBot(
+                id=bot.id,
+                bot=bot,
+                limiter=create_rate_limiter(limits, key_prefix=f"bot:{bot.id}:"),
+                health=BotHealth(
+                    failure_threshold=bot_config.failure_threshold,
+                    cooldown=bot_config.failure_cooldown,
+                ),
+            )
+        )
+    return BotPool(bots, routes=bot_config.routes, replicas=bot_config.ring_replicas)
@@ -0,0 +1,282 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from config import RateLimitConfig
+from database import session_manager
+from database.models import RateLimitBucket
+
+GLOBAL_KEY = "global"
+
+
+class Bucket(NamedTuple):
+    rate: float
+    capacity: float
+
+
+def refill(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    cost: float,
+    bucket: Bucket,
+) -> Tuple[float, float]:
+    """
+    Take tokens from a token bucket.
+
+    A request costing more than the bucket capacity (a large media group in a
+    chat limited to one message per second) is let through once the bucket is
+    full and leaves it in debt, so the following requests wait accordingly.
+
+    :param tokens: Tokens left after the previous request.
+    :param updated_at: Time of the previous request.
+    :param now: Current time.
+    :param cost: Number of tokens to take.
+    :param bucket: Bucket parameters.
+    :return: New number of tokens and seconds to wait before trying again
+        (0 if the tokens were taken).
+    """
+    tokens = min(bucket.capacity, tokens + (now - updated_at) * bucket.rate)
+    required = min(cost, bucket.capacity)
+    if tokens >= required:
+        return tokens - cost, 0.0
+    return tokens, (required - tokens) / bucket.rate
+
+
+class RateLimitBackend(ABC):
+    """Storage of the token buckets."""
+
+    @abstractmethod
+    async def consume(self, key: str, cost: float, bucket: Bucket) -> float:
+        """
+        Take tokens from a bucket.
+
+        :param key: Bucket key.
+        :param cost: Number of tokens to take.
+        :param bucket: Bucket parameters.
+        :return: Seconds to wait before trying again, 0 if the tokens were taken.
+        """
+
+    @abstractmethod
+    async def block(self, key: str, seconds: float, bucket: Bucket) -> None:
+        """
+        Empty a bucket so that nothing passes for the given time.
+
+        :param key: Bucket key.
+        :param seconds: Time to block the bucket for.
+        :param bucket: Bucket parameters.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets kept in the process memory.
+
+    A bucket refilled to its capacity is the same as a missing one, such
+    buckets are evicted at most every `sweep_interval` seconds so that chats
+    sent to once do not stay in memory.
+    """
+
+    def __init__(self, sweep_interval: float = 60) -> None:
+        self.sweep_interval = sweep_interval
+        # Key mapped to the tokens, the time of the last update and the time
+        # the bucket is full again
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._swept_at = time.monotonic()
+
+    async def consume(self, key: str, cost: float, bucket: Bucket) -> float:
+        now = time.monotonic()
+        tokens, updated_at, _ = self._buckets.get(key, (bucket.capacity, now, now))
+        tokens, wait = refill(tokens, updated_at, now, cost, bucket)
+        self._save(key, tokens, now, bucket)
+        return wait
+
+    async def block(self, key: str, seconds: float, bucket: Bucket) -> None:
+        now = time.monotonic()
+        tokens, updated_at, _ = self._buckets.get(key, (bucket.capacity, now, now))
+        tokens = min(tokens, -seconds * bucket.rate)
+        self._save(key, tokens, now, bucket)
+
+    def _save(self, key: str, tokens: float, now: float, bucket: Bucket) -> None:
+        full_at = now + (bucket.capacity - tokens) / bucket.rate
+        self._buckets[key] = (tokens, now, full_at)
+        if now - self._swept_at >= self.sweep_interval:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        self._swept_at = now
+        self._buckets = {
+            key: state for key, state in self._buckets.items() if state[2] > now
+        }
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """
+    Buckets kept in the `rate_limit_bucket` table.
+
+    Shared by all application processes. Updates of a bucket are serialized
+    with a transaction-level advisory lock on its key.
+    """
+
+    async def consume(self, key: str, cost: float, bucket: Bucket) -> float:
+        async with session_manager.session_factory() as session:
+            async with session.begin():
+                await session.execute(
+                    select(func.pg_advisory_xact_lock(func.hashtext(key)))
+                )
+                now = time.time()
+                row = await session.get(RateLimitBucket, key)
+                tokens, updated_at = (
+                    (row.tokens, row.updated_at) if row else (bucket.capacity, now)
+                )
+                tokens, wait = refill(tokens, updated_at, now, cost, bucket)
+                await self._save(session, key, tokens, now)
+        return wait
+
+    async def block(self, key: str, seconds: float, bucket: Bucket) -> None:
+        async with session_manager.session_factory() as session:
+            async with session.begin():
+                await session.execute(
+                    select(func.pg_advisory_xact_lock(func.hashtext(key)))
+                )
+                row = await session.get(RateLimitBucket, key)
+                tokens = min(
+                    row.tokens if row else bucket.capacity, -seconds * bucket.rate
+                )
+                await self._save(session, key, tokens, time.time())
+
+    @staticmethod
+    async def _save(session, key: str, tokens: float, updated_at: float) -> None:
+        stmt = insert(RateLimitBucket).values(
+            key=key, tokens=tokens, updated_at=updated_at
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": tokens, "updated_at": updated_at},
+            )
+        )
+
+
+class RateLimiter:
+    """
+    Scheduler keeping sends within the Telegram limits.
+
+    Every send takes tokens from the bucket of its chat and then from the
+    global bucket of the bot. Sends to one chat go one after another, so a
+    chat has at most one send waiting for the global bucket, and the global
+    bucket serves chats in turn: a chat with a long backlog cannot starve the
+    others.
+
+    Bots of a pool have separate limits, their limiters use distinct
+    `key_prefix` values for the buckets.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limits: RateLimitConfig,
+        key_prefix: str = "",
+    ) -> None:
+        self.backend = backend
+        self.key_prefix = key_prefix
+        self.global_bucket = Bucket(limits.global_rate, limits.global_burst)
+        self.private_bucket = Bucket(limits.chat_rate, limits.chat_burst)
+        self.group_bucket = Bucket(limits.group_rate, limits.group_burst)
+
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        self._chat_users: Dict[int, int] = {}
+        self._turns: Deque[Tuple[float, asyncio.Future]] = deque()
+        self._dispatcher: asyncio.Task | None = None
+
+    def chat_bucket(self, chat_id: int) -> Bucket:
+        """
+        Get the bucket parameters of a chat.
+
+        :param chat_id: Telegram chat id.
+        :return: Bucket parameters.
+        """
+        # Groups, supergroups and channels have negative ids
+        return self.group_bucket if chat_id < 0 else self.private_bucket
+
+    async def acquire(self, chat_id: int, cost: int = 1) -> None:
+        """
+        Wait until a send to the chat is allowed.
+
+        :param chat_id: Telegram chat id.
+        :param cost: Number of messages in the send.
+        """
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        self._chat_users[chat_id] = self._chat_users.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                await self._consume(
+                    f"{self.key_prefix}chat:{chat_id}", cost, self.chat_bucket(chat_id)
+                )
+                await self._global_turn(cost)
+        finally:
+            self._chat_users[chat_id] -= 1
+            if not self._chat_users[chat_id]:
+                del self._chat_users[chat_id]
+                del self._chat_locks[chat_id]
+
+    async def retry_after(self, chat_id: int, seconds: float) -> None:
+        """
+        Hold back sends to the chat after Telegram asked to retry later.
+
+        :param chat_id: Telegram chat id.
+        :param seconds: The `retry_after` value reported by Telegram.
+        """
+        await self.backend.block(
+            f"{self.key_prefix}chat:{chat_id}", seconds, self.chat_bucket(chat_id)
+        )
+
+    async def _consume(self, key: str, cost: float, bucket: Bucket) -> None:
+        while wait := await self.backend.consume(key, cost, bucket):
+            await asyncio.sleep(wait)
+
+    async def _global_turn(self, cost: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._turns.append((cost, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        while self._turns:
+            cost, future = self._turns.popleft()
+            if future.done():
+                # The waiting send was cancelled
+                continue
+            try:
+                await self._consume(
+                    f"{self.key_prefix}{GLOBAL_KEY}", cost, self.global_bucket
+                )
+            except Exception as e:
+                # The waiting send fails, the others still get their turns
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(None)
+
+
+def create_rate_limiter(limits: RateLimitConfig, key_prefix: str = "") -> RateLimiter:
+    """
+    Create a rate limiter with the configured backend.
+
+    :param limits: Rate limit configuration.
+    :param key_prefix: Prefix of the bucket keys.
+    :return: Rate limiter.
+    """
+    backend = (
+        DatabaseRateLimitBackend()
+        if limits.backend == "database"
+        else MemoryRateLimitBackend()
+    )
+    return RateLimiter(backend=backend, limits=limits, key_prefix=key_prefix)
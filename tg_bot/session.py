@@ -0,0 +1,81 @@
+import time
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from config import BotSessionConfig
+from metrics import TELEGRAM_RATE_LIMITED, TELEGRAM_REQUEST_SECONDS
+from tracing import instrument_bot_session
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    Aiohttp session of the bot with configurable connection pool.
+
+    aiogram only exposes the total connection limit, the other settings are
+    passed on to the connector.
+    """
+
+    def __init__(self, connector_options: dict[str, Any], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._connector_init.update(connector_options)
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware observing the latency of Bot API calls per method.
+
+    Calls refused with 429 Too Many Requests are counted as well.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            response = await make_request(bot, method)
+            outcome = "ok"
+            return response
+        except TelegramRetryAfter:
+            outcome = "rate_limited"
+            TELEGRAM_RATE_LIMITED.labels(api_method).inc()
+            raise
+        finally:
+            TELEGRAM_REQUEST_SECONDS.labels(api_method, outcome).observe(
+                time.perf_counter() - started
+            )
+
+
+def create_session(session_config: BotSessionConfig) -> AiohttpSession:
+    """
+    Create the HTTP session of the bot.
+
+    :param session_config: Session settings.
+    :return: Aiohttp session.
+    """
+    session = TunedAiohttpSession(
+        connector_options={
+            "limit_per_host": session_config.limit_per_host,
+            "keepalive_timeout": session_config.keepalive_timeout,
+            "ttl_dns_cache": session_config.ttl_dns_cache,
+        },
+        proxy=session_config.proxy,
+        limit=session_config.limit,
+        timeout=session_config.timeout,
+    )
+    session.middleware(RequestMetricsMiddleware())
+    instrument_bot_session(session)
+    return session
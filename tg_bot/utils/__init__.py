@@ -1,3 +1,20 @@
-__all__ = ("create_media_group",)
+__all__ = (
+    "CAPTION_LIMIT",
+    "FileIdCache",
+    "MemoryInputFile",
+    "TEXT_LIMIT",
+    "create_media_group",
+    "split_markdown",
+    "text_length",
+    "validate_markdown",
+)
 
-from .media import create_media_group
+from .file_id_cache import FileIdCache
+from .media import MemoryInputFile, create_media_group
+from .markdown import (
+    CAPTION_LIMIT,
+    TEXT_LIMIT,
+    split_markdown,
+    text_length,
+    validate_markdown,
+)
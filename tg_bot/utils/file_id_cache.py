@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from typing import Tuple
+
+
+class FileIdCache:
+    """
+    LRU cache of Telegram file ids of uploaded documents.
+
+    File ids are only valid for the bot that uploaded the file, they are kept
+    per document and bot.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._file_ids: OrderedDict[Tuple[int, int], str] = OrderedDict()
+
+    def get(self, bot_id: int, document_id: int) -> str | None:
+        """
+        Get the file id of a document.
+
+        :param bot_id: Telegram id of the bot.
+        :param document_id: Document id.
+        :return: Telegram file id or None if the bot did not upload the document.
+        """
+        key = (bot_id, document_id)
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+        return file_id
+
+    def set(self, bot_id: int, document_id: int, file_id: str) -> None:
+        """
+        Remember the file id of an uploaded document.
+
+        :param bot_id: Telegram id of the bot that uploaded the document.
+        :param document_id: Document id.
+        :param file_id: Telegram file id.
+        """
+        key = (bot_id, document_id)
+        self._file_ids[key] = file_id
+        self._file_ids.move_to_end(key)
+        if len(self._file_ids) > self.maxsize:
+            self._file_ids.popitem(last=False)
@@ -0,0 +1,321 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Telegram rejects longer messages and captions
+TEXT_LIMIT = 4096
+CAPTION_LIMIT = 1024
+
+RESERVED_CHARACTERS = frozenset("_*[]()~`>#+-=|{}.!")
+# Longer markers first, `__` is always underline
+FORMAT_MARKERS = ("||", "__", "*", "_", "~")
+
+TEXT, SPACE, NEWLINE, OPEN, CLOSE, QUOTE = range(6)
+QUOTE_MARKS = ("**>", ">")
+
+
+@dataclass
+class _Unit:
+    text: str
+    kind: int = TEXT
+
+    @property
+    def length(self) -> int:
+        return text_length(self.text)
+
+
+def text_length(text: str) -> int:
+    """
+    Measure a text the way Telegram does, in UTF-16 code units.
+
+    :param text: Message text.
+    :return: Length of the text.
+    """
+    return len(text.encode("utf-16-le")) // 2
+
+
+def validate_markdown(text: str) -> None:
+    """
+    Check that a text is valid MarkdownV2.
+
+    Catches the mistakes Telegram rejects a message for: reserved characters
+    that are not escaped and entities that are not closed.
+
+    :param text: Message text in MarkdownV2 format.
+    :raises ValueError: If Telegram would fail to parse the text.
+    """
+    _, errors = _tokenize(text)
+    if errors:
+        raise ValueError(errors[0])
+
+
+def split_markdown(
+    text: str,
+    limit: int = TEXT_LIMIT,
+    first_limit: int | None = None,
+) -> List[str]:
+    """
+    Split a MarkdownV2 text into parts Telegram accepts.
+
+    Parts end at paragraph, line or word boundaries where possible. Entities
+    open at the end of a part are closed there and opened again at the start
+    of the next one, links are never split. A text within the limit is
+    returned as is, without being parsed.
+
+    :param text: Message text in MarkdownV2 format.
+    :param limit: Maximum length of a part.
+    :param first_limit: Maximum length of the first part, e.g. of a caption.
+    :return: Parts of the text, none if the text is empty.
+    """
+    if text_length(text) <= (first_limit or limit):
+        return [text] if text.strip() else []
+
+    units, _ = _tokenize(text)
+
+    parts = []
+    current_limit = first_limit or limit
+    pieces: List[str] = []
+    length = 0
+    # Pieces reopening the entities of the previous part
+    start = 0
+    stack: List[str] = []
+    # Positions after whitespace: (pieces, length, open entities, newline)
+    breaks: List[Tuple[int, int, List[str], bool]] = []
+
+    for unit in units:
+        after = _apply(stack, unit)
+        while (
+            len(pieces) > start
+            and length + unit.length + _closing_length(after) > current_limit
+        ):
+            cut, cut_length, cut_stack = _choose_break(
+                breaks, current_limit, len(pieces), length, stack
+            )
+            parts.append(_join("".join(pieces[:cut]), _closers(cut_stack)))
+
+            opener = _openers(cut_stack)
+            rest = pieces[cut:]
+            if rest and opener.endswith("_") and rest[0].startswith("_"):
+                opener += "\r"
+            pieces = [opener] + rest
+            length = text_length(opener) + length - cut_length
+            start = 1
+            breaks = [
+                (index - cut + 1, break_length - cut_length + text_length(opener), s, n)
+                for index, break_length, s, n in breaks
+                if index > cut
+            ]
+            current_limit = limit
+
+        pieces.append(unit.text)
+        length += unit.length
+        stack = after
+        if unit.kind in (SPACE, NEWLINE):
+            breaks.append((len(pieces), length, stack, unit.kind == NEWLINE))
+
+    if len(pieces) > start:
+        parts.append(_join("".join(pieces), _closers(stack)))
+    return [part for part in parts if part.strip()]
+
+
+def _choose_break(
+    breaks: List[Tuple[int, int, List[str], bool]],
+    limit: int,
+    count: int,
+    length: int,
+    stack: List[str],
+) -> Tuple[int, int, List[str]]:
+    fitting = [
+        (index, break_length, break_stack, newline)
+        for index, break_length, break_stack, newline in breaks
+        if break_length + _closing_length(break_stack) <= limit
+    ]
+    # A line break is preferred unless it leaves a short part behind
+    for index, break_length, break_stack, newline in reversed(fitting):
+        if newline and break_length >= limit // 2:
+            return index, break_length, break_stack
+    if fitting:
+        index, break_length, break_stack, _ = fitting[-1]
+        return index, break_length, break_stack
+    return count, length, stack
+
+
+def _apply(stack: List[str], unit: _Unit) -> List[str]:
+    # A block quotation mark lasts until the end of the line
+    if unit.kind == NEWLINE and stack and stack[0] in QUOTE_MARKS:
+        return stack[1:]
+    if unit.kind == QUOTE:
+        return [unit.text] + stack
+    if unit.kind == OPEN:
+        return stack + [unit.text]
+    if unit.kind == CLOSE:
+        opener = _opener_of(stack, unit.text)
+        index = len(stack) - 1 - stack[::-1].index(opener)
+        return stack[:index] + stack[index + 1 :]
+    return stack
+
+
+def _opener_of(stack: List[str], closer: str) -> str:
+    if closer == "```":
+        return next(m for m in reversed(stack) if m.startswith("```"))
+    return closer
+
+
+def _closers(stack: List[str]) -> str:
+    return _join(
+        *(
+            "```" if m.startswith("```") else m
+            for m in reversed(stack)
+            if m not in QUOTE_MARKS
+        )
+    )
+
+
+def _closing_length(stack: List[str]) -> int:
+    return text_length(_closers(stack))
+
+
+def _openers(stack: List[str]) -> str:
+    return _join(*stack)
+
+
+def _join(*texts: str) -> str:
+    # `___` is read as underline and italic in this order, a carriage return
+    # keeps adjacent markers apart and is ignored by Telegram
+    result = ""
+    for text in texts:
+        if result.endswith("_") and text.startswith("_"):
+            result += "\r"
+        result += text
+    return result
+
+
+def _tokenize(text: str) -> Tuple[List[_Unit], List[str]]:
+    units: List[_Unit] = []
+    errors: List[str] = []
+    stack: List[str] = []
+    line_start = True
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+        code = stack[-1] if stack and stack[-1].startswith("`") else None
+
+        if char == "\\" and i + 1 < len(text):
+            units.append(_Unit(text[i : i + 2]))
+            line_start = False
+            i += 2
+            continue
+
+        if code:
+            if code.startswith("```") and text.startswith("```", i):
+                units.append(_Unit("```", CLOSE))
+                stack.pop()
+                i += 3
+            elif code == "`" and char == "`":
+                units.append(_Unit("`", CLOSE))
+                stack.pop()
+                i += 1
+            else:
+                if char == "`":
+                    errors.append("Character '`' must be escaped inside code")
+                units.append(_whitespace_or_text(char))
+                i += 1
+            continue
+
+        if char == "\n":
+            units.append(_Unit(char, NEWLINE))
+            line_start = True
+            i += 1
+            continue
+
+        if line_start:
+            line_start = False
+            # Block quotation marks
+            mark = next((m for m in QUOTE_MARKS if text.startswith(m, i)), None)
+            if mark:
+                units.append(_Unit(mark, QUOTE))
+                i += len(mark)
+                continue
+
+        if text.startswith("```", i):
+            end = text.find("\n", i)
+            opener = text[i : end + 1] if end != -1 else "```"
+            units.append(_Unit(opener, OPEN))
+            stack.append(opener)
+            i += len(opener)
+            continue
+
+        if char == "`":
+            units.append(_Unit(char, OPEN))
+            stack.append(char)
+            i += 1
+            continue
+
+        if char in "![" and (end := _link_end(text, i)):
+            # Links are atomic, only their text may hold entities
+            start = text.index("[", i) + 1
+            close = text.index("](", start)
+            errors += _tokenize(text[start:close])[1]
+            units.append(_Unit(text[i:end]))
+            i = end
+            continue
+
+        if text.startswith("||", i) and "||" not in stack and _ends_quote(text, i):
+            # Expandability mark of a block quotation
+            units.append(_Unit("||"))
+            i += 2
+            continue
+
+        for marker in FORMAT_MARKERS:
+            if text.startswith(marker, i):
+                kind = CLOSE if marker in stack else OPEN
+                units.append(_Unit(marker, kind))
+                stack = _apply(stack, units[-1])
+                i += len(marker)
+                break
+        else:
+            if char in RESERVED_CHARACTERS:
+                errors.append(f"Character '{char}' is reserved and must be escaped")
+            units.append(_whitespace_or_text(char))
+            i += 1
+
+    errors += [f"Entity '{marker.strip()}' is not closed" for marker in stack]
+    return units, errors
+
+
+def _whitespace_or_text(char: str) -> _Unit:
+    if char == "\n":
+        return _Unit(char, NEWLINE)
+    if char.isspace():
+        return _Unit(char, SPACE)
+    return _Unit(char)
+
+
+def _link_end(text: str, i: int) -> int | None:
+    if text[i] == "!":
+        i += 1
+    if not text.startswith("[", i):
+        return None
+
+    i = _find_unescaped(text, "]", i + 1)
+    if i is None or not text.startswith("(", i + 1):
+        return None
+    i = _find_unescaped(text, ")", i + 2)
+    return i + 1 if i is not None else None
+
+
+def _find_unescaped(text: str, char: str, i: int) -> int | None:
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+        elif text[i] == char:
+            return i
+        else:
+            i += 1
+    return None
+
+
+def _ends_quote(text: str, i: int) -> bool:
+    line_start = text.rfind("\n", 0, i) + 1
+    at_line_end = i + 2 == len(text) or text[i + 2] == "\n"
+    return at_line_end and text.startswith(QUOTE_MARKS, line_start)
@@ -1,22 +1,63 @@
-import base64
-from typing import List
+from typing import AsyncGenerator, List
 
-from aiogram.types import BufferedInputFile, InputMediaDocument
+from aiogram import Bot
+from aiogram.types import InputFile, InputMediaDocument
 
+from database import blob_storage
 from database.models import Document
+from tracing import is_enabled, span
 
 
-def create_media_group(files: List[Document]) -> List[InputMediaDocument]:
+class MemoryInputFile(InputFile):
+    """
+    File uploaded straight from a buffer.
+
+    Unlike `BufferedInputFile`, the chunks are `memoryview` slices of the
+    buffer, so sending the same document to many chats copies nothing.
+    """
+
+    def __init__(self, buffer: bytes | memoryview, filename: str) -> None:
+        super().__init__(filename=filename)
+        self.buffer = memoryview(buffer)
+
+    async def read(self, bot: Bot) -> AsyncGenerator[memoryview, None]:
+        for start in range(0, len(self.buffer), self.chunk_size):
+            yield self.buffer[start : start + self.chunk_size]
+
+
+async def create_media_group(
+    files: List[Document],
+    file_ids: List[str | None] | None = None,
+) -> List[InputMediaDocument]:
     """
     Create a media group for sending.
 
     :param files: List of files to send.
+    :param file_ids: Telegram file ids of already uploaded files, in the order
+        of `files`. Files with a file id are not uploaded again, the others
+        are read from the blob storage.
     :return: List of InputMediaDocument objects.
     """
-    media_group = []
-    for file in files:
-        buffer = base64.b64decode(file.buffer)
-        file_obj = BufferedInputFile(file=buffer, filename=file.name)
-        media_group.append(InputMediaDocument(media=file_obj))
+    file_ids = file_ids or [None] * len(files)
+
+    attributes = None
+    if is_enabled():
+        uploads = [file for file, file_id in zip(files, file_ids) if not file_id]
+        attributes = {
+            "notification.documents": len(files),
+            "telegram.media.uploads": len(uploads),
+            "telegram.media.upload_bytes": sum(file.size for file in uploads),
+        }
+
+    with span("telegram.create_media_group", attributes):
+        media_group = []
+        for file, file_id in zip(files, file_ids):
+            if file_id:
+                media_group.append(InputMediaDocument(media=file_id))
+                continue
+
+            buffer = await blob_storage.read(file)
+            file_obj = MemoryInputFile(buffer=buffer, filename=file.name)
+            media_group.append(InputMediaDocument(media=file_obj))
 
     return media_group
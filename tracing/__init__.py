@@ -0,0 +1,21 @@
+__all__ = (
+    "get_tracer",
+    "instrument_app",
+    "instrument_bot_session",
+    "instrument_engine",
+    "is_enabled",
+    "setup_tracing",
+    "shutdown_tracing",
+    "span",
+)
+
+from .tracer import (
+    get_tracer,
+    instrument_app,
+    instrument_bot_session,
+    instrument_engine,
+    is_enabled,
+    setup_tracing,
+    shutdown_tracing,
+    span,
+)
@@ -0,0 +1,55 @@
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .tracer import get_tracer, is_enabled
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware recording a server span for every HTTP request.
+
+    The trace context of the caller is taken from the `traceparent` header.
+    The span is named after the path template of the matched route, known
+    only once the request was routed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        attributes = {"http.request.method": method, "url.path": scope["path"]}
+        if "content-length" in headers and headers["content-length"].isdigit():
+            attributes["http.request.body.size"] = int(headers["content-length"])
+
+        with get_tracer().start_as_current_span(
+            method,
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes=attributes,
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # The router stores the matched route in the scope
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"{method} {route}")
@@ -0,0 +1,52 @@
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import InputFile
+from opentelemetry.trace import SpanKind
+
+from .tracer import get_tracer, is_enabled
+
+
+class RequestTracingMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware recording a client span for every Bot API call.
+
+    The span carries the chat and the number of the attached documents; the
+    ones uploaded from memory are counted with their size.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not is_enabled():
+            return await make_request(bot, method)
+
+        api_method = method.__api_method__
+        attributes = {"telegram.method": api_method, "telegram.bot_id": bot.id}
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None:
+            attributes["telegram.chat_id"] = chat_id
+
+        media = getattr(method, "media", None)
+        if isinstance(media, list):
+            uploads = [
+                item.media for item in media if isinstance(item.media, InputFile)
+            ]
+            attributes["telegram.media.count"] = len(media)
+            attributes["telegram.media.uploads"] = len(uploads)
+            attributes["telegram.media.upload_bytes"] = sum(
+                len(upload.buffer) for upload in uploads if hasattr(upload, "buffer")
+            )
+
+        with get_tracer().start_as_current_span(
+            f"telegram.{api_method}", kind=SpanKind.CLIENT, attributes=attributes
+        ):
+            # Failed calls are recorded with their exception
+            return await make_request(bot, method)
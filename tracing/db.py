@@ -0,0 +1,62 @@
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .tracer import get_tracer, is_enabled
+
+# Statements are cut, batched inserts can be long
+MAX_STATEMENT_LENGTH = 1024
+
+
+def trace_statements(engine: AsyncEngine) -> None:
+    """
+    Record a client span for every SQL statement an engine executes.
+
+    The span is a child of the span current at the call, e.g. the one of the
+    CRUD function issuing the statement: SQLAlchemy runs the event hooks in
+    the context of the awaiting task. Once tracing is shut down the hooks
+    return right away.
+
+    :param engine: Async database engine.
+    :return: None
+    """
+    system = engine.dialect.name
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if not is_enabled():
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        span = get_tracer().start_span(
+            operation or system,
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system.name": system,
+                "db.operation.name": operation,
+                "db.query.text": statement[:MAX_STATEMENT_LENGTH],
+            },
+        )
+        if executemany:
+            span.set_attribute("db.operation.batch.size", len(parameters))
+        context._tracing_span = span
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            context._tracing_span = None
+            span.end()
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context) -> None:
+        context = exception_context.execution_context
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            context._tracing_span = None
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
@@ -0,0 +1,20 @@
+import os
+
+from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+
+class JsonLinesSpanExporter(ConsoleSpanExporter):
+    """
+    Span exporter appending one JSON document per span to a local file.
+
+    Meant for tests and local runs without a collector.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(
+            out=open(path, "a"),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+
+    def shutdown(self) -> None:
+        self.out.close()
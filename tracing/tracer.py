@@ -0,0 +1,167 @@
+import contextlib
+from typing import TYPE_CHECKING, Any, ContextManager, Dict
+
+from config import TracingConfig
+
+if TYPE_CHECKING:
+    from aiogram.client.session.base import BaseSession
+    from fastapi import FastAPI
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SpanExporter
+    from opentelemetry.trace import Tracer
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Both are set by `setup_tracing`; while they are None, spans are no-ops and
+# nothing is instrumented
+_provider: "TracerProvider | None" = None
+_tracer: "Tracer | None" = None
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def setup_tracing(tracing_config: TracingConfig) -> None:
+    """
+    Start exporting spans.
+
+    The OpenTelemetry packages of the `tracing` extra are only imported here,
+    the application runs without them while tracing is disabled.
+
+    :param tracing_config: Tracing settings.
+    :return: None
+    :raises RuntimeError: If the `tracing` extra is not installed.
+    """
+    global _provider, _tracer
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        raise RuntimeError(
+            "Tracing requires the OpenTelemetry packages, "
+            "install the `tracing` extra: pip install '.[tracing]'"
+        ) from e
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": tracing_config.service_name}),
+        sampler=ParentBased(TraceIdRatioBased(tracing_config.sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_create_exporter(tracing_config)))
+    _provider = provider
+    _tracer = provider.get_tracer("tg-notify-bot")
+
+
+def shutdown_tracing() -> None:
+    """
+    Export the remaining spans and stop tracing.
+
+    :return: None
+    """
+    global _provider, _tracer
+
+    if _provider is None:
+        return
+    provider, _provider, _tracer = _provider, None, None
+    provider.shutdown()
+
+
+def is_enabled() -> bool:
+    """
+    Check whether spans are recorded.
+
+    :return: True if tracing was set up.
+    """
+    return _tracer is not None
+
+
+def get_tracer() -> "Tracer":
+    """
+    Get the tracer of the application.
+
+    :return: Tracer.
+    :raises RuntimeError: If tracing was not set up.
+    """
+    if _tracer is None:
+        raise RuntimeError("Tracing is not set up")
+    return _tracer
+
+
+def span(name: str, attributes: Dict[str, Any] | None = None) -> ContextManager:
+    """
+    Record a span around a block of code.
+
+    With tracing disabled a shared no-op context manager is returned, so a
+    traced block costs a global lookup.
+
+    :param name: Span name.
+    :param attributes: Span attributes; None values are left out.
+    :return: Context manager of the span.
+    """
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.start_as_current_span(
+        name,
+        attributes={
+            key: value for key, value in (attributes or {}).items() if value is not None
+        },
+    )
+
+
+def instrument_app(app: "FastAPI") -> None:
+    """
+    Record a span for every HTTP request to the application, if tracing is
+    enabled.
+
+    :param app: FastAPI application.
+    :return: None
+    """
+    if _tracer is None:
+        return
+
+    from .asgi import TracingMiddleware
+
+    app.add_middleware(TracingMiddleware)
+
+
+def instrument_engine(engine: "AsyncEngine") -> None:
+    """
+    Record a span for every SQL statement of an engine, if tracing is enabled.
+
+    :param engine: Async database engine.
+    :return: None
+    """
+    if _tracer is None:
+        return
+
+    from .db import trace_statements
+
+    trace_statements(engine)
+
+
+def instrument_bot_session(session: "BaseSession") -> None:
+    """
+    Record a span for every Bot API call of a session, if tracing is enabled.
+
+    :param session: HTTP session of the bots.
+    :return: None
+    """
+    if _tracer is None:
+        return
+
+    from .bot import RequestTracingMiddleware
+
+    session.middleware(RequestTracingMiddleware())
+
+
+def _create_exporter(tracing_config: TracingConfig) -> "SpanExporter":
+    if tracing_config.exporter == "file":
+        from .export import JsonLinesSpanExporter
+
+        return JsonLinesSpanExporter(tracing_config.file_path)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+
+    return OTLPSpanExporter(endpoint=tracing_config.endpoint)